@@ -1,15 +1,21 @@
+from utils import startup_timing
+
+import multiprocessing
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import messagebox
 
 from ui.main_window import App
 from ui.startup_window import StartupWindow
-from ui.preview_window import show_preview
-from controllers.run_controller import run_transform
+
+startup_timing.mark("gui modules imported")
 
 
 
 def run(self):
+    from ui.preview_window import show_preview
+    from controllers.run_controller import run_transform
+
     try:
         df_out, outputs = run_transform(self)
         show_preview(self, df_out, outputs)
@@ -18,11 +24,23 @@ def run(self):
 
     
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # tiled KMZ export uses worker processes
     root = App()
     root.withdraw()
+    startup_timing.mark("main window built")
 
     def show_main():
         root.deiconify()
 
     StartupWindow(root, show_main)
+
+    def first_window_shown():
+        startup_timing.mark("startup window shown")
+        startup_timing.maybe_report()
+
+        # Users read the disclaimer first: load pandas / PROJ meanwhile
+        from pipeline import start_warm_up
+        start_warm_up(root.src_crs.get(), root.utm_zone.get(), root.mutm_zone.get())
+
+    root.after_idle(first_window_shown)
     root.mainloop()
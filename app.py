@@ -1,17 +1,27 @@
+from utils import startup_timing
+
+import multiprocessing
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
-import pandas as pd
 
-from parser import parse_text, parse_file, dd_to_dms
-from transform import transform_all
-from kml_export import export_to_kml
+# numpy / pandas / pyproj and the preview are imported on first use so the
+# disclaimer window appears without waiting for them (see utils/startup_timing.py)
+from controllers.live_controller import LiveSession
+from controllers.run_cache import RunCache
+from controllers.run_controller import read_spec, transform_live, transform_spec
+from ui.worker import BackgroundJob, ProgressPanel
+from utils.run_timing import RunTimings
+
+startup_timing.mark("gui modules imported")
 
 
 APP_TITLE = "Coordinate Transformer --- MUTM | UTM | WGS84 "
 FOOTER = "Prepared by: Bikalp Ghimire | Civil Engineer | Pumori Engineering Services (P) Ltd."
 
+LIVE_DEBOUNCE_MS = 300
+
 MANUAL_PLACEHOLDER = (
     "Example:\n"
     "P1, 634413.7394, 3064905.402\n"
@@ -19,52 +29,6 @@ MANUAL_PLACEHOLDER = (
 )
 
 
-def fmt_latlon(x): return f"{x:.8f}"
-def fmt_xy(x): return f"{x:.4f}"
-
-
-# ==================================================
-# AUTO-DETECT COORDINATE ORDER
-# ==================================================
-
-def check_consistent_order(xs, ys, src_crs):
-    """
-    Determines and enforces consistent coordinate order.
-    Nepal-specific rule:
-    - WGS84: |Latitude| < |Longitude|
-    - Projected: |Easting| < |Northing|
-    """
-
-    detected = []
-
-    for i, (x, y) in enumerate(zip(xs, ys), start=1):
-        if pd.isna(x) or pd.isna(y):
-            continue
-
-        ax, ay = abs(x), abs(y)
-
-        # ---------------- WGS84 (Nepal-specific) ----------------
-        if src_crs == "WGS84":
-            detected.append("LATLON" if ax < ay else "LONLAT")
-
-        # ---------------- Projected (UTM / MUTM) ----------------
-        else:
-            detected.append("EN" if ax < ay else "NE")
-
-    if not detected:
-        raise ValueError("No valid coordinate rows found.")
-
-    first = detected[0]
-    for d in detected:
-        if d != first:
-            raise ValueError(
-                "Inconsistent coordinate order detected.\n\n"
-                "Some rows appear as X,Y while others appear as Y,X.\n"
-                "Please ensure all rows use the same coordinate order."
-            )
-
-    return first
-
 class StartupWindow(ttk.Toplevel):
     def __init__(self, master, on_start):
         super().__init__(master)
@@ -227,6 +191,20 @@ class App(ttk.Window):
         self.title(APP_TITLE)
         self.geometry("800x500")
         self.minsize(600, 500)
+
+        # Live manual mode state
+        self._live = LiveSession()
+        self._live_after = None
+        self._live_job = None
+        self._live_pending = False
+        self._live_preview = None
+
+        # Parsed input + WGS84 intermediate of the last Run
+        self._run_cache = RunCache()
+
+        # Phase timings of the last completed run (see utils.run_timing)
+        self.last_timings = None
+
         self._build_ui()
 
     # ==================================================
@@ -309,6 +287,24 @@ class App(ttk.Window):
         self.manual_text.bind("<FocusIn>", _clear_placeholder)
         self.manual_text.bind("<FocusOut>", _restore_placeholder)
 
+        # ---- Live mode: re-transform changed lines while typing ----
+        live_row = ttk.Frame(self.manual_frame)
+        live_row.pack(fill=X, padx=padx, pady=(0, pady))
+
+        self.live = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            live_row,
+            text="Live preview",
+            variable=self.live,
+            command=self._schedule_live
+        ).pack(side=LEFT)
+
+        self.live_status = ttk.Label(live_row, text="", foreground="gray")
+        self.live_status.pack(side=LEFT, padx=(10, 0))
+
+        self.manual_text.bind("<<Modified>>", self._on_text_modified)
+        self.manual_text.edit_modified(False)  # placeholder insert set the flag
+
 
 
         # File input
@@ -455,15 +451,25 @@ class App(ttk.Window):
         # --------------------------------------------------
         # Transform button
         # --------------------------------------------------
-        ttk.Button(
+        self.run_btn = ttk.Button(
             self,
             text="Transform Coordinates",
             bootstyle=SUCCESS,
             width=28,
             command=self.run
-        ).grid(row=4, column=0, pady=10)
+        )
+        self.run_btn.grid(row=4, column=0, pady=10)
+
+        # Progress + Cancel for the background job (hidden while idle)
+        self.progress = ProgressPanel(self)
+        self.progress.grid(row=5, column=0, sticky="ew", padx=padx, pady=(0, 4))
+        self.progress.grid_remove()
+
+        # Per-phase timings of the last run
+        self.status = ttk.Label(self, text="", foreground="gray", anchor="w")
+        self.status.grid(row=6, column=0, sticky="ew", padx=padx)
 
-        ttk.Label(self, text=FOOTER, foreground="gray").grid(row=5, column=0, pady=(0, 6))
+        ttk.Label(self, text=FOOTER, foreground="gray").grid(row=7, column=0, pady=(0, 6))
 
         self._sync_output_checkboxes()
 
@@ -492,247 +498,150 @@ class App(ttk.Window):
             self.file_entry.delete(0, END)
             self.file_entry.insert(0, f)
 
-    # ==================================================
-    # Main run
-    # ==================================================
-    def run(self):
-        if self.mode.get() == "manual":
-            text = self.manual_text.get("1.0", END)
-            if text.strip() == MANUAL_PLACEHOLDER.strip():
-                raise ValueError("Please enter coordinate data before transforming.")
+    # --------------------------------------------------
+    # Live manual mode
+    # --------------------------------------------------
+    def _on_text_modified(self, event=None):
+        self.manual_text.edit_modified(False)
+        self._schedule_live()
+
+    def _live_on(self):
+        return self.live.get() and self.mode.get() == "manual"
+
+    def _schedule_live(self):
+        """Debounce: (re)start the timer on every keystroke."""
+        if self._live_after:
+            self.after_cancel(self._live_after)
+            self._live_after = None
+        if self._live_on():
+            self._live_after = self.after(LIVE_DEBOUNCE_MS, self._run_live)
         else:
-            path = self.file_entry.get().strip()
-            if not path or path == ".csv, .xlsx, .txt":
-                raise ValueError("Please select a valid input file.")
-
-        try:
-            self._sync_output_checkboxes()
-            # ---------- INPUT ----------
-            df_in = (
-                parse_text(self.manual_text.get("1.0", END), self.src_crs.get())
-                if self.mode.get() == "manual"
-                else parse_file(self.file_entry.get(), self.has_header.get())
-            )
-
-            # Ensure ALL rows use the same order
-            order = check_consistent_order(
-                df_in["X"].astype(float),
-                df_in["Y"].astype(float),
-                self.src_crs.get()
-            )
-
+            self._live_pending = False    # no re-run once the current job ends
 
+    def _run_live(self):
+        self._live_after = None
+        if self._live_job:
+            # One live job at a time; run again once it finishes
+            self._live_pending = True
+            return
 
-            # Normalize internal order → X = E/Lon, Y = N/Lat
-            if order in ("NE", "LATLON"):
-                df_in[["X", "Y"]] = df_in[["Y", "X"]]
+        text = self.manual_text.get("1.0", "end-1c")
+        if text == MANUAL_PLACEHOLDER or not text.strip():
+            return
+        spec = read_spec(self)
 
-            # ---------- TRANSFORM ----------
-            rows = transform_all(
-                df_in,
-                self.src_crs.get(),
-                int(self.utm_zone.get()),
-                int(self.mutm_zone.get())
+        def done(result):
+            df_out, outputs = result
+            self.df_out = df_out
+            self.live_status.configure(
+                text=f"{len(df_out):,} points ({self._live.misses:,} recomputed)"
             )
+            if self._live_preview and self._live_preview.winfo_exists():
+                self._live_preview.set_data(df_out, outputs)
+            elif self._live_on():
+                self._live_preview = self._show_preview(df_out, outputs)
+            finish()
+
+        def failed(e):
+            self.live_status.configure(text=str(e).splitlines()[0])
+            finish()
+
+        def finish():
+            self._live_job = None
+            if self._live_pending:
+                self._live_pending = False
+                if self._live_on():
+                    self._run_live()
+
+        self._live_job = BackgroundJob(
+            self,
+            lambda progress, cancel: transform_live(self._live, spec),
+            on_done=done,
+            on_error=failed
+        ).start()
 
-            df_all = pd.DataFrame(rows, columns=[
-                "Point",
-                "WGS84_Lat", "WGS84_Lon",
-                "UTM_E", "UTM_N", "UTM_Zone",
-                "MUTM_E", "MUTM_N", "MUTM_CM"
-            ])
-
-            src = self.src_crs.get()
-            df_out = pd.DataFrame()
-            df_out["Point"] = df_in["Point"]
-
-            src = self.src_crs.get()
-
-            # ---------------- INPUT COLUMN NAMES ----------------
-            if src == "WGS84":
-                if order == "LATLON":
-                    df_out["WGS84_Lat"] = df_in["Y"].apply(fmt_latlon)
-                    df_out["WGS84_Lon"] = df_in["X"].apply(fmt_latlon)
-                else:  # LONLAT
-                    df_out["WGS84_Lon"] = df_in["X"].apply(fmt_latlon)
-                    df_out["WGS84_Lat"] = df_in["Y"].apply(fmt_latlon)
-
+    # ==================================================
+    # Main run
+    # ==================================================
+    def run(self):
+        try:
+            if self.mode.get() == "manual":
+                text = self.manual_text.get("1.0", END)
+                if text.strip() == MANUAL_PLACEHOLDER.strip():
+                    raise ValueError("Please enter coordinate data before transforming.")
             else:
-                # MUTM / UTM → preserve original order
-                if order == "EN":
-                    df_out[f"{src}_E"] = df_in["X"].apply(fmt_xy)
-                    df_out[f"{src}_N"] = df_in["Y"].apply(fmt_xy)
-                else:  # NE
-                    df_out[f"{src}_N"] = df_in["Y"].apply(fmt_xy)
-                    df_out[f"{src}_E"] = df_in["X"].apply(fmt_xy)
-
-            outputs = []
-
-            # ---------- WGS84 ----------
-            if self.out_wgs.get():
-                outputs.append("WGS84")
-
-                if self.wgs_fmt.get() == "DMS":
-                    lat = df_all["WGS84_Lat"].apply(lambda v: dd_to_dms(v, is_lat=True))
-                    lon = df_all["WGS84_Lon"].apply(lambda v: dd_to_dms(v, is_lat=False))
-                else:
-                    lat = df_all["WGS84_Lat"].apply(fmt_latlon)
-                    lon = df_all["WGS84_Lon"].apply(fmt_latlon)
-
-                df_out["WGS84_Lat"] = lat
-                df_out["WGS84_Lon"] = lon
-
-
-
-            # ---------- UTM ----------
-            if self.out_utm.get():
-                z = self.utm_zone.get()
-                outputs.append(f"UTM{z}")
-                e = df_all["UTM_E"].apply(fmt_xy)
-                n = df_all["UTM_N"].apply(fmt_xy)
-
-                if order == "NE":
-                    df_out[f"UTM{z}_N"] = n
-                    df_out[f"UTM{z}_E"] = e
-                else:
-                    df_out[f"UTM{z}_E"] = e
-                    df_out[f"UTM{z}_N"] = n
-
-            # ---------- MUTM ----------
-            if self.out_mutm.get():
-                z = self.mutm_zone.get()
-                outputs.append(f"MUTM{z}")
-                e = df_all["MUTM_E"].apply(fmt_xy)
-                n = df_all["MUTM_N"].apply(fmt_xy)
-
-                if order == "NE":
-                    df_out[f"MUTM{z}_N"] = n
-                    df_out[f"MUTM{z}_E"] = e
-                else:
-                    df_out[f"MUTM{z}_E"] = e
-                    df_out[f"MUTM{z}_N"] = n
-            self.df_out = df_out
-            self._show_preview(df_out, outputs)
+                path = self.file_entry.get().strip()
+                if not path or path == ".csv, .xlsx, .txt":
+                    raise ValueError("Please select a valid input file.")
 
+            self._sync_output_checkboxes()
+            spec = read_spec(self)
         except Exception as e:
             messagebox.showerror("Error", str(e))
-    # ---- Export to KML ----
-    def export_kml(self):
-        if not hasattr(self, "df_out"):
-            messagebox.showwarning(
-                "No Data",
-                "Please run the conversion before exporting KML."
-            )
             return
 
-        if "WGS84_Lat" not in self.df_out or "WGS84_Lon" not in self.df_out:
-            messagebox.showerror(
-                "Missing Data",
-                "WGS84 coordinates are required for KML export."
-            )
-            return
+        def finish():
+            self.progress.finish()
+            self.run_btn.configure(state=NORMAL)
 
-        path = filedialog.asksaveasfilename(
-            defaultextension=".kml",
-            filetypes=[("KML files", "*.kml")]
-        )
+        timings = RunTimings()
 
-        if not path:
-            return
+        def done(result):
+            finish()
+            df_out, outputs = result
+            self.df_out = df_out
+            with timings.phase("preview"):
+                self._show_preview(df_out, outputs).update_idletasks()
 
-        export_to_kml(
-            filepath=path,
-            names=self.df_out["Point"],
-            lats=self.df_out["WGS84_Lat"].astype(float),
-            lons=self.df_out["WGS84_Lon"].astype(float),
-            crs_name=self.src_crs.get()
-        )
+            self.last_timings = timings
+            self.status.configure(text=timings.summary())
 
+        def failed(e):
+            finish()
+            messagebox.showerror("Error", str(e))
 
-        messagebox.showinfo(
-            "Export Complete",
-            f"KML file successfully saved:\n{path}"
+        job = BackgroundJob(
+            self,
+            lambda progress, cancel: transform_spec(
+                spec, progress, cancel, self._run_cache, timings
+            ),
+            on_done=done,
+            on_error=failed,
+            on_progress=self.progress.update_progress,
+            on_cancel=finish
         )
+        self.run_btn.configure(state=DISABLED)
+        self.progress.track(job, "Transforming…")
+        job.start()
 
     # ==================================================
     # Preview + export + copy headers
     # ==================================================
     def _show_preview(self, df, outputs):
-        win = ttk.Toplevel(self)
-        win.title("Transformation Results Preview")
-        win.geometry("1200x500")
-        win.grab_set()
+        from ui.preview_window import show_preview
 
-        ttk.Label(
-            win,
-            text=f"Input CRS: {self.src_crs.get()} | Output CRS: {', '.join(outputs)}",
-            font=("TkDefaultFont", 10, "bold")
-        ).pack(anchor="w", padx=10, pady=(10, 5))
-
-        frame = ttk.Frame(win)
-        frame.pack(fill=BOTH, expand=True, padx=10, pady=5)
-
-        tree = ttk.Treeview(frame, columns=list(df.columns), show="headings")
-        tree.pack(fill=BOTH, expand=True)
-
-        for col in df.columns:
-            tree.heading(col, text=col)
-            tree.column(col, anchor="center", width=140)
-
-        for _, r in df.iterrows():
-            tree.insert("", END, values=list(r))
-
-        # ---- Copy including headers ----
-        def copy_selected(event=None):
-            rows = ["\t".join(df.columns)]
-            for i in tree.selection():
-                rows.append("\t".join(map(str, tree.item(i)["values"])))
-            win.clipboard_clear()
-            win.clipboard_append("\n".join(rows))
-
-        tree.bind("<Control-c>", copy_selected)
-
-        # ---- Export to Excel ----
-        def export_excel():
-            path = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel file", "*.xlsx")]
-            )
-            if path:
-                df.to_excel(path, index=False)
-                messagebox.showinfo("Exported", f"Saved to:\n{path}")
-        
-
-        btns = ttk.Frame(win)
-        btns.pack(pady=6)
-
-        ttk.Button(
-            btns, text="Export to Excel",
-            bootstyle=SUCCESS,
-            command=export_excel
-        ).pack(side=LEFT, padx=10)
-
-        ttk.Button(
-            btns,
-            text="Export KML",
-            bootstyle=INFO,
-            command=self.export_kml
-        ).pack(side="left", padx=10)
-
-
-        ttk.Button(
-            btns, text="Close",
-            command=win.destroy
-        ).pack(side=LEFT, padx=10)
+        return show_preview(self, df, outputs)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # tiled KMZ export uses worker processes
     root = App()
     root.withdraw()  # hide main window initially
+    startup_timing.mark("main window built")
 
     def show_main_app():
         root.deiconify()
 
     StartupWindow(root, show_main_app)
+
+    def first_window_shown():
+        startup_timing.mark("startup window shown")
+        startup_timing.maybe_report()
+
+        # Users read the disclaimer first: load pandas / PROJ meanwhile
+        from pipeline import start_warm_up
+        start_warm_up(root.src_crs.get(), root.utm_zone.get(), root.mutm_zone.get())
+
+    root.after_idle(first_window_shown)
     root.mainloop()
 
@@ -0,0 +1,229 @@
+import csv
+import glob
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from controllers.job import run_job_to_file
+from pipeline import ConversionCancelled
+from utils.run_timing import RunTimings
+
+# ============================================================
+# Multi-file batch conversion on a process pool
+# ============================================================
+
+INPUT_EXTENSIONS = (".csv", ".txt", ".xlsx")
+
+# Per-file report columns (phase seconds come from RunTimings)
+REPORT_COLUMNS = (
+    "input", "output", "points", "seconds",
+    "parse_s", "order_check_s", "transform_s", "write_s",
+    "bytes", "worker", "error",
+)
+
+
+def find_inputs(paths):
+    """
+    Input files for a list of files, directories (their .csv / .txt /
+    .xlsx files, not recursive) and glob patterns, without duplicates.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(INPUT_EXTENSIONS)
+                and not name.startswith("~$")    # Excel lock files
+            )
+        elif glob.has_magic(path):
+            matches = sorted(glob.glob(path))
+        else:
+            matches = [path]
+
+        if not matches:
+            raise ValueError(f"No input files in: {path}")
+        files.extend(m for m in matches if m not in files)
+    return files
+
+
+def output_path(in_path, out_dir, fmt, qualify=False):
+    """
+    <out_dir>/<input stem>_converted.<format extension>; with `qualify`,
+    <input stem>_<input extension>_converted.<format extension>.
+    """
+    from sinks.factory import SINK_FORMATS
+
+    stem, in_ext = os.path.splitext(os.path.basename(in_path))
+    if qualify and in_ext:
+        stem += "_" + in_ext[1:]
+    ext = SINK_FORMATS[fmt][0][0]
+    return os.path.join(out_dir or os.path.dirname(in_path), f"{stem}_converted{ext}")
+
+
+def _same_file_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def output_paths(in_paths, out_dir, fmt):
+    """
+    `output_path` for each input, never the same file twice. Inputs that
+    would share one (site.csv and site.xlsx) get their extension in the
+    name: site_csv_converted.csv, site_xlsx_converted.csv. Raises
+    ValueError if two still collide (the same file name in several
+    folders, converted into one out_dir).
+    """
+    plain = [output_path(p, out_dir, fmt) for p in in_paths]
+    counts = Counter(_same_file_key(p) for p in plain)
+    paths = [
+        output_path(p, out_dir, fmt, qualify=True) if counts[_same_file_key(o)] > 1 else o
+        for p, o in zip(in_paths, plain)
+    ]
+
+    seen = {}
+    for in_path, out in zip(in_paths, paths):
+        other = seen.setdefault(_same_file_key(out), in_path)
+        if other != in_path:
+            raise ValueError(
+                f"{other} and {in_path} would both be written to {out}; "
+                f"convert them into separate output folders."
+            )
+    return paths
+
+
+# ---------------------------
+# Worker side
+# ---------------------------
+def _warm_worker(src_crs_name, out_utm_zone, out_mutm_cm):
+    """
+    Pool initializer: import pandas / PROJ and build the transformers
+    once per worker process. They stay cached (transform's lru_cache)
+    for every file the worker converts afterwards.
+    """
+    try:
+        import parser  # noqa: F401  (pulls in pandas)
+        from transform import warm_up
+        warm_up(src_crs_name, out_utm_zone, out_mutm_cm)
+    except Exception:
+        pass    # the file itself will report the error
+
+
+def convert_file(spec, out_path, memo=None):
+    """
+    Convert one file and return its report record. Never raises: a bad
+    workbook is reported in "error" and the batch carries on.
+    """
+    timings = RunTimings()
+    record = dict.fromkeys(REPORT_COLUMNS, "")
+    record.update(input=spec.path, output=out_path, worker=os.getpid())
+
+    t0 = time.perf_counter()
+    try:
+        stats = run_job_to_file(spec, out_path, timings=timings, memo=memo)
+        record["bytes"] = stats["bytes"]
+        record["write_s"] = stats["seconds"]
+    except Exception as e:
+        record["error"] = str(e).splitlines()[0] if str(e) else type(e).__name__
+
+    record["seconds"] = time.perf_counter() - t0
+    record["points"] = timings.points
+    for phase, seconds in timings.seconds.items():
+        record[phase.replace(" ", "_") + "_s"] = seconds
+    return record
+
+
+# ---------------------------
+# Report
+# ---------------------------
+class BatchReport:
+    """Per-file records (in input order) plus batch wall time."""
+
+    def __init__(self, records, wall_seconds, workers):
+        self.records = records
+        self.wall_seconds = wall_seconds
+        self.workers = workers
+
+    @property
+    def failed(self):
+        return [r for r in self.records if r["error"]]
+
+    @property
+    def points(self):
+        return sum(r["points"] for r in self.records if not r["error"])
+
+    @property
+    def points_per_second(self):
+        return self.points / self.wall_seconds if self.wall_seconds else 0.0
+
+    def summary(self):
+        ok = len(self.records) - len(self.failed)
+        busy = sum(r["seconds"] for r in self.records)
+        return (
+            f"{ok:,} of {len(self.records):,} files converted, "
+            f"{len(self.failed):,} failed\n"
+            f"{self.points:,} points in {self.wall_seconds:.2f} s wall "
+            f"({self.points_per_second:,.0f} pts/s) on {self.workers} worker(s), "
+            f"{busy:.2f} s of file time"
+        )
+
+    def write_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+            writer.writeheader()
+            for r in self.records:
+                writer.writerow({
+                    k: f"{v:.4f}" if isinstance(v, float) else v
+                    for k, v in r.items()
+                })
+
+
+# ---------------------------
+# Driver
+# ---------------------------
+def run_batch(jobs, max_workers=None, progress=None, cancel=None, on_record=None):
+    """
+    Convert `jobs`, a list of (JobSpec, output path), one file per task.
+
+    Files are spread over `max_workers` processes (default: one per
+    core; 1 = in-process). Every worker is warmed up for the first
+    spec's settings before it takes a file. `progress(done, total)` and
+    `on_record(record)` are called as files finish (in completion
+    order); `cancel` stops handing out files and raises
+    ConversionCancelled. Returns a BatchReport.
+    """
+    total = len(jobs)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, total))
+    records = [None] * total
+    t0 = time.perf_counter()
+
+    def file_done(i, record, done):
+        records[i] = record
+        if on_record:
+            on_record(record)
+        if progress:
+            progress(done, total)
+        if cancel is not None and cancel.is_set():
+            raise ConversionCancelled()
+
+    if max_workers == 1:
+        for done, (i, (spec, out_path)) in enumerate(enumerate(jobs), 1):
+            file_done(i, convert_file(spec, out_path), done)
+    else:
+        first = jobs[0][0]
+        pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_warm_worker,
+            initargs=(first.src_crs, first.utm_zone, first.mutm_zone)
+        )
+        try:
+            futures = {
+                pool.submit(convert_file, spec, out_path): i
+                for i, (spec, out_path) in enumerate(jobs)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                file_done(futures[future], future.result(), done)
+        finally:
+            # On cancel, drop the files that have not started yet
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return BatchReport(records, time.perf_counter() - t0, max_workers)
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import shutil
+
+from pipeline import DEFAULT_CHUNK_SIZE
+from utils.run_timing import RunTimings
+
+# ============================================================
+# Checkpointed, resumable conversion to CSV / gzip CSV
+# ============================================================
+#
+# Every chunk is written as its own part file in <output>.parts/ and
+# recorded in checkpoint.json (input rows, part file, size, settings
+# hash) once it is safely on disk. A run that dies (out of memory,
+# reboot, Ctrl+C) is started again with the same settings and resumes
+# after the last recorded part; parts that were not finished are
+# rewritten, stale ones (other settings, changed input) are discarded.
+#
+# When all parts exist they are stitched: the remaining parts are
+# appended to the first one in the kernel (copy_file_range) and it is
+# renamed to the output path, so no finished part is re-encoded. CSV
+# parts after the first have no header, and gzip parts are separate
+# gzip members, which concatenate into one valid .gz file.
+#
+# The input itself is parsed again on resume (parse_file reads whole
+# files, and .xlsx has no byte offsets): the checkpoint's input offset
+# is the first row of the next chunk.
+
+CHECKPOINT_FORMATS = ("csv", "csv.gz")
+STATE_NAME = "checkpoint.json"
+STATE_VERSION = 1
+
+
+def parts_dir(path):
+    return path + ".parts"
+
+
+def settings_hash(spec, fmt, chunk_size):
+    """Identity of everything that shapes the output bytes."""
+    key = [
+        STATE_VERSION, list(spec.input_key()), spec.utm_zone, spec.mutm_zone,
+        list(spec.targets), fmt, chunk_size,
+    ]
+    return hashlib.sha256(json.dumps(key, default=str).encode()).hexdigest()
+
+
+def _fsync(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _append(src_path, dst_fd):
+    """Append a file to `dst_fd` (positioned at its end), in the kernel when possible."""
+    src = os.open(src_path, os.O_RDONLY)
+    try:
+        size = os.fstat(src).st_size
+        done = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while done < size:
+                    n = os.copy_file_range(src, dst_fd, size - done)
+                    if not n:
+                        break
+                    done += n
+            except OSError:
+                pass    # e.g. not supported by this filesystem: copy below
+        os.lseek(src, done, os.SEEK_SET)
+        while True:
+            data = os.read(src, 1 << 20)
+            if not data:
+                break
+            os.write(dst_fd, data)
+    finally:
+        os.close(src)
+
+
+class Checkpoint:
+    """
+    The parts finished so far for one output file. `parts` holds one
+    dict per part: index, start / stop (input rows), file, rows, bytes.
+    """
+
+    def __init__(self, out_path, digest):
+        self.out_path = out_path
+        self.dir = parts_dir(out_path)
+        self.state_path = os.path.join(self.dir, STATE_NAME)
+        self.digest = digest
+        self.parts = []
+        self.stitching = False
+
+        state = None
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+
+        if state is not None and state.get("settings") == digest:
+            self.parts = state["parts"]
+            self.stitching = state.get("stitching", False)
+            self._verify()
+        elif os.path.isdir(self.dir):
+            shutil.rmtree(self.dir)    # another job's (or a stale) checkpoint
+        os.makedirs(self.dir, exist_ok=True)
+
+    @property
+    def next_row(self):
+        return self.parts[-1]["stop"] if self.parts else 0
+
+    @property
+    def rows(self):
+        return sum(p["rows"] for p in self.parts)
+
+    @property
+    def bytes(self):
+        return sum(p["bytes"] for p in self.parts)
+
+    def part_path(self, index, fmt):
+        return os.path.join(self.dir, f"part-{index:05d}.{fmt}")
+
+    def add(self, start, stop, tmp_path, final_path, rows):
+        """Record a written part: fsync it, move it in place, save the state."""
+        _fsync(tmp_path)
+        os.replace(tmp_path, final_path)
+        self.parts.append({
+            "index": len(self.parts),
+            "start": start,
+            "stop": stop,
+            "file": os.path.basename(final_path),
+            "rows": rows,
+            "bytes": os.path.getsize(final_path),
+        })
+        self.save()
+
+    def save(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": STATE_VERSION,
+                "settings": self.digest,
+                "output": self.out_path,
+                "stitching": self.stitching,
+                "parts": self.parts,
+            }, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)
+
+    def stitch(self):
+        """Append parts 1.. to part 0 and move it to the output path."""
+        first = os.path.join(self.dir, self.parts[0]["file"])
+        self.stitching = True
+        self.save()
+
+        fd = os.open(first, os.O_WRONLY)
+        try:
+            os.lseek(fd, 0, os.SEEK_END)
+            for part in self.parts[1:]:
+                _append(os.path.join(self.dir, part["file"]), fd)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        os.replace(first, self.out_path)
+        shutil.rmtree(self.dir)
+
+    def _verify(self):
+        """
+        Keep the recorded parts that are intact on disk. Part 0 may have
+        been partly stitched (longer than recorded): it is cut back.
+        """
+        if self.stitching and os.path.exists(self.out_path) and not os.path.exists(
+            os.path.join(self.dir, self.parts[0]["file"])
+        ):
+            return    # stitched and moved; only the cleanup was missed
+
+        self.stitching = False
+        for i, part in enumerate(self.parts):
+            path = os.path.join(self.dir, part["file"])
+            size = os.path.getsize(path) if os.path.exists(path) else -1
+            if size > part["bytes"] and i == 0:
+                os.truncate(path, part["bytes"])
+            elif size != part["bytes"]:
+                del self.parts[i:]
+                break
+
+
+def run_job_resumable(spec, path, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                      progress=None, cancel=None, timings=None, memo=None):
+    """
+    run_job_to_file with chunk checkpoints (CSV / gzip CSV only): an
+    interrupted run with the same spec and output resumes where it
+    stopped. Returns the sink-style stats plus "resumed_rows" (output
+    rows taken over from an earlier run) and "parts".
+    """
+    from controllers.job import read_input
+    from pipeline import iter_transform
+    from sinks.factory import open_sink, sink_format
+
+    fmt = fmt or sink_format(path)
+    if fmt not in CHECKPOINT_FORMATS:
+        raise ValueError(
+            f"Resumable conversion writes {' / '.join(CHECKPOINT_FORMATS)} only, not {fmt}."
+        )
+    if timings is None:
+        timings = RunTimings()
+
+    checkpoint = Checkpoint(path, settings_hash(spec, fmt, chunk_size))
+    resumed = checkpoint.rows
+    n_parts = len(checkpoint.parts)
+
+    if checkpoint.stitching:    # everything was written; finish the cleanup
+        shutil.rmtree(checkpoint.dir)
+    else:
+        df_in, _ = read_input(spec, timings)
+        total = len(df_in)
+        timings.points = total
+
+        first = checkpoint.next_row
+        with timings.phase("transform"):
+            chunks = iter_transform(
+                df_in, spec.src_crs, spec.utm_zone, spec.mutm_zone, spec.targets,
+                chunk_size, progress, cancel, first=first, memo=memo
+            )
+            # Iterate `chunks` itself (not zipped with a range) so the
+            # generator runs to its end and reports the final progress
+            for i, chunk in enumerate(chunks):
+                start = first + i * chunk_size
+                index = len(checkpoint.parts)
+                final = checkpoint.part_path(index, fmt)
+                sink = open_sink(final + ".tmp", fmt, header=index == 0)
+                with sink:
+                    sink.write(chunk)
+                checkpoint.add(start, min(start + chunk_size, total), sink.path,
+                               final, sink.rows_written)
+
+            n_parts = len(checkpoint.parts)
+            checkpoint.stitch()
+
+    return {
+        "path": path,
+        "rows": checkpoint.rows,
+        "bytes": os.path.getsize(path),
+        "seconds": timings.seconds.get("transform", 0.0),
+        "resumed_rows": resumed,
+        "parts": n_parts,
+    }
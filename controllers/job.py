@@ -0,0 +1,202 @@
+from dataclasses import dataclass, field
+
+# numpy / pandas / parser are imported inside the functions: the GUI
+# and the CLI import this module before any conversion runs.
+from controllers.run_cache import RunCache, source_key
+from pipeline import ALL_TARGETS, normalize_order, convert_to_sink
+from utils.run_timing import RunTimings
+
+# ============================================================
+# Job spec + pure conversion entry point (no Tk)
+# ============================================================
+
+SOURCE_CRS = ("MUTM81", "MUTM84", "MUTM87", "WGS84", "UTM44", "UTM45")
+UTM_ZONES = (44, 45)
+MUTM_CMS = (81, 84, 87)
+WGS_FORMATS = ("DD", "DMS")
+
+
+def default_targets(src_crs):
+    """Every output family except the source's own (as in the GUI)."""
+    return tuple(
+        t for t, skip in (
+            ("WGS84", src_crs == "WGS84"),
+            ("UTM", src_crs.startswith("UTM")),
+            ("MUTM", src_crs.startswith("MUTM")),
+        ) if not skip
+    )
+
+
+def check_options(src_crs, utm_zone, mutm_zone, targets=None):
+    """
+    Validate conversion options (ValueError with a user-facing message).
+    Returns (utm_zone, mutm_zone, targets) normalized: ints, and the
+    targets in ALL_TARGETS order (`default_targets` if None).
+    """
+    if src_crs not in SOURCE_CRS:
+        raise ValueError(f"Unsupported source CRS: {src_crs}")
+
+    # Tk variables and JSON may hand over strings ("45")
+    try:
+        utm_zone, mutm_zone = int(utm_zone), int(mutm_zone)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid zone: {utm_zone!r} / {mutm_zone!r}")
+    if utm_zone not in UTM_ZONES:
+        raise ValueError(f"Unsupported UTM zone: {utm_zone}")
+    if mutm_zone not in MUTM_CMS:
+        raise ValueError(f"Unsupported MUTM central meridian: {mutm_zone}")
+
+    if targets is None:
+        targets = default_targets(src_crs)
+    elif isinstance(targets, str):
+        targets = (targets,)
+    unknown = set(targets) - set(ALL_TARGETS)
+    if unknown:
+        raise ValueError(f"Unknown output target: {', '.join(sorted(map(str, unknown)))}")
+
+    return utm_zone, mutm_zone, tuple(t for t in ALL_TARGETS if t in targets)
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """
+    Everything one conversion needs, as plain values.
+
+    Give either `text` (manual input, one point per line) or `path`
+    (.csv / .txt / .xlsx). `targets` defaults to `default_targets`.
+    `wgs_fmt` only affects the formatted preview table.
+
+    Specs are immutable and picklable, so they can be handed to thread
+    pools, worker processes and servers as they are.
+    """
+    src_crs: str
+    text: str = None
+    path: str = None
+    has_header: bool = True
+    utm_zone: int = 45
+    mutm_zone: int = 84
+    targets: tuple = None
+    wgs_fmt: str = "DD"
+
+    def __post_init__(self):
+        if (self.text is None) == (self.path is None):
+            raise ValueError("Give either manual text or an input file.")
+        utm_zone, mutm_zone, targets = check_options(
+            self.src_crs, self.utm_zone, self.mutm_zone, self.targets
+        )
+        object.__setattr__(self, "utm_zone", utm_zone)
+        object.__setattr__(self, "mutm_zone", mutm_zone)
+        object.__setattr__(self, "targets", targets)
+
+        if self.wgs_fmt not in WGS_FORMATS:
+            raise ValueError(f"Unsupported WGS84 format: {self.wgs_fmt}")
+
+    @property
+    def mode(self):
+        return "manual" if self.text is not None else "file"
+
+    def input_key(self):
+        """Identity of the input, for RunCache (see run_cache.source_key)."""
+        return source_key(self.src_crs, self.text, self.path, self.has_header)
+
+
+@dataclass
+class JobResult:
+    """
+    Numeric result columns (name -> array, see `pipeline.result_columns`),
+    the detected input coordinate order and the run's timings.
+    """
+    columns: dict
+    order: str
+    timings: RunTimings = field(default_factory=RunTimings)
+
+    def __len__(self):
+        return len(self.columns["Point"])
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+
+def read_input(spec, timings=None):
+    """Parse the spec's input and normalize the order. Returns (df_in, order)."""
+    from parser import parse_text, parse_file
+
+    if timings is None:
+        timings = RunTimings()
+
+    with timings.phase("parse"):
+        if spec.mode == "manual":
+            if not spec.text.strip():
+                raise ValueError("Please enter coordinate data.")
+            df_in = parse_text(spec.text, spec.src_crs)
+        else:
+            if not spec.path.strip():
+                raise ValueError("Please select a file.")
+            df_in = parse_file(spec.path, spec.has_header)
+
+    with timings.phase("order check"):
+        order = normalize_order(df_in, spec.src_crs)
+    return df_in, order
+
+
+def run_job(spec, progress=None, cancel=None, cache=None, timings=None):
+    """
+    Parse + transform one JobSpec. Returns a JobResult.
+
+    Pure: no Tk, no global state. `progress(done, total)` is called per
+    chunk and `cancel` (a threading.Event) stops the job between chunks
+    with ConversionCancelled. A RunCache lets a repeated run on the same
+    input skip parsing and the source → WGS84 leg.
+    """
+    if cache is None:
+        cache = RunCache()
+    if timings is None:
+        timings = RunTimings()
+
+    with timings.phase("transform"):
+        df_in, order, cols = cache.get(
+            spec.input_key(),
+            lambda: read_input(spec, timings),
+            spec.src_crs,
+            spec.utm_zone,
+            spec.mutm_zone,
+            targets=spec.targets,
+            progress=progress,
+            cancel=cancel
+        )
+    timings.points = len(df_in)
+    timings.cached = cache.hit
+
+    return JobResult(cols, order, timings)
+
+
+def run_job_to_file(spec, path, progress=None, cancel=None, timings=None, memo=None):
+    """
+    Convert straight into an output file, chunk by chunk, without
+    keeping the results. Returns the sink's stats. `memo`: an optional
+    controllers.point_memo.PointMemo.
+
+    With `timings`, the "transform" phase covers transforming and
+    writing; the sink's own share is in the stats' "seconds".
+    """
+    from sinks.factory import open_sink
+
+    if timings is None:
+        timings = RunTimings()
+
+    df_in, _ = read_input(spec, timings)
+    timings.points = len(df_in)
+
+    with timings.phase("transform"):
+        return convert_to_sink(
+            df_in,
+            open_sink(path),
+            spec.src_crs,
+            spec.utm_zone,
+            spec.mutm_zone,
+            targets=spec.targets,
+            progress=progress,
+            cancel=cancel,
+            memo=memo
+        )
@@ -0,0 +1,133 @@
+import math
+from collections import OrderedDict
+
+from pipeline import result_columns
+
+# ============================================================
+# Live (incremental) manual-input transform
+# ============================================================
+
+# Transform results kept per line, in the order transform_arrays returns them
+_RESULT_KEYS = ("lat", "lon", "utm_e", "utm_n", "mutm_e", "mutm_n")
+
+
+def _line_order(x, y, src_crs_name):
+    """
+    Per-line version of utils.order_check (same Nepal-specific rule);
+    None for a non-finite coordinate, which that check skips as well.
+    """
+    if not (math.isfinite(x) and math.isfinite(y)):
+        return None
+    if src_crs_name == "WGS84":
+        return "LATLON" if abs(x) < abs(y) else "LONLAT"
+    return "EN" if abs(x) < abs(y) else "NE"
+
+
+class LiveSession:
+    """
+    Re-transforms manual input incrementally.
+
+    Every non-blank line is cached with its parsed, order-normalized
+    coordinates and all transform legs, keyed by
+    (line text, source CRS, UTM zone, MUTM CM). On each update only the
+    lines that are new or edited since the last call are parsed and
+    transformed (in one vectorized call); everything else is a cache hit.
+
+    Not thread-safe: run at most one `update` at a time.
+    """
+
+    MAX_LINES = 200_000
+
+    def __init__(self):
+        self._cache = OrderedDict()
+        self.misses = 0    # lines parsed + transformed by the last update
+
+    def clear(self):
+        self._cache.clear()
+
+    def update(self, text, src_crs_name, out_utm_zone, out_mutm_cm):
+        """
+        Returns (df_in, order, cols): the order-normalized input frame
+        (Point, X, Y), the detected coordinate order and the numeric
+        result columns for every target (see `pipeline.result_columns`).
+        """
+        import numpy as np
+        import pandas as pd
+
+        from parser import parse_line
+        from transform import transform_arrays
+
+        settings = (src_crs_name, out_utm_zone, out_mutm_cm)
+        cache = self._cache
+
+        # ---------------------------
+        # Parse only new / edited lines
+        # ---------------------------
+        keys = []
+        new = {}
+        for ln, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            key = (line, *settings)
+            keys.append(key)
+            if key in cache or key in new:
+                continue
+
+            name, x, y = parse_line(line, ln)
+            order = _line_order(x, y, src_crs_name)
+            if order in ("NE", "LATLON"):
+                x, y = y, x
+            new[key] = (name, x, y, order)
+
+        # ---------------------------
+        # Transform them in one call
+        # ---------------------------
+        if new:
+            xs = np.fromiter((v[1] for v in new.values()), float, len(new))
+            ys = np.fromiter((v[2] for v in new.values()), float, len(new))
+            res = transform_arrays(xs, ys, src_crs_name, out_utm_zone, out_mutm_cm)
+            legs = zip(*(res[k].tolist() for k in _RESULT_KEYS))
+
+            for (key, parsed), leg in zip(new.items(), legs):
+                cache[key] = parsed + leg
+
+        self.misses = len(new)
+
+        if not keys:
+            raise ValueError("No valid coordinate rows found.")
+        rows = [cache[key] for key in keys]
+
+        if len(cache) > self.MAX_LINES:
+            # Keep the current text's lines, drop the least recently used
+            for key in keys:
+                cache.move_to_end(key)
+            while len(cache) > self.MAX_LINES:
+                cache.popitem(last=False)
+
+        # ---------------------------
+        # Same consistency rule as a full run
+        # ---------------------------
+        orders = {r[3] for r in rows} - {None}
+        if not orders:
+            raise ValueError("No valid coordinate rows found.")
+        if len(orders) > 1:
+            raise ValueError(
+                "Inconsistent coordinate order detected.\n\n"
+                "Some rows appear as X,Y while others appear as Y,X."
+            )
+        order = orders.pop()
+
+        names, xs, ys, line_orders, *legs = zip(*rows)
+        xs = np.array(xs, dtype=float)
+        ys = np.array(ys, dtype=float)
+        if order in ("NE", "LATLON"):
+            # Lines without an order of their own follow the others
+            skipped = np.array([o is None for o in line_orders])
+            xs[skipped], ys[skipped] = ys[skipped], xs[skipped]
+        df_in = pd.DataFrame({"Point": list(names), "X": xs, "Y": ys})
+        res = {k: np.array(v, dtype=float) for k, v in zip(_RESULT_KEYS, legs)}
+
+        cols = result_columns(
+            df_in["Point"].to_numpy(), res, out_utm_zone, out_mutm_cm
+        )
+        return df_in, order, cols
@@ -0,0 +1,110 @@
+import os
+
+from pipeline import ALL_TARGETS, DEFAULT_CHUNK_SIZE, iter_chunks, result_columns
+
+# ============================================================
+# Last-run cache: parsed input + WGS84 intermediate
+# ============================================================
+
+
+def source_key(src_crs, text=None, path=None, has_header=True):
+    """
+    Identity of an input: the manual `text` itself, or the file `path`
+    with its size and mtime (so an edited file is re-read).
+    """
+    if text is not None:
+        return ("manual", text, src_crs)
+
+    path = path.strip()
+    try:
+        st = os.stat(path)
+        stamp = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        stamp = None    # the parser reports the real error
+    return ("file", path, stamp, has_header, src_crs)
+
+
+class RunCache:
+    """
+    Keeps the parsed, order-normalized input and its (unrounded) WGS84
+    intermediate from the last run, keyed by `source_key` (JobSpec.input_key).
+
+    When the next run differs only in output settings (UTM zone, MUTM CM,
+    output checkboxes, DD/DMS) nothing is re-parsed and the source leg
+    is skipped; only output legs not computed before are transformed.
+    Each leg is cached too, so toggling back to an earlier zone is free.
+
+    One entry is kept. Not thread-safe: the GUI runs one job at a time.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._entry = None
+        self.hit = False    # whether the last `get` reused the entry
+
+    def clear(self):
+        self._key = self._entry = None
+
+    def get(self, key, load, src_crs_name, out_utm_zone, out_mutm_cm,
+            targets=ALL_TARGETS, chunk_size=DEFAULT_CHUNK_SIZE,
+            progress=None, cancel=None):
+        """
+        Returns (df_in, order, cols) like a full run.
+
+        `load()` must return (df_in, order) with X/Y already normalized;
+        it is only called when `key` differs from the cached one. The
+        source leg runs chunk by chunk with `progress` / `cancel`.
+        """
+        import numpy as np
+
+        from transform import to_wgs, to_utm, to_mutm
+
+        self.hit = key == self._key
+
+        if not self.hit:
+            self.clear()
+            df_in, order = load()
+
+            x = df_in["X"].to_numpy(dtype=float)
+            y = df_in["Y"].to_numpy(dtype=float)
+            lon = np.empty_like(x)
+            lat = np.empty_like(y)
+
+            if progress:
+                progress(0, len(x))
+            for start, stop in iter_chunks(len(x), chunk_size, progress, cancel):
+                lon[start:stop], lat[start:stop] = to_wgs(
+                    x[start:stop], y[start:stop], src_crs_name
+                )
+
+            self._key = key
+            self._entry = {
+                "df_in": df_in, "order": order,
+                "x": x, "y": y, "lon": lon, "lat": lat,
+                "legs": {},
+            }
+
+        e = self._entry
+        legs = e["legs"]
+
+        if "UTM" in targets and ("UTM", out_utm_zone) not in legs:
+            legs["UTM", out_utm_zone] = to_utm(e["lon"], e["lat"], out_utm_zone)
+        if "MUTM" in targets and ("MUTM", out_mutm_cm) not in legs:
+            legs["MUTM", out_mutm_cm] = to_mutm(
+                e["x"], e["y"], e["lon"], e["lat"], src_crs_name, out_mutm_cm
+            )
+
+        # Same rounding as transform.transform_arrays
+        res = {"lat": np.round(e["lat"], 8), "lon": np.round(e["lon"], 8)}
+        if "UTM" in targets:
+            utm_e, utm_n = legs["UTM", out_utm_zone]
+            res["utm_e"], res["utm_n"] = np.round(utm_e, 4), np.round(utm_n, 4)
+        if "MUTM" in targets:
+            mutm_e, mutm_n = legs["MUTM", out_mutm_cm]
+            res["mutm_e"], res["mutm_n"] = np.round(mutm_e, 4), np.round(mutm_n, 4)
+
+        cols = result_columns(
+            e["df_in"]["Point"].to_numpy(), res,
+            out_utm_zone, out_mutm_cm, targets
+        )
+        return e["df_in"], e["order"], cols
@@ -1,73 +1,117 @@
-import pandas as pd
-from parser import parse_text, parse_file, dd_to_dms
-from transform import transform_all
-from utils.order_check import check_consistent_order
+# numpy / pandas / parser are imported inside the worker-side functions:
+# the GUI imports this module before its first window is shown.
+from controllers.job import JobSpec, run_job, run_job_to_file
 from utils.formatters import fmt_latlon, fmt_xy
+from utils.run_timing import RunTimings
 
+# ============================================================
+# Tk glue: App widgets -> JobSpec, JobResult -> preview table
+# ============================================================
 
-def run_transform(app):
-    if app.mode.get() == "manual":
-        text = app.manual_text.get("1.0", "end")
-        if not text.strip():
-            raise ValueError("Please enter coordinate data.")
-        df_in = parse_text(text, app.src_crs.get())
-    else:
-        path = app.file_entry.get().strip()
-        if not path:
-            raise ValueError("Please select a file.")
-        df_in = parse_file(path, app.has_header.get())
-
-    order = check_consistent_order(
-        df_in["X"].astype(float),
-        df_in["Y"].astype(float),
-        app.src_crs.get()
+
+def read_spec(app):
+    """
+    Snapshot the Tk inputs into a JobSpec.
+
+    Must be called on the Tk thread; the spec is safe to hand to a
+    worker thread.
+    """
+    targets = []
+    if app.out_wgs.get():
+        targets.append("WGS84")
+    if app.out_utm.get():
+        targets.append("UTM")
+    if app.out_mutm.get():
+        targets.append("MUTM")
+
+    manual = app.mode.get() == "manual"
+    return JobSpec(
+        src_crs=app.src_crs.get(),
+        text=app.manual_text.get("1.0", "end") if manual else None,
+        path=None if manual else app.file_entry.get().strip(),
+        has_header=app.has_header.get(),
+        utm_zone=app.utm_zone.get(),
+        mutm_zone=app.mutm_zone.get(),
+        targets=tuple(targets),
+        wgs_fmt=app.wgs_fmt.get(),
     )
 
-    if order in ("NE", "LATLON"):
-        df_in[["X", "Y"]] = df_in[["Y", "X"]]
 
-    rows = transform_all(
-        df_in,
-        app.src_crs.get(),
-        int(app.utm_zone.get()),
-        int(app.mutm_zone.get())
+def transform_spec(spec, progress=None, cancel=None, cache=None, timings=None):
+    """
+    `run_job` + `format_outputs`: the preview table for a JobSpec.
+    Returns (df_out, outputs). Safe to run on a worker thread.
+    """
+    if timings is None:
+        timings = RunTimings()
+
+    result = run_job(spec, progress, cancel, cache, timings)
+    with timings.phase("format"):
+        return format_outputs(result.columns, spec)
+
+
+def transform_live(session, spec):
+    """
+    Live-mode counterpart of `transform_spec` for manual input:
+    only lines changed since the last call are parsed and transformed
+    (see controllers.live_controller.LiveSession).
+    """
+    _, _, columns = session.update(
+        spec.text, spec.src_crs, spec.utm_zone, spec.mutm_zone
     )
+    return format_outputs(columns, spec)
 
-    df_all = pd.DataFrame(rows, columns=[
-        "Point",
-        "WGS84_Lat", "WGS84_Lon",
-        "UTM_E", "UTM_N", "UTM_Zone",
-        "MUTM_E", "MUTM_N", "MUTM_CM"
-    ])
+
+def format_outputs(df_all, spec):
+    """
+    Preview table (formatted strings) from the numeric result columns
+    (a JobResult's `columns`). Returns (df_out, outputs).
+    """
+    import pandas as pd
+
+    from parser import dd_to_dms
 
     df_out = pd.DataFrame()
-    df_out["Point"] = df_in["Point"]
+    df_out["Point"] = df_all["Point"]
 
     outputs = []
+    targets = spec.targets
 
-    if app.out_wgs.get():
+    if "WGS84" in targets:
         outputs.append("WGS84")
+        lat = pd.Series(df_all["WGS84_Lat"], index=df_out.index)
+        lon = pd.Series(df_all["WGS84_Lon"], index=df_out.index)
 
-        if app.wgs_fmt.get() == "DMS":
-            lat = df_all["WGS84_Lat"].apply(lambda v: dd_to_dms(v, is_lat=True))
-            lon = df_all["WGS84_Lon"].apply(lambda v: dd_to_dms(v, is_lat=False))
+        if spec.wgs_fmt == "DMS":
+            lat = lat.apply(lambda v: dd_to_dms(v, is_lat=True))
+            lon = lon.apply(lambda v: dd_to_dms(v, is_lat=False))
         else:
-            lat = df_all["WGS84_Lat"].apply(fmt_latlon)
-            lon = df_all["WGS84_Lon"].apply(fmt_latlon)
+            lat = lat.apply(fmt_latlon)
+            lon = lon.apply(fmt_latlon)
 
         df_out["WGS84_Lat"] = lat
         df_out["WGS84_Lon"] = lon
 
-    if app.out_utm.get():
-        z = app.utm_zone.get()
+    if "UTM" in targets:
+        z = spec.utm_zone
         outputs.append(f"UTM{z}")
-        df_out[f"UTM{z}_E"] = df_all["UTM_E"].apply(fmt_xy)
-        df_out[f"UTM{z}_N"] = df_all["UTM_N"].apply(fmt_xy)
+        for axis in ("E", "N"):
+            col = f"UTM{z}_{axis}"
+            df_out[col] = pd.Series(df_all[col], index=df_out.index).apply(fmt_xy)
 
-    if app.out_mutm.get():
-        z = app.mutm_zone.get()
+    if "MUTM" in targets:
+        z = spec.mutm_zone
         outputs.append(f"MUTM{z}")
-        df_out[f"MUTM{z}_E"] = df_all["MUTM_E"].apply(fmt_xy)
-        df_out[f"MUTM{z}_N"] = df_all["MUTM_N"].apply(fmt_xy)
+        for axis in ("E", "N"):
+            col = f"MUTM{z}_{axis}"
+            df_out[col] = pd.Series(df_all[col], index=df_out.index).apply(fmt_xy)
 
     return df_out, outputs
+
+
+def run_transform(app, progress=None, cancel=None, cache=None, timings=None):
+    return transform_spec(read_spec(app), progress, cancel, cache, timings)
+
+
+def run_to_file(app, path, progress=None, cancel=None):
+    return run_job_to_file(read_spec(app), path, progress, cancel)
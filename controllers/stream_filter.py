@@ -0,0 +1,225 @@
+import io
+from itertools import chain, islice
+
+from controllers.job import check_options
+from pipeline import DEFAULT_CHUNK_SIZE
+
+# ============================================================
+# stdin -> stdout filter (python -m mutm filter), like PROJ's cs2cs
+# ============================================================
+#
+#   cat points.txt | python -m mutm filter -s MUTM84 -t WGS84 > out.csv
+#
+# Input lines follow the manual-input rules of parser.parse_line:
+# "x,y" or "name,x,y", comma or tab separated, values in any form
+# clean_angle accepts; blank lines are skipped. Lines are read, converted
+# and written `block_size` at a time, so memory stays flat for any
+# input length and output appears as each block is done.
+#
+# The first block fixes the stream's layout: its coordinate order (EN /
+# NE, LONLAT / LATLON, as the GUI's order check) and whether a Point
+# column is written. Points outside a projection are written as "*", and
+# so is a line that does not parse (its name kept, if it has one): the
+# stream carries on and the line number is reported through
+# `on_bad_line`, so the output keeps one row per input point.
+# Numbers are written with the engine's fixed precision: 8 decimals for
+# WGS84, 4 for Eastings / Northings.
+
+
+def _parse_slow(lines, first_ln, bad=None):
+    """
+    parse_line per line: DMS in mixed forms, and errors with line
+    numbers. With a `bad` list, a line that does not parse gets NaN
+    coordinates and its error is appended there instead of raised.
+    """
+    from parser import parse_line
+
+    rows = []
+    for ln, line in enumerate(lines, start=first_ln):
+        if not line.strip():
+            continue
+        try:
+            rows.append(parse_line(line, ln))
+        except ValueError as e:
+            message = str(e) if str(e).startswith("Line ") else f"Line {ln}: {e}"
+            if bad is None:
+                raise ValueError(message)
+            bad.append(message)
+            parts = line.split("," if "," in line else "\t")
+            name = parts[0].strip() if len(parts) == 3 else ""
+            rows.append([name, float("nan"), float("nan")])
+    names = [r[0] for r in rows]
+    return names, [r[1] for r in rows], [r[2] for r in rows], any(names)
+
+
+def _to_float(col):
+    """
+    A read_csv column as floats: numeric columns as they are, text
+    through to_numeric, and anything else (DMS, degree signs) through
+    clean_angle. ValueError for a value none of them accepts.
+    """
+    import pandas as pd
+
+    from parser import clean_angle
+
+    if pd.api.types.is_numeric_dtype(col):
+        return col.to_numpy(dtype=float)
+    if (col == "").any():
+        raise ValueError("missing value")
+    try:
+        return pd.to_numeric(col).to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        return col.map(clean_angle).to_numpy(dtype=float)
+
+
+def parse_block(lines, first_ln=1, bad=None):
+    """
+    Parse one block of input lines. Returns (names, x, y, has_names);
+    `first_ln` is the 1-based number of lines[0], for error messages.
+    `bad`: see _parse_slow.
+
+    Uniform blocks (one separator, always 2 or always 3 fields) go
+    through pandas' C reader in one call; anything else, or a value
+    that does not parse, falls back to parse_line per line.
+    """
+    import numpy as np
+    import pandas as pd
+
+    text = "".join(lines)
+    sep = "," if "," in text else "\t"
+    if sep == "," and "\t" in text:
+        return _parse_slow(lines, first_ln, bad)
+
+    try:
+        # Names stay text (no "007" -> 7); numbers are parsed in C
+        df = pd.read_csv(
+            io.StringIO(text), sep=sep, header=None, dtype={0: str},
+            keep_default_na=False, skip_blank_lines=True
+        )
+        if df.shape[1] not in (2, 3):
+            raise ValueError("not a uniform block")
+        x = _to_float(df.iloc[:, -2])
+        y = _to_float(df.iloc[:, -1])
+    except (ValueError, pd.errors.ParserError):
+        return _parse_slow(lines, first_ln, bad)
+
+    if df.shape[1] == 2:
+        return np.full(len(df), "", dtype=object), x, y, False
+    return df.iloc[:, 0].str.strip().to_numpy(dtype=object), x, y, True
+
+
+def format_block(cols, sep=","):
+    """
+    Delimited text for one block of result_columns. One %-format over
+    the whole block: several times faster than DataFrame.to_csv, which
+    converts every float through repr.
+    """
+    import numpy as np
+
+    fields, values = [], []
+    for name, v in cols.items():
+        if name == "Point":
+            fields.append("%s")
+            values.append(list(v))
+            continue
+        spec = "%.8f" if name.startswith("WGS84_") else "%.4f"
+        finite = np.isfinite(v)
+        if finite.all():
+            fields.append(spec)
+            values.append(v.tolist())
+        else:
+            fields.append("%s")
+            values.append([spec % x if ok else "*" for x, ok in zip(v.tolist(), finite)])
+
+    if not values or not len(values[0]):
+        return ""
+    row = sep.join(fields) + "\n"
+    return (row * len(values[0])) % tuple(chain.from_iterable(zip(*values)))
+
+
+def filter_stream(infile, outfile, src_crs, utm_zone=45, mutm_zone=84,
+                  targets=None, header=False, sep=",",
+                  block_size=DEFAULT_CHUNK_SIZE, memo=None, on_bad_line=None):
+    """
+    Convert coordinate lines from `infile` to delimited rows on
+    `outfile` (text file objects), one block at a time. `header`: the
+    first non-blank input line is a header; it is dropped and a header
+    row is written instead. `memo`: an optional PointMemo. A line that
+    does not parse is written as "*" and `on_bad_line(message)` is
+    called with its error. Returns {"lines", "points", "blocks",
+    "bad_lines"}. Raises ValueError for bad options or mixed orders.
+    """
+    import numpy as np
+
+    from pipeline import result_columns
+    from transform import transform_arrays
+    from utils.order_check import check_order_arrays
+
+    if memo is not None:
+        transform_arrays = memo.transform_arrays
+
+    utm_zone, mutm_zone, targets = check_options(src_crs, utm_zone, mutm_zone, targets)
+
+    stats = {"lines": 0, "points": 0, "blocks": 0, "bad_lines": 0}
+    order = None         # fixed by the first block
+    with_names = None    # write a Point column (first block has names)
+    header_pending = header
+
+    while True:
+        lines = list(islice(infile, block_size))
+        if not lines:
+            break
+        first_ln = stats["lines"] + 1
+        stats["lines"] += len(lines)
+
+        if header_pending:
+            blank = 0
+            while blank < len(lines) and not lines[blank].strip():
+                blank += 1
+            if blank == len(lines):
+                continue
+            del lines[:blank + 1]
+            first_ln += blank + 1
+            header_pending = False
+
+        bad = []
+        names, x, y, has_names = parse_block(lines, first_ln, bad)
+        if not len(x):
+            continue
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if (np.isfinite(x) & np.isfinite(y)).any():
+            block_order = check_order_arrays(x, y, src_crs)
+        else:
+            block_order = order    # nothing to tell the order from
+        if with_names is None:
+            with_names = has_names
+        if order is None:
+            order = block_order
+        elif block_order != order:
+            raise ValueError(
+                f"Inconsistent coordinate order detected near line {first_ln}.\n\n"
+                f"Earlier rows are {order}, these are {block_order}."
+            )
+        if order in ("NE", "LATLON"):
+            x, y = y, x
+
+        res = transform_arrays(x, y, src_crs, utm_zone, mutm_zone)
+        cols = result_columns(names, res, utm_zone, mutm_zone, targets)
+        if not with_names:
+            del cols["Point"]
+
+        if header and stats["blocks"] == 0:
+            outfile.write(sep.join(cols) + "\n")
+        outfile.write(format_block(cols, sep))
+        outfile.flush()
+        stats["points"] += len(x)
+        stats["blocks"] += 1
+
+        stats["bad_lines"] += len(bad)
+        if on_bad_line:
+            for message in bad:
+                on_bad_line(message)
+
+    return stats
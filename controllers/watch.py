@@ -0,0 +1,319 @@
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+from controllers.batch import (
+    INPUT_EXTENSIONS, REPORT_COLUMNS, convert_file, output_path, output_paths,
+)
+from controllers.job import JobSpec
+
+# ============================================================
+# Watch folder: convert new / changed survey files as they arrive
+# ============================================================
+
+LEDGER_NAME = ".mutm-ledger.json"
+
+
+def _is_input(name):
+    return name.lower().endswith(INPUT_EXTENSIONS) and not name.startswith(("~$", "."))
+
+
+def _signature(path):
+    """(size, mtime_ns), or None if the file is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def file_hash(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(block), b""):
+            h.update(data)
+    return h.hexdigest()
+
+
+# ---------------------------
+# Ledger
+# ---------------------------
+class Ledger:
+    """
+    Processed files, persisted as JSON: path -> size, mtime, sha256,
+    output and error. Rewritten atomically after every file, so a
+    restart (or a crash) never redoes finished work.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def is_done(self, path, signature):
+        """
+        True if `path` was processed in its current state. Size + mtime
+        are checked first; only when they differ is the file hashed, so
+        a touched but unchanged file is not converted again.
+        """
+        entry = self.entries.get(path)
+        if entry is None:
+            return False
+        if (entry["size"], entry["mtime_ns"]) == signature:
+            return True
+        if entry["sha256"] != file_hash(path):
+            return False
+
+        entry["size"], entry["mtime_ns"] = signature
+        self.save()
+        return True
+
+    def record(self, path, signature, sha256, output, error=""):
+        self.entries[path] = {
+            "size": signature[0],
+            "mtime_ns": signature[1],
+            "sha256": sha256,
+            "output": output,
+            "error": error,
+            "converted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.save()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+# ---------------------------
+# Change sources
+# ---------------------------
+class PollingWatcher:
+    """Rescans the folder; reports files whose size or mtime changed."""
+
+    def __init__(self, folder, interval=2.0):
+        self.folder = folder
+        self.interval = interval
+        self._seen = {}
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        changed = set()
+        seen = {}
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and _is_input(entry.name):
+                st = entry.stat()
+                seen[entry.path] = sig = (st.st_size, st.st_mtime_ns)
+                if self._seen.get(entry.path) != sig:
+                    changed.add(entry.path)
+        self._seen = seen
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify through libc (ctypes, no extra dependency). Reports
+    files that were closed after writing or moved into the folder.
+    Network shares written from other machines raise no events there:
+    use polling for those.
+    """
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_NONBLOCK = 0x800
+    IN_CLOEXEC = 0x80000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, folder):
+        self.folder = folder
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        wd = libc.inotify_add_watch(
+            self.fd, os.fsencode(folder), self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {folder}")
+
+    def wait(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        data = os.read(self.fd, 64 * 1024)
+        pos = 0
+        while pos < len(data):
+            _, _, _, length = self._EVENT.unpack_from(data, pos)
+            pos += self._EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0").decode(errors="surrogateescape")
+            pos += length
+            if _is_input(name):
+                changed.add(os.path.join(self.folder, name))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(folder, poll_interval=None):
+    """inotify on Linux, else (or with `poll_interval`) polling."""
+    if poll_interval is None and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(folder)
+        except (OSError, AttributeError):
+            pass    # no inotify (old libc, limits reached): poll instead
+    return PollingWatcher(folder, poll_interval or 2.0)
+
+
+# ---------------------------
+# Daemon
+# ---------------------------
+class FolderWatcher:
+    """
+    Converts every new or changed input file in `folder` into `out_dir`.
+
+    `job_options` are the JobSpec fields other than the path (src_crs,
+    zones, targets, has_header). A file is converted once it has not
+    changed for `settle` seconds (crews copy large workbooks over slow
+    links), in the calling process, so the transformers built by the
+    first file stay cached for all later ones.
+    """
+
+    def __init__(self, folder, out_dir, job_options, fmt="csv",
+                 ledger_path=None, poll_interval=None, settle=1.0,
+                 on_record=None, memo=None):
+        self.folder = os.path.abspath(folder)
+        self.out_dir = os.path.abspath(out_dir)
+        if self.folder == self.out_dir:
+            raise ValueError("The output folder must differ from the watched folder.")
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        JobSpec(path="", **job_options)    # validate the options now
+        self.job_options = job_options
+        self.fmt = fmt
+        self.settle = settle
+        self.on_record = on_record
+        self.memo = memo
+
+        self.ledger = Ledger(ledger_path or os.path.join(self.out_dir, LEDGER_NAME))
+        self.watcher = open_watcher(self.folder, poll_interval)
+        self._pending = {}    # path -> (signature, first seen unchanged at)
+
+    def scan(self):
+        """Queue every input file not processed in its current state."""
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and _is_input(entry.name):
+                self._mark(entry.path)
+
+    def run(self, stop=None):
+        """Watch until `stop` (a threading.Event) is set or Ctrl+C."""
+        from pipeline import start_warm_up
+
+        start_warm_up(
+            self.job_options["src_crs"],
+            self.job_options.get("utm_zone", 45),
+            self.job_options.get("mutm_zone", 84)
+        )
+        self.scan()
+        try:
+            while stop is None or not stop.is_set():
+                timeout = self.settle if self._pending else 1.0
+                for path in self.watcher.wait(timeout):
+                    self._mark(path)
+                self.process_ready()
+        finally:
+            self.watcher.close()
+
+    def process_ready(self):
+        """Convert pending files that have settled. Returns their records."""
+        now = time.monotonic()
+        records = []
+
+        for path, (sig, since) in sorted(self._pending.items(), key=lambda kv: kv[1][1]):
+            current = _signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != sig:
+                self._pending[path] = (current, now)
+            elif now - since >= self.settle:
+                del self._pending[path]
+                if not self.ledger.is_done(path, current):
+                    records.append(self._convert(path, current))
+        return records
+
+    def _mark(self, path):
+        sig = _signature(path)
+        if sig is None or self.ledger.is_done(path, sig):
+            return
+        if path not in self._pending or self._pending[path][0] != sig:
+            self._pending[path] = (sig, time.monotonic())
+
+    def _output_path(self, path):
+        """
+        Output file for `path`. A file converted before keeps the output
+        recorded in the ledger (if it is still in out_dir, in this
+        format). A new one gets a name no other input has: site.csv and
+        site.xlsx arriving together go to site_csv_converted.csv and
+        site_xlsx_converted.csv; site.xlsx arriving after site.csv was
+        written to site_converted.csv goes to site_xlsx_converted.csv.
+        Raises ValueError if even that name is taken.
+        """
+        recorded = {
+            p: e["output"] for p, e in self.ledger.entries.items()
+            if os.path.dirname(p) == self.folder and e["output"]
+        }
+        plain = output_path(path, self.out_dir, self.fmt)
+        kept = recorded.pop(path, None)
+        if kept and os.path.dirname(kept) == self.out_dir and (
+            os.path.splitext(kept)[1] == os.path.splitext(plain)[1]
+        ):
+            return kept
+
+        inputs = {
+            entry.path for entry in os.scandir(self.folder)
+            if entry.is_file() and _is_input(entry.name) and entry.path not in recorded
+        }
+        inputs.add(path)
+        inputs = sorted(inputs)
+        out = output_paths(inputs, self.out_dir, self.fmt)[inputs.index(path)]
+
+        taken = {os.path.normcase(o): p for p, o in recorded.items()}
+        if os.path.normcase(out) in taken:
+            out = output_path(path, self.out_dir, self.fmt, qualify=True)
+            other = taken.get(os.path.normcase(out))
+            if other:
+                raise ValueError(f"{out} is already the output of {other}.")
+        return out
+
+    def _convert(self, path, sig):
+        sha256 = file_hash(path)
+        spec = JobSpec(path=path, **self.job_options)
+        try:
+            record = convert_file(spec, self._output_path(path), self.memo)
+        except ValueError as e:    # no free output name: report it like a bad file
+            record = dict.fromkeys(REPORT_COLUMNS, "")
+            record.update(input=path, points=0, error=str(e))
+
+        # A failed file is not retried until it changes
+        self.ledger.record(path, sig, sha256, record["output"], record["error"])
+        if self.on_record:
+            self.on_record(record)
+        return record
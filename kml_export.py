@@ -1,4 +1,31 @@
-from xml.etree.ElementTree import Element, SubElement, ElementTree
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree.ElementTree import Element, SubElement, ElementTree, tostring
+
+import numpy as np
+
+from pipeline import ConversionCancelled
+
+KML_NS = "http://www.opengis.net/kml/2.2"
+PROGRESS_EVERY = 5000
+
+
+def _add_placemark(parent, i, pt, lat, lon):
+    placemark = SubElement(parent, "Placemark")
+
+    pname = SubElement(placemark, "name")
+    pname.text = str(pt) if pt else f"Point {i + 1}"
+
+    pdesc = SubElement(placemark, "description")
+    pdesc.text = f"Latitude: {lat}\nLongitude: {lon}"
+
+    point = SubElement(placemark, "Point")
+    coords = SubElement(point, "coordinates")
+
+    # KML order is lon,lat[,alt]
+    coords.text = f"{lon},{lat},0"
 
 
 def export_to_kml(
@@ -6,7 +33,9 @@ def export_to_kml(
     names,
     lats,
     lons,
-    crs_name: str = "WGS84"
+    crs_name: str = "WGS84",
+    progress=None,
+    cancel=None
 ):
     """
     Export point data to a KML file.
@@ -23,9 +52,15 @@ def export_to_kml(
         Longitudes in decimal degrees
     crs_name : str
         Source CRS name for description
+    progress : callable or None
+        Called as progress(done, total) every PROGRESS_EVERY placemarks
+    cancel : threading.Event or None
+        When set, stops before anything is written and raises
+        ConversionCancelled
     """
 
-    kml = Element("kml", xmlns="http://www.opengis.net/kml/2.2")
+    total = len(lats)
+    kml = Element("kml", xmlns=KML_NS)
     doc = SubElement(kml, "Document")
 
     name = SubElement(doc, "name")
@@ -35,22 +70,267 @@ def export_to_kml(
     desc.text = f"Exported from {crs_name}"
 
     for i, (pt, lat, lon) in enumerate(zip(names, lats, lons)):
-        placemark = SubElement(doc, "Placemark")
-
-        pname = SubElement(placemark, "name")
-        pname.text = str(pt) if pt else f"Point {i + 1}"
+        _add_placemark(doc, i, pt, lat, lon)
 
-        pdesc = SubElement(placemark, "description")
-        pdesc.text = f"Latitude: {lat}\nLongitude: {lon}"
+        if (i + 1) % PROGRESS_EVERY == 0:
+            if cancel is not None and cancel.is_set():
+                raise ConversionCancelled()
+            if progress:
+                progress(i + 1, total)
 
-        point = SubElement(placemark, "Point")
-        coords = SubElement(point, "coordinates")
-
-        # KML order is lon,lat[,alt]
-        coords.text = f"{lon},{lat},0"
+    if progress:
+        progress(total, total)
 
     ElementTree(kml).write(
         filepath,
         encoding="utf-8",
         xml_declaration=True
     )
+
+
+# ============================================================
+# Region-based tiled KMZ (quadtree + NetworkLinks)
+# ============================================================
+
+def _build_quadtree(lons, lats, idx, bbox, key, max_points, max_depth, tiles):
+    """
+    Recursively split `idx` into quadrants until every tile holds at
+    most `max_points` points. Returns the node dict for `key`.
+    """
+    west, south, east, north = bbox
+    node = {"key": key, "bbox": bbox, "children": [], "idx": None}
+
+    if len(idx) <= max_points or len(key) >= max_depth:
+        node["idx"] = idx
+        tiles.append(node)
+        return node
+
+    mid_lon = (west + east) / 2
+    mid_lat = (south + north) / 2
+    east_half = lons[idx] >= mid_lon
+    north_half = lats[idx] >= mid_lat
+
+    # Quadrant digits: 0=SW, 1=SE, 2=NW, 3=NE
+    quads = (
+        ("0", ~east_half & ~north_half, (west, south, mid_lon, mid_lat)),
+        ("1", east_half & ~north_half, (mid_lon, south, east, mid_lat)),
+        ("2", ~east_half & north_half, (west, mid_lat, mid_lon, north)),
+        ("3", east_half & north_half, (mid_lon, mid_lat, east, north)),
+    )
+
+    for digit, mask, child_bbox in quads:
+        child_idx = idx[mask]
+        if len(child_idx):
+            node["children"].append(_build_quadtree(
+                lons, lats, child_idx, child_bbox, key + digit,
+                max_points, max_depth, tiles
+            ))
+
+    return node
+
+
+def _tile_path(key):
+    return f"tiles/{key or 'root'}.kml"
+
+
+def _add_region(parent, bbox, min_lod, max_lod=-1):
+    west, south, east, north = bbox
+    region = SubElement(parent, "Region")
+    box = SubElement(region, "LatLonAltBox")
+    for tag, value in (
+        ("north", north), ("south", south),
+        ("east", east), ("west", west)
+    ):
+        SubElement(box, tag).text = repr(float(value))
+
+    lod = SubElement(region, "Lod")
+    SubElement(lod, "minLodPixels").text = str(min_lod)
+    SubElement(lod, "maxLodPixels").text = str(max_lod)
+
+
+def _render_node(node, crs_name, min_lod, href_prefix):
+    """Render an internal quadtree node: NetworkLinks to each child."""
+    kml = Element("kml", xmlns=KML_NS)
+    doc = SubElement(kml, "Document")
+    SubElement(doc, "name").text = node["key"] or "Coordinate Export"
+    if not node["key"]:
+        SubElement(doc, "description").text = f"Exported from {crs_name}"
+
+    for child in node["children"]:
+        link = SubElement(doc, "NetworkLink")
+        SubElement(link, "name").text = child["key"]
+        _add_region(link, child["bbox"], min_lod)
+
+        href = SubElement(link, "Link")
+        SubElement(href, "href").text = href_prefix + _tile_path(child["key"])
+        SubElement(href, "viewRefreshMode").text = "onRegion"
+
+    return tostring(kml, encoding="utf-8", xml_declaration=True)
+
+
+def _render_tile(args):
+    """Render a leaf tile (runs in a worker process)."""
+    key, bbox, min_lod, offsets, names, lats, lons = args
+
+    kml = Element("kml", xmlns=KML_NS)
+    doc = SubElement(kml, "Document")
+    SubElement(doc, "name").text = key
+    _add_region(doc, bbox, min_lod)
+
+    for i, pt, lat, lon in zip(offsets, names, lats, lons):
+        _add_placemark(doc, i, pt, lat, lon)
+
+    return _tile_path(key), tostring(kml, encoding="utf-8", xml_declaration=True)
+
+
+def _write_kmz(filepath, root, jobs, crs_name, min_lod_pixels,
+               max_workers, progress, cancel):
+    total = len(jobs)
+
+    def tile_done(done):
+        if progress:
+            progress(done, total)
+        if cancel is not None and cancel.is_set():
+            raise ConversionCancelled()
+
+    with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED) as kmz:
+
+        # ---------------------------
+        # Root document (must be first entry in a KMZ)
+        # ---------------------------
+        if root["children"]:
+            kmz.writestr("doc.kml", _render_node(root, crs_name, min_lod_pixels, ""))
+        else:
+            # Single tile: the root document is the tile itself, shown
+            # at any zoom (a Region there would hide every point)
+            key, bbox, _, *points = jobs[0]
+            _, data = _render_tile((key, bbox, -1, *points))
+            kmz.writestr("doc.kml", data)
+            tile_done(1)
+            return
+
+        stack = list(root["children"])
+        while stack:
+            node = stack.pop()
+            if node["children"]:
+                kmz.writestr(
+                    _tile_path(node["key"]),
+                    _render_node(node, crs_name, min_lod_pixels, "../")
+                )
+                stack.extend(node["children"])
+
+        # ---------------------------
+        # Leaf tiles (rendered in parallel)
+        # ---------------------------
+        if max_workers == 1 or len(jobs) == 1:
+            for done, (path, data) in enumerate(map(_render_tile, jobs), 1):
+                kmz.writestr(path, data)
+                tile_done(done)
+        else:
+            # spawn, not fork: this runs on a worker thread of the Tk app,
+            # and forking a threaded Tk process is unsafe
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            try:
+                results = pool.map(_render_tile, jobs, chunksize=4)
+                for done, (path, data) in enumerate(results, 1):
+                    kmz.writestr(path, data)
+                    tile_done(done)
+            finally:
+                # On cancel, drop the tiles that have not started yet
+                pool.shutdown(wait=True, cancel_futures=True)
+
+
+def export_to_kmz_tiled(
+    filepath: str,
+    names,
+    lats,
+    lons,
+    crs_name: str = "WGS84",
+    max_points_per_tile: int = 2000,
+    max_depth: int = 16,
+    min_lod_pixels: int = 128,
+    max_workers: int = None,
+    progress=None,
+    cancel=None
+):
+    """
+    Export point data to a Region-based tiled KMZ.
+
+    Points are bucketed into a quadtree over their WGS84 extent. Each
+    leaf tile is its own KML carrying a <Region>/<Lod>, and internal
+    nodes link their children through NetworkLinks, so Google Earth
+    only loads the tiles that are on screen.
+
+    Parameters
+    ----------
+    filepath : str
+        Output .kmz file path
+    names, lats, lons : iterable
+        Same as `export_to_kml`
+    crs_name : str
+        Source CRS name for description
+    max_points_per_tile : int
+        Split a tile once it holds more points than this
+    max_depth : int
+        Maximum quadtree depth (guards against stacked duplicates)
+    min_lod_pixels : int
+        On-screen size a Region must reach before it is loaded
+    max_workers : int or None
+        Worker processes used to render tiles (1 = render in-process)
+    progress : callable or None
+        Called as progress(tiles_done, tiles_total) per leaf tile
+    cancel : threading.Event or None
+        When set, stops between tiles, removes the partial file and
+        raises ConversionCancelled
+
+    Points without finite coordinates (outside a projection) are left
+    out.
+
+    Returns
+    -------
+    int
+        Number of leaf tiles written
+    """
+
+    names = ["" if n is None else n for n in names]
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+
+    if not len(lats):
+        raise ValueError("No points to export.")
+
+    idx = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+    if not len(idx):
+        raise ValueError("No points with valid coordinates to export.")
+
+    bbox = (lons[idx].min(), lats[idx].min(), lons[idx].max(), lats[idx].max())
+    tiles = []
+    root = _build_quadtree(
+        lons, lats, idx, bbox, "",
+        max_points_per_tile, max_depth, tiles
+    )
+
+    jobs = [
+        (
+            t["key"], t["bbox"], min_lod_pixels,
+            t["idx"].tolist(),
+            [names[i] for i in t["idx"]],
+            lats[t["idx"]].tolist(),
+            lons[t["idx"]].tolist(),
+        )
+        for t in tiles
+    ]
+
+    try:
+        _write_kmz(filepath, root, jobs, crs_name, min_lod_pixels,
+                   max_workers, progress, cancel)
+    except ConversionCancelled:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise
+
+    return len(tiles)
+
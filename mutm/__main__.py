@@ -0,0 +1,7 @@
+import sys
+
+from mutm.cli import main
+
+# Guarded: worker processes re-import this module under "spawn"
+if __name__ == "__main__":
+    sys.exit(main())
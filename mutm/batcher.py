@@ -0,0 +1,116 @@
+import asyncio
+
+# ============================================================
+# Request micro-batching for the HTTP service
+# ============================================================
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent small transform calls into one vectorized call.
+
+    `submit(key, x, y)` queues the points under `key` (the settings,
+    e.g. (src_crs, utm_zone, mutm_zone)). While transforms are running,
+    a batch is flushed `window` seconds after its first request, or as
+    soon as it holds `max_points`; when the batcher is idle it is
+    flushed on the next event-loop pass, so light traffic pays no
+    window. `fn(key, xs, ys)` runs once on `executor` over the
+    concatenated points and returns a dict of arrays, which is sliced
+    back to each caller.
+
+    If the merged call fails, the requests are retried one by one so a
+    single bad request cannot fail the others.
+
+    Must be used from one event loop.
+    """
+
+    def __init__(self, fn, executor, window=0.002, max_points=20_000):
+        self.fn = fn
+        self.executor = executor
+        self.window = window
+        self.max_points = max_points
+
+        self._open = {}    # key -> [items, points, timer]
+        self._tasks = set()    # batches being transformed
+
+        # Counters for /health and benchmarks
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, key, x, y):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._open.get(key)
+        if batch is None:
+            timer = (
+                loop.call_later(self.window, self._flush, key) if self._tasks
+                else loop.call_soon(self._flush, key)
+            )
+            batch = self._open[key] = [[], 0, timer]
+
+        batch[0].append((x, y, future))
+        batch[1] += len(x)
+        if batch[1] >= self.max_points:
+            batch[2].cancel()
+            self._flush(key)
+
+        return await future
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch": self.requests / self.batches if self.batches else 0.0,
+            "window_ms": self.window * 1000,
+            "max_points": self.max_points,
+        }
+
+    # ---------------------------
+    # Internals
+    # ---------------------------
+    def _flush(self, key):
+        batch = self._open.pop(key, None)
+        if batch is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(key, batch[0]))
+        self._tasks.add(task)    # keep a reference until it finishes
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key, items):
+        import numpy as np
+
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.requests += len(items)
+
+        if len(items) == 1:
+            await self._resolve(loop, key, *items[0])
+            return
+
+        xs = np.concatenate([x for x, _, _ in items])
+        ys = np.concatenate([y for _, y, _ in items])
+        try:
+            res = await loop.run_in_executor(self.executor, self.fn, key, xs, ys)
+        except Exception:
+            for item in items:
+                await self._resolve(loop, key, *item)
+            return
+
+        start = 0
+        for x, _, future in items:
+            stop = start + len(x)
+            if not future.done():    # the caller may have gone away
+                future.set_result({k: v[start:stop] for k, v in res.items()})
+            start = stop
+
+    async def _resolve(self, loop, key, x, y, future):
+        """Run one request on its own."""
+        try:
+            res = await loop.run_in_executor(self.executor, self.fn, key, x, y)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(res)
@@ -0,0 +1,379 @@
+import argparse
+import os
+import sys
+import time
+
+# Headless entry point: must never import tkinter / ttkbootstrap (or the
+# ui package). numpy / pandas / pyproj are pulled in by the controllers
+# only once a file is actually converted.
+from controllers.batch import find_inputs, output_paths, run_batch
+from controllers.checkpoint import run_job_resumable
+from controllers.point_memo import DEFAULT_MAX_BYTES, PointMemo
+from controllers.job import SOURCE_CRS, UTM_ZONES, MUTM_CMS, JobSpec, run_job_to_file
+from controllers.stream_filter import filter_stream
+from controllers.watch import LEDGER_NAME, FolderWatcher
+
+# ============================================================
+# Command-line interface:  python -m mutm convert|batch|watch|serve|filter
+# ============================================================
+
+
+def _parse_targets(value):
+    targets = tuple(t.strip().upper() for t in value.split(",") if t.strip())
+    bad = [t for t in targets if t not in ("WGS84", "UTM", "MUTM")]
+    if bad or not targets:
+        raise argparse.ArgumentTypeError(
+            f"invalid target(s) {', '.join(bad) or value!r}; use WGS84,UTM,MUTM"
+        )
+    return targets
+
+
+def build_parser():
+    from sinks.factory import SINK_FORMATS
+
+    parser = argparse.ArgumentParser(
+        prog="python -m mutm",
+        description="Convert survey coordinates between MUTM, UTM and WGS84."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_inputs_arg(cmd):
+        cmd.add_argument("inputs", nargs="+", metavar="INPUT",
+                         help="input file, directory or glob pattern (e.g. 'data/*.csv')")
+
+    def add_crs_args(cmd):
+        cmd.add_argument("-s", "--src", required=True, choices=SOURCE_CRS,
+                         help="source coordinate system")
+        cmd.add_argument("--utm-zone", type=int, default=45, choices=UTM_ZONES,
+                         help="output UTM zone (default: 45)")
+        cmd.add_argument("--mutm-cm", type=int, default=84, choices=MUTM_CMS,
+                         help="output MUTM central meridian (default: 84)")
+        cmd.add_argument("-t", "--targets", type=_parse_targets,
+                         help="comma-separated outputs, e.g. WGS84,UTM "
+                              "(default: all except the source's own)")
+
+    def add_job_args(cmd):
+        add_crs_args(cmd)
+        cmd.add_argument("--no-header", dest="has_header", action="store_false",
+                         help="input files have no header row")
+        cmd.add_argument("-q", "--quiet", action="store_true",
+                         help="only report errors")
+
+    def add_memo_args(cmd):
+        cmd.add_argument("--memo", metavar="FILE",
+                         help="memo file of converted points: repeated "
+                              "points (control stations) are looked up, not "
+                              "recomputed; hit rates are reported")
+        cmd.add_argument("--memo-size", type=float, metavar="MB",
+                         default=DEFAULT_MAX_BYTES / 2**20,
+                         help="size of a new memo file; least recently used "
+                              f"points are evicted (default: {DEFAULT_MAX_BYTES // 2**20})")
+
+    def add_out_dir_args(cmd):
+        cmd.add_argument("-d", "--out-dir",
+                         help="directory for <stem>_converted.<ext> outputs "
+                              "(default: next to each input)")
+        cmd.add_argument("-f", "--format", choices=list(SINK_FORMATS), default="csv",
+                         help="output format with --out-dir (default: csv)")
+
+    # ---------------------------
+    # convert
+    # ---------------------------
+    convert = commands.add_parser(
+        "convert",
+        help="convert .csv / .txt / .xlsx files to any output format",
+        description="Convert input files one after another with the same "
+                    "parser and transform engine as the GUI."
+    )
+    add_inputs_arg(convert)
+    add_job_args(convert)
+    add_out_dir_args(convert)
+    add_memo_args(convert)
+    convert.add_argument("-o", "--output",
+                         help="output file (single input only); the format "
+                              "follows the extension")
+    convert.add_argument("--resume", action="store_true",
+                         help="checkpoint every chunk in <output>.parts/ and "
+                              "resume an interrupted run (csv / csv.gz only)")
+    convert.set_defaults(func=cmd_convert)
+
+    # ---------------------------
+    # batch
+    # ---------------------------
+    batch = commands.add_parser(
+        "batch",
+        help="convert many files in parallel worker processes",
+        description="Convert every input file on a process pool (one file "
+                    "per task) and print a per-file timing report."
+    )
+    add_inputs_arg(batch)
+    add_job_args(batch)
+    add_out_dir_args(batch)
+    batch.add_argument("-j", "--jobs", type=int, default=None,
+                       help="worker processes (default: one per core)")
+    batch.add_argument("--report",
+                       help="also write the per-file report to this CSV file")
+    batch.set_defaults(func=cmd_batch)
+
+    # ---------------------------
+    # watch
+    # ---------------------------
+    watch = commands.add_parser(
+        "watch",
+        help="convert files as they are dropped into a folder",
+        description="Watch a folder (inotify on Linux, else polling) and convert "
+                    "new or changed files into an output folder. Processed files "
+                    "are kept in a ledger, so restarts skip finished work. "
+                    "Stop with Ctrl+C."
+    )
+    watch.add_argument("folder", help="folder to watch")
+    add_job_args(watch)
+    watch.add_argument("-d", "--out-dir", required=True,
+                       help="output folder (must differ from the watched one)")
+    watch.add_argument("-f", "--format", choices=list(SINK_FORMATS), default="csv",
+                       help="output format (default: csv)")
+    watch.add_argument("--poll", type=float, metavar="SECONDS",
+                       help="poll every SECONDS instead of using inotify "
+                            "(network shares)")
+    watch.add_argument("--settle", type=float, default=1.0, metavar="SECONDS",
+                       help="convert a file once unchanged this long (default: 1)")
+    watch.add_argument("--ledger",
+                       help=f"ledger file (default: <out-dir>/{LEDGER_NAME})")
+    add_memo_args(watch)
+    watch.set_defaults(func=cmd_watch)
+
+    # ---------------------------
+    # serve
+    # ---------------------------
+    serve = commands.add_parser(
+        "serve",
+        help="run the local HTTP conversion service",
+        description="Serve the transform engine over HTTP (POST /convert with "
+                    "JSON point batches). See mutm/server.py for the API."
+    )
+    serve.add_argument("--host", default="127.0.0.1",
+                       help="address to bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8765,
+                       help="port (default: 8765)")
+    serve.add_argument("--workers", type=int,
+                       help="transform threads (default: up to 4)")
+    serve.add_argument("--batch-window-ms", type=float, default=2.0,
+                       help="merge small concurrent requests arriving within "
+                            "this window (default: 2; 0 = same loop pass only)")
+    serve.add_argument("--batch-max-points", type=int, default=20_000,
+                       help="flush a merged batch at this many points "
+                            "(default: 20000)")
+    serve.add_argument("--no-batching", action="store_true",
+                       help="one transform call per request")
+    serve.add_argument("-q", "--quiet", action="store_true",
+                       help="no start-up message")
+    serve.set_defaults(func=cmd_serve)
+
+    # ---------------------------
+    # filter
+    # ---------------------------
+    filt = commands.add_parser(
+        "filter",
+        help="convert coordinate lines from stdin to stdout (like cs2cs)",
+        description="Read 'x,y' or 'name,x,y' lines (comma or tab, any angle "
+                    "form the GUI accepts) from stdin and write converted rows "
+                    "to stdout, a block of lines at a time. Points outside a "
+                    "projection, and lines that do not parse, are written as "
+                    "'*'; bad lines are reported on stderr."
+    )
+    add_crs_args(filt)
+    filt.add_argument("--header", action="store_true",
+                      help="the first input line is a header; write an "
+                           "output header instead")
+    filt.add_argument("--tab", dest="sep", action="store_const", const="\t",
+                      default=",", help="tab-separated output (default: comma)")
+    filt.add_argument("-b", "--block", type=int, default=50_000,
+                      help="lines per block (default: 50000)")
+    add_memo_args(filt)
+    filt.set_defaults(func=cmd_filter)
+
+    return parser
+
+
+def _job_specs(args):
+    """(JobSpec, output path) per input file."""
+    inputs = find_inputs(args.inputs)
+    output = getattr(args, "output", None)    # convert only
+    if output and len(inputs) > 1:
+        raise ValueError("--output takes a single input; use --out-dir for several")
+    if output and args.out_dir:
+        raise ValueError("--output and --out-dir cannot be combined")
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    outputs = [output] if output else output_paths(inputs, args.out_dir, args.format)
+
+    return [
+        (
+            JobSpec(
+                src_crs=args.src,
+                path=in_path,
+                has_header=args.has_header,
+                utm_zone=args.utm_zone,
+                mutm_zone=args.mutm_cm,
+                targets=args.targets,
+            ),
+            out_path,
+        )
+        for in_path, out_path in zip(inputs, outputs)
+    ]
+
+
+def _open_memo(args):
+    if not args.memo:
+        return None
+    if args.memo_size <= 0:
+        raise ValueError("--memo-size must be positive")
+    return PointMemo(args.memo, max_bytes=int(args.memo_size * 2**20))
+
+
+def cmd_convert(args):
+    jobs = _job_specs(args)
+    memo = _open_memo(args)
+    try:
+        failed = _convert_all(args, jobs, memo)
+        if memo and not args.quiet:
+            print(memo.summary())
+    finally:
+        if memo:
+            memo.close()
+    return 1 if failed else 0
+
+
+def _convert_all(args, jobs, memo):
+    """Convert each (spec, output) in turn; returns the number that failed."""
+    failed = 0
+
+    for spec, out_path in jobs:
+        in_path = spec.path
+        t0 = time.perf_counter()
+        try:
+            if args.resume:
+                stats = run_job_resumable(spec, out_path, memo=memo)
+            else:
+                stats = run_job_to_file(spec, out_path, memo=memo)
+        except Exception as e:
+            failed += 1
+            print(f"error: {in_path}: {e}", file=sys.stderr)
+            continue
+
+        if not args.quiet:
+            seconds = time.perf_counter() - t0
+            resumed = (
+                f" (resumed after {stats['resumed_rows']:,})"
+                if stats.get("resumed_rows") else ""
+            )
+            print(
+                f"{in_path} -> {out_path}: {stats['rows']:,} points{resumed}, "
+                f"{stats['bytes'] / 1e6:.1f} MB in {seconds:.2f} s"
+            )
+
+    return failed
+
+
+def cmd_batch(args):
+    jobs = _job_specs(args)
+
+    def file_done(r):
+        if r["error"]:
+            print(f"error: {r['input']}: {r['error']}", file=sys.stderr)
+        elif not args.quiet:
+            print(
+                f"{r['input']} -> {r['output']}: {r['points']:,} points in "
+                f"{r['seconds']:.2f} s (parse {r['parse_s']:.2f}, "
+                f"transform+write {r['transform_s']:.2f})"
+            )
+
+    report = run_batch(jobs, max_workers=args.jobs, on_record=file_done)
+
+    if not args.quiet:
+        print(report.summary())
+    if args.report:
+        report.write_csv(args.report)
+
+    return 1 if report.failed else 0
+
+
+def cmd_watch(args):
+    def file_done(r):
+        if r["error"]:
+            print(f"error: {r['input']}: {r['error']}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"{r['input']} -> {r['output']}: {r['points']:,} points "
+                  f"in {r['seconds']:.2f} s", flush=True)
+
+    watcher = FolderWatcher(
+        args.folder,
+        args.out_dir,
+        {
+            "src_crs": args.src,
+            "has_header": args.has_header,
+            "utm_zone": args.utm_zone,
+            "mutm_zone": args.mutm_cm,
+            "targets": args.targets,
+        },
+        fmt=args.format,
+        ledger_path=args.ledger,
+        poll_interval=args.poll,
+        settle=args.settle,
+        on_record=file_done,
+        memo=_open_memo(args)
+    )
+    if not args.quiet:
+        print(f"Watching {watcher.folder} ({type(watcher.watcher).__name__}); "
+              f"Ctrl+C to stop", flush=True)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher.memo:
+            if not args.quiet:
+                print(watcher.memo.summary())
+            watcher.memo.close()
+    return 0
+
+
+def cmd_serve(args):
+    from mutm.server import run
+
+    run(
+        args.host, args.port, args.workers, args.quiet,
+        batch_window=None if args.no_batching else args.batch_window_ms / 1000,
+        batch_max_points=args.batch_max_points
+    )
+    return 0
+
+
+def cmd_filter(args):
+    if args.block < 1:
+        raise ValueError("--block must be at least 1")
+    memo = _open_memo(args)
+    try:
+        filter_stream(
+            sys.stdin, sys.stdout, args.src, args.utm_zone, args.mutm_cm,
+            args.targets, header=args.header, sep=args.sep, block_size=args.block,
+            memo=memo, on_bad_line=lambda message: print(f"warning: {message}", file=sys.stderr)
+        )
+    except BrokenPipeError:
+        # Downstream closed early (e.g. `| head`): stop quietly, and keep
+        # the interpreter's final flush from failing again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if memo:
+            print(memo.summary(), file=sys.stderr)    # stdout carries the data
+            memo.close()
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,148 @@
+import json
+import socket
+import threading
+
+from controllers.job import check_options
+from mutm import wire
+from mutm.server import BINARY_PATH, DEFAULT_HOST, DEFAULT_PORT
+
+# ============================================================
+# Python client for the HTTP conversion service
+# ============================================================
+#
+#   from mutm.client import convert_binary
+#   cols = convert_binary(x, y, "MUTM84", targets=["WGS84"])
+#   cols["WGS84_Lat"], cols["WGS84_Lon"]
+#
+# convert_binary is the one to use for bulk data: no JSON on either
+# side, and the body is sent from a second thread while the response is
+# read, so both ends stream. convert_json calls POST /convert (names,
+# at most MAX_POINTS points) and returns the same column dict.
+
+
+def _read_head(f):
+    """Status line + headers from a binary file object -> (status, headers)."""
+    status = int(f.readline().split()[1])
+    headers = {}
+    while True:
+        line = f.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return status, headers
+
+
+def _error(f, headers):
+    body = f.read(int(headers.get("content-length", 0)))
+    try:
+        return ValueError(json.loads(body)["error"])
+    except (ValueError, KeyError):
+        return ValueError(body.decode("utf-8", "replace"))
+
+
+def _request_head(method, path, host, content_type, length):
+    return (
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: {content_type}\r\nContent-Length: {length}\r\n"
+        f"Connection: close\r\n\r\n"
+    ).encode("latin-1")
+
+
+def _send_all(sock, parts, errors):
+    try:
+        for part in parts:
+            sock.sendall(part)
+    except OSError as e:
+        errors.append(e)    # the server may answer an error before reading it all
+
+
+def convert_binary(x, y, src_crs, utm_zone=45, mutm_zone=84, targets=None,
+                   host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=300):
+    """
+    Convert through POST /convert.bin. Returns {column name: float64
+    array}; the arrays are views on one received buffer. Points outside
+    a projection come back as NaN / inf. Raises ValueError for a
+    rejected request.
+    """
+    import numpy as np
+
+    utm_zone, mutm_zone, targets = check_options(src_crs, utm_zone, mutm_zone, targets)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.ndim != 1 or x.shape != y.shape:
+        raise ValueError("x and y must be flat arrays of the same length.")
+
+    xy = np.empty((len(x), 2), dtype="<f8")
+    xy[:, 0] = x
+    xy[:, 1] = y
+    header = wire.pack_request_header(src_crs, utm_zone, mutm_zone, targets, len(x))
+
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        head = _request_head(
+            "POST", BINARY_PATH, host, wire.CONTENT_TYPE, len(header) + xy.nbytes
+        )
+        send_errors = []
+        sender = threading.Thread(
+            target=_send_all,
+            args=(sock, [head + header, memoryview(xy).cast("B")], send_errors),
+            daemon=True,
+        )
+        sender.start()
+        try:
+            with sock.makefile("rb") as f:
+                status, headers = _read_head(f)
+                if status != 200:
+                    raise _error(f, headers)
+
+                _, _, _, ncols, count = wire.unpack_response_header(
+                    f.read(wire.RESPONSE_HEADER.size)
+                )
+                out = np.empty((count, ncols), dtype="<f8")
+                buf = memoryview(out).cast("B")
+                got = 0
+                while got < len(buf):
+                    n = f.readinto(buf[got:])
+                    if not n:
+                        raise ConnectionError("Connection closed mid-response.")
+                    got += n
+        finally:
+            sender.join()
+
+    names = wire.column_names(targets, utm_zone, mutm_zone)
+    return {name: out[:, i] for i, name in enumerate(names)}
+
+
+def convert_json(x, y, src_crs, utm_zone=45, mutm_zone=84, targets=None,
+                 names=None, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=300):
+    """
+    Convert through POST /convert. Returns {column name: array} like
+    convert_binary (plus "Point" when `names` are given); nulls come back
+    as NaN. Raises ValueError for a rejected request.
+    """
+    import numpy as np
+
+    request = {
+        "src_crs": src_crs, "utm_zone": utm_zone, "mutm_zone": mutm_zone,
+        "x": np.asarray(x, dtype=float).tolist(),
+        "y": np.asarray(y, dtype=float).tolist(),
+    }
+    if targets is not None:
+        request["targets"] = list(targets)
+    if names is not None:
+        request["names"] = list(names)
+    body = json.dumps(request, separators=(",", ":")).encode()
+
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(_request_head("POST", "/convert", host, "application/json", len(body)))
+        sock.sendall(body)
+        with sock.makefile("rb") as f:
+            status, headers = _read_head(f)
+            if status != 200:
+                raise _error(f, headers)
+            payload = json.loads(f.read(int(headers["content-length"])))
+
+    return {
+        k: v if k == "Point" else np.array(v, dtype=float)
+        for k, v in payload["columns"].items()
+    }
@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+# ============================================================
+# Load test for the HTTP conversion service
+# ============================================================
+#
+#   python -m mutm.loadtest --spawn -c 16 -n 2000 -p 100
+#   python -m mutm.loadtest --compare -c 64 -n 5000 -p 1
+#   python -m mutm.loadtest --spawn --bulk 1000000
+#
+# Opens `concurrency` keep-alive connections, sends `requests` POST
+# /convert calls of `points` random MUTM84 points spread over them,
+# and reports requests/sec, points/sec and latency percentiles.
+# --spawn starts `python -m mutm serve` on the given port first
+# (--server-args are passed on); --compare spawns it twice, without and
+# with micro-batching, and reports both.
+#
+# --bulk N instead converts N points in one call through POST /convert
+# (JSON) and POST /convert.bin (mutm.client), best of --repeat runs
+# each, and checks that both return the same numbers.
+
+
+def make_body(points, seed=0):
+    rng = random.Random(seed)
+    return json.dumps({
+        "src_crs": "MUTM84",
+        "x": [round(rng.uniform(400_000, 700_000), 4) for _ in range(points)],
+        "y": [round(rng.uniform(2_950_000, 3_350_000), 4) for _ in range(points)],
+    }).encode()
+
+
+async def _request(reader, writer, host, body):
+    writer.write(
+        f"POST /convert HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        .encode("latin-1") + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, body, counter, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] > 0:
+            counter[0] -= 1
+            t0 = time.perf_counter()
+            status = await _request(reader, writer, host, body)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+
+async def run_load(host, port, concurrency, requests, points):
+    """Returns a dict of results (see `report`)."""
+    body = make_body(points)
+
+    # Warm-up: one request outside the measurement
+    reader, writer = await asyncio.open_connection(host, port)
+    await _request(reader, writer, host, body)
+    writer.close()
+
+    counter = [requests]
+    latencies, errors = [], []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, body, counter, latencies, errors)
+        for _ in range(concurrency)
+    ))
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "points_per_request": points,
+        "seconds": wall,
+        "requests_per_second": len(latencies) / wall,
+        "points_per_second": len(latencies) * points / wall,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def report(r):
+    return (
+        f"{r['requests']:,} requests x {r['points_per_request']:,} points, "
+        f"{r['concurrency']} connections, {r['errors']} errors\n"
+        f"  {r['requests_per_second']:,.0f} req/s, "
+        f"{r['points_per_second']:,.0f} points/s in {r['seconds']:.2f} s\n"
+        f"  latency p50 {r['p50_ms']:.1f} ms, p90 {r['p90_ms']:.1f} ms, "
+        f"p99 {r['p99_ms']:.1f} ms, max {r['max_ms']:.1f} ms"
+    )
+
+
+def run_bulk(host, port, points, repeat=3):
+    """JSON vs binary endpoint on one large request; returns a dict (see `report_bulk`)."""
+    import numpy as np
+    from mutm.client import convert_binary, convert_json
+
+    rng = np.random.default_rng(0)
+    x = rng.uniform(400_000, 700_000, points).round(4)
+    y = rng.uniform(2_950_000, 3_350_000, points).round(4)
+
+    result = {"points": points}
+    outputs = {}
+    for name, fn in (("json", convert_json), ("binary", convert_binary)):
+        fn(x[:100], y[:100], "MUTM84", host=host, port=port)    # warm-up
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            outputs[name] = fn(x, y, "MUTM84", host=host, port=port)
+            best = min(best, time.perf_counter() - t0)
+        result[f"{name}_seconds"] = best
+        result[f"{name}_points_per_second"] = points / best
+
+    result["speedup"] = result["json_seconds"] / result["binary_seconds"]
+    result["identical"] = outputs["json"].keys() == outputs["binary"].keys() and all(
+        np.array_equal(outputs["json"][k], outputs["binary"][k], equal_nan=True)
+        for k in outputs["json"]
+    )
+    return result
+
+
+def report_bulk(r):
+    return (
+        f"{r['points']:,} points in one request\n"
+        f"  JSON   /convert      {r['json_seconds']:.2f} s "
+        f"({r['json_points_per_second']:,.0f} points/s)\n"
+        f"  binary /convert.bin  {r['binary_seconds']:.2f} s "
+        f"({r['binary_points_per_second']:,.0f} points/s)\n"
+        f"  {r['speedup']:.1f}x faster, "
+        f"results {'identical' if r['identical'] else 'DIFFER'}"
+    )
+
+
+def _wait_until_up(host, port, timeout=30.0):
+    import socket
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Service did not start on {host}:{port}")
+
+
+def _spawn(host, port, server_args):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "mutm", "serve", "-q",
+         "--host", host, "--port", str(port), *server_args]
+    )
+    try:
+        _wait_until_up(host, port)
+    except Exception:
+        server.terminate()
+        raise
+    return server
+
+
+def _measure(args, server_args=None):
+    server = _spawn(args.host, args.port, server_args) if server_args is not None else None
+    try:
+        if args.bulk:
+            return run_bulk(args.host, args.port, args.bulk, args.repeat)
+        return asyncio.run(run_load(
+            args.host, args.port, args.concurrency, args.requests, args.points
+        ))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m mutm.loadtest",
+        description="Load-test the HTTP conversion service."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-c", "--concurrency", type=int, default=16,
+                        help="parallel keep-alive connections (default: 16)")
+    parser.add_argument("-n", "--requests", type=int, default=2000,
+                        help="total requests (default: 2000)")
+    parser.add_argument("-p", "--points", type=int, default=100,
+                        help="points per request (default: 100)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="start 'python -m mutm serve' for the test")
+    parser.add_argument("--server-args", default="",
+                        help="extra 'serve' options with --spawn, e.g. "
+                             "'--batch-window-ms 5'")
+    parser.add_argument("--compare", action="store_true",
+                        help="spawn the service without, then with "
+                             "micro-batching and report both")
+    parser.add_argument("--bulk", type=int, metavar="N",
+                        help="time one N-point request through the JSON and "
+                             "the binary endpoint instead")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per endpoint with --bulk, best is kept "
+                             "(default: 3)")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    server_args = args.server_args.split()
+    if args.bulk:
+        r = _measure(args, server_args if args.spawn else None)
+        print(json.dumps(r, indent=1) if args.json else report_bulk(r))
+        return 0 if r["identical"] else 1
+    if args.compare:
+        runs = [
+            ("no batching", _measure(args, server_args + ["--no-batching"])),
+            ("micro-batching", _measure(args, server_args)),
+        ]
+    else:
+        runs = [("", _measure(args, server_args if args.spawn else None))]
+
+    if args.json:
+        print(json.dumps({name or "result": r for name, r in runs}, indent=1))
+    else:
+        for name, r in runs:
+            print(f"[{name}] {report(r)}" if name else report(r))
+    return 1 if any(r["errors"] for _, r in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from controllers.job import MUTM_CMS, SOURCE_CRS, UTM_ZONES, check_options
+from pipeline import ALL_TARGETS
+
+# ============================================================
+# Local HTTP conversion service (asyncio, stdlib only)
+# ============================================================
+#
+#   python -m mutm serve --port 8765
+#
+#   POST /convert   {"src_crs": "MUTM84", "x": [...], "y": [...],
+#                    "names": [...], "utm_zone": 45, "mutm_zone": 84,
+#                    "targets": ["WGS84", "UTM"]}
+#                   x / y are Easting / Northing (Lon / Lat for WGS84);
+#                   names, zones and targets are optional.
+#   -> 200          {"count": n, "columns": {"WGS84_Lat": [...], ...}}
+#   POST /convert.bin
+#                   the same conversion with raw little-endian float64
+#                   buffers in and out (layout in mutm.wire; client in
+#                   mutm.client). No size limit: the body is converted
+#                   and answered BINARY_CHUNK_POINTS points at a time.
+#   GET  /crs       supported source CRS, zones and targets
+#   GET  /health    {"status": "ok", ...} with micro-batching counters
+#
+# Errors are {"error": message} with status 400 / 404 / 405 / 413
+# (JSON for /convert.bin too).
+#
+# Small requests with the same settings that arrive within a short
+# window are merged into one transform call (mutm.batcher.MicroBatcher).
+#
+# The event loop only parses HTTP; JSON decoding, transforms and JSON
+# encoding run on a small fixed pool of threads. pyproj keeps one PROJ
+# object per thread, so a fixed pool (warmed up at start) stays warm,
+# while a thread per request would rebuild the transformers every time
+# (~5 ms).
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MAX_BODY = 64 * 1024 * 1024
+MAX_POINTS = 1_000_000
+
+BINARY_PATH = "/convert.bin"
+BINARY_CHUNK_POINTS = 65_536    # 1 MiB of (x, y) per read
+BINARY_HIGH_WATER = 16 << 20    # unsent /convert.bin output before reads pause
+
+# Micro-batching defaults (python -m mutm serve --batch-window-ms / --batch-max-points)
+BATCH_WINDOW_S = 0.002
+BATCH_MAX_POINTS = 20_000
+
+# Bodies / responses this small are decoded / encoded on the event loop
+# rather than paying a thread hop
+INLINE_BODY = 16 * 1024
+INLINE_POINTS = 200
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+def _json_column(values):
+    """Array -> JSON list; NaN / inf (points outside a projection) -> null."""
+    import numpy as np
+
+    if values.dtype.kind != "f" or np.isfinite(values).all():
+        return values.tolist()
+    return [v if np.isfinite(v) else None for v in values.tolist()]
+
+
+def read_request(body):
+    """
+    Validate a decoded /convert body. Returns
+    (key, targets, x, y, names) with key = (src_crs, utm_zone, mutm_zone).
+    Raises ValueError for bad input.
+    """
+    import numpy as np
+
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object.")
+
+    src = body.get("src_crs")
+    utm_zone, mutm_zone, targets = check_options(
+        src, body.get("utm_zone", 45), body.get("mutm_zone", 84), body.get("targets")
+    )
+
+    try:
+        x = np.asarray(body["x"], dtype=float)
+        y = np.asarray(body["y"], dtype=float)
+    except KeyError as e:
+        raise ValueError(f"Missing field: {e.args[0]}")
+    except (TypeError, ValueError):
+        raise ValueError("x and y must be arrays of numbers.")
+    if x.ndim != 1 or x.shape != y.shape:
+        raise ValueError("x and y must be flat arrays of the same length.")
+    if len(x) > MAX_POINTS:
+        raise ValueError(f"At most {MAX_POINTS:,} points per request.")
+
+    names = body.get("names")
+    if names is not None and not isinstance(names, list):
+        raise ValueError("names must be an array with one entry per point.")
+    if names is not None and len(names) != len(x):
+        raise ValueError("names must have one entry per point.")
+
+    return (src, utm_zone, mutm_zone), targets, x, y, names
+
+
+def transform_key(key, x, y):
+    """transform_arrays for a request key (the micro-batcher's `fn`)."""
+    from transform import transform_arrays
+
+    return transform_arrays(x, y, *key)
+
+
+def response_payload(key, targets, names, res):
+    from pipeline import result_columns
+
+    _, utm_zone, mutm_zone = key
+    cols = result_columns(names, res, utm_zone, mutm_zone, targets)
+    if names is None:
+        del cols["Point"]
+
+    return {
+        "count": len(res["lat"]),
+        "columns": {
+            k: v if k == "Point" else _json_column(v) for k, v in cols.items()
+        },
+    }
+
+
+def convert_points(body):
+    """
+    The whole /convert handler without HTTP or batching: decoded body
+    in, response dict out, so it can be called and tested directly.
+    """
+    key, targets, x, y, names = read_request(body)
+    return response_payload(key, targets, names, transform_key(key, x, y))
+
+
+def _encode(payload):
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _read_body(body):
+    try:
+        request = json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    return read_request(request)
+
+
+def _convert_body(body):
+    """Unbatched /convert on a worker thread: JSON bytes in and out."""
+    key, targets, x, y, names = _read_body(body)
+    return _encode(response_payload(key, targets, names, transform_key(key, x, y)))
+
+
+def _convert_block(key, targets, data):
+    """One /convert.bin chunk on a worker thread: raw (x, y) pairs in, raw rows out."""
+    import numpy as np
+    from mutm.wire import result_rows
+
+    xy = np.frombuffer(data, dtype="<f8").reshape(-1, 2)    # a view, no copy
+    rows = result_rows(transform_key(key, xy[:, 0], xy[:, 1]), targets)
+    return memoryview(rows).cast("B")
+
+
+class ConversionService:
+    """Routes requests; owns the transform thread pool and the batcher."""
+
+    def __init__(self, workers=None, warm=("MUTM84", 45, 84),
+                 batch_window=BATCH_WINDOW_S, batch_max_points=BATCH_MAX_POINTS):
+        from mutm.batcher import MicroBatcher
+
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.requests = 0
+        self._warm = warm
+        self.executor = ThreadPoolExecutor(
+            self.workers, thread_name_prefix="transform", initializer=self._warm_thread
+        )
+        # Start every thread now so none warms up during a request
+        barrier = threading.Barrier(self.workers)
+        for f in [self.executor.submit(barrier.wait) for _ in range(self.workers)]:
+            f.result()
+
+        # batch_window=None disables micro-batching
+        self.batcher = None
+        if batch_window is not None:
+            self.batcher = MicroBatcher(
+                transform_key, self.executor, batch_window, batch_max_points
+            )
+
+    def _warm_thread(self):
+        from transform import warm_up
+        if self._warm:
+            warm_up(*self._warm)
+
+    async def handle(self, method, path, body):
+        """Returns (status, JSON-encoded response body)."""
+        self.requests += 1
+
+        if path == "/health":
+            return 200, _encode({
+                "status": "ok", "workers": self.workers, "requests": self.requests,
+                "batching": self.batcher.stats() if self.batcher else None,
+            })
+        if path == "/crs":
+            return 200, _encode({
+                "source_crs": SOURCE_CRS, "utm_zones": UTM_ZONES,
+                "mutm_cms": MUTM_CMS, "targets": ALL_TARGETS,
+            })
+        if path not in ("/convert", BINARY_PATH):
+            raise RequestError(404, f"No such endpoint: {path}")
+        if method != "POST":
+            raise RequestError(405, f"Use POST for {path}.")
+
+        try:
+            return 200, await self._convert(body)
+        except (ValueError, TypeError) as e:
+            raise RequestError(400, str(e))
+
+    async def _convert(self, body):
+        loop = asyncio.get_running_loop()
+        if self.batcher is None or len(body) > INLINE_BODY:
+            # Large batches gain nothing from merging: one thread hop
+            return await loop.run_in_executor(self.executor, _convert_body, body)
+
+        key, targets, x, y, names = _read_body(body)
+        if len(x) >= self.batcher.max_points:
+            res = await loop.run_in_executor(self.executor, transform_key, key, x, y)
+        else:
+            res = await self.batcher.submit(key, x, y)
+
+        if len(x) <= INLINE_POINTS:
+            return _encode(response_payload(key, targets, names, res))
+        return await loop.run_in_executor(
+            self.executor,
+            lambda: _encode(response_payload(key, targets, names, res))
+        )
+
+    async def _stream_binary(self, reader, writer, length, keep_alive):
+        """
+        POST /convert.bin. The header is checked before anything is sent
+        (RequestError -> the usual JSON error); the points are then read,
+        converted and written back chunk by chunk, reading the next chunk
+        while the previous one converts.
+
+        Once more than BINARY_HIGH_WATER bytes of output are waiting to be
+        sent, reading pauses until the client takes them, so memory stays
+        bounded whatever the body size. The client must therefore read
+        the response while it is still sending (mutm.client does, from a
+        second thread); one that sends a large body before reading
+        anything stalls once both socket buffers are full.
+        """
+        from mutm import wire
+
+        self.requests += 1
+        if length < wire.REQUEST_HEADER.size:
+            raise RequestError(400, "Body shorter than the /convert.bin header.")
+        header = await reader.readexactly(wire.REQUEST_HEADER.size)
+        try:
+            src, utm_zone, mutm_zone, targets, count = wire.unpack_request_header(header)
+            utm_zone, mutm_zone, targets = check_options(src, utm_zone, mutm_zone, targets)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        if length != wire.REQUEST_HEADER.size + count * wire.POINT_BYTES:
+            raise RequestError(400, f"Content-Length does not match {count:,} points.")
+
+        key = (src, utm_zone, mutm_zone)
+        ncols = len(wire.column_names(targets, utm_zone, mutm_zone))
+        writer.write(
+            f"HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {wire.CONTENT_TYPE}\r\n"
+            f"Content-Length: {wire.RESPONSE_HEADER.size + count * ncols * 8}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n".encode("latin-1")
+            + wire.pack_response_header(targets, utm_zone, mutm_zone, count)
+        )
+
+        # From here on the status is sent: any failure drops the
+        # connection, so the client sees a short body instead of bad data
+        loop = asyncio.get_running_loop()
+        pending = None
+        remaining = count
+        try:
+            while remaining:
+                n = min(remaining, BINARY_CHUNK_POINTS)
+                remaining -= n
+                data = await reader.readexactly(n * wire.POINT_BYTES)
+                job = loop.run_in_executor(
+                    self.executor, _convert_block, key, targets, data
+                )
+                if pending is not None:
+                    writer.write(await pending)
+                    if writer.transport.get_write_buffer_size() > BINARY_HIGH_WATER:
+                        await writer.drain()
+                pending = job
+            if pending is not None:
+                writer.write(await pending)
+        except asyncio.IncompleteReadError:
+            raise
+        except Exception as e:
+            raise ConnectionAbortedError(f"/convert.bin failed mid-stream: {e}")
+        await writer.drain()
+
+    # ---------------------------
+    # HTTP/1.1 (keep-alive, Content-Length bodies only)
+    # ---------------------------
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    if version == "HTTP/1.1"
+                    else headers.get("connection", "").lower() == "keep-alive"
+                )
+
+                try:
+                    if "transfer-encoding" in headers:
+                        keep_alive = False
+                        raise RequestError(411, "Send a Content-Length body.")
+                    try:
+                        length = int(headers.get("content-length", 0))
+                    except ValueError:
+                        keep_alive = False
+                        raise RequestError(400, "Invalid Content-Length.")
+
+                    path = target.split("?", 1)[0]
+                    if path == BINARY_PATH and method == "POST":
+                        try:
+                            await self._stream_binary(reader, writer, length, keep_alive)
+                        except RequestError:
+                            keep_alive = False    # the body was not read
+                            raise
+                        if not keep_alive:
+                            break
+                        continue
+
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise RequestError(413, f"Body larger than {MAX_BODY} bytes.")
+                    body = await reader.readexactly(length) if length else b""
+
+                    status, data = await self.handle(method, path, body)
+                except RequestError as e:
+                    status, data = e.status, _encode({"error": str(e)})
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    raise
+                except Exception as e:
+                    status, data = 500, _encode({"error": f"{type(e).__name__}: {e}"})
+
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    f"\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, ready=None,
+                batch_window=BATCH_WINDOW_S, batch_max_points=BATCH_MAX_POINTS):
+    """Run the service until cancelled. `ready(server)` is called once listening."""
+    service = ConversionService(
+        workers, batch_window=batch_window, batch_max_points=batch_max_points
+    )
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    if ready:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, quiet=False,
+        batch_window=BATCH_WINDOW_S, batch_max_points=BATCH_MAX_POINTS):
+    def ready(server):
+        if not quiet:
+            addr = server.sockets[0].getsockname()
+            print(f"Serving on http://{addr[0]}:{addr[1]} (Ctrl+C to stop)",
+                  file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(serve(host, port, workers, ready, batch_window, batch_max_points))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,105 @@
+import struct
+
+from pipeline import ALL_TARGETS
+
+# ============================================================
+# Binary wire format for POST /convert.bin
+# ============================================================
+#
+# Request:   24-byte header, then `count` (x, y) pairs as little-endian
+#            float64 (16 bytes per point, row-interleaved so the body can
+#            be streamed and converted chunk by chunk).
+# Response:  16-byte header, then `count` rows of `ncols` little-endian
+#            float64, columns in result_columns order:
+#            WGS84_Lat, WGS84_Lon, UTM<z>_E, UTM<z>_N, MUTM<cm>_E, MUTM<cm>_N
+#            (only the requested targets). NaN / inf are passed through.
+#
+# Target mask bits follow ALL_TARGETS (1 = WGS84, 2 = UTM, 4 = MUTM);
+# 0 asks for the source's default targets, as a /convert without
+# "targets" does.
+#
+# Both headers are multiples of 8 bytes, so the float64 data after them
+# stays aligned.
+
+REQUEST_MAGIC = b"MUQ1"
+RESPONSE_MAGIC = b"MUR1"
+
+# magic, src CRS (ASCII, NUL-padded), UTM zone, MUTM CM, target mask, pad, count
+REQUEST_HEADER = struct.Struct("<4s8sBBBxQ")
+# magic, target mask, UTM zone, MUTM CM, column count, count
+RESPONSE_HEADER = struct.Struct("<4sBBBBQ")
+
+POINT_BYTES = 16
+CONTENT_TYPE = "application/octet-stream"
+
+
+def target_mask(targets):
+    return sum(1 << i for i, t in enumerate(ALL_TARGETS) if t in targets)
+
+
+def mask_targets(mask):
+    return tuple(t for i, t in enumerate(ALL_TARGETS) if mask & (1 << i))
+
+
+def column_names(targets, utm_zone, mutm_zone):
+    names = []
+    if "WGS84" in targets:
+        names += ["WGS84_Lat", "WGS84_Lon"]
+    if "UTM" in targets:
+        names += [f"UTM{utm_zone}_E", f"UTM{utm_zone}_N"]
+    if "MUTM" in targets:
+        names += [f"MUTM{mutm_zone}_E", f"MUTM{mutm_zone}_N"]
+    return names
+
+
+def pack_request_header(src_crs, utm_zone, mutm_zone, targets, count):
+    return REQUEST_HEADER.pack(
+        REQUEST_MAGIC, src_crs.encode("ascii"), utm_zone, mutm_zone,
+        target_mask(targets), count
+    )
+
+
+def unpack_request_header(data):
+    """Returns (src_crs, utm_zone, mutm_zone, targets or None, count)."""
+    magic, src, utm_zone, mutm_zone, mask, count = REQUEST_HEADER.unpack(data)
+    if magic != REQUEST_MAGIC:
+        raise ValueError("Not a /convert.bin request (bad magic).")
+    src = src.rstrip(b"\0").decode("ascii", "replace")
+    return src, utm_zone, mutm_zone, mask_targets(mask) or None, count
+
+
+def pack_response_header(targets, utm_zone, mutm_zone, count):
+    ncols = len(column_names(targets, utm_zone, mutm_zone))
+    return RESPONSE_HEADER.pack(
+        RESPONSE_MAGIC, target_mask(targets), utm_zone, mutm_zone, ncols, count
+    )
+
+
+def unpack_response_header(data):
+    """Returns (targets, utm_zone, mutm_zone, ncols, count)."""
+    magic, mask, utm_zone, mutm_zone, ncols, count = RESPONSE_HEADER.unpack(data)
+    if magic != RESPONSE_MAGIC:
+        raise ValueError("Not a /convert.bin response (bad magic).")
+    return mask_targets(mask), utm_zone, mutm_zone, ncols, count
+
+
+def result_rows(res, targets):
+    """
+    Row-interleaved float64 block for one chunk of `transform_arrays`
+    results (see the response layout above).
+    """
+    import numpy as np
+
+    keys = []
+    if "WGS84" in targets:
+        keys += ["lat", "lon"]
+    if "UTM" in targets:
+        keys += ["utm_e", "utm_n"]
+    if "MUTM" in targets:
+        keys += ["mutm_e", "mutm_n"]
+
+    n = len(res["lat"])
+    out = np.empty((n, len(keys)), dtype="<f8")
+    for i, k in enumerate(keys):
+        out[:, i] = res[k]
+    return out
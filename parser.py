@@ -119,39 +119,45 @@ def find_column(cols, aliases):
 # Manual text parsing (comma / tab ONLY)
 # ==================================================
 
-def parse_text(text: str, src_crs: str):
-    rows = []
+def parse_line(line: str, ln: int):
+    """
+    Parse one non-blank manual input line into [name, x, y].
+    `ln` is the 1-based line number used in error messages.
+    """
+    # Allow ONLY comma or tab
+    if "," in line:
+        parts = [p.strip() for p in line.split(",")]
+    elif "\t" in line:
+        parts = [p.strip() for p in line.split("\t")]
+    else:
+        raise ValueError(
+            f"Line {ln}: Invalid separator. "
+            "Use comma (,) or tab only."
+        )
 
-    for ln, line in enumerate(text.splitlines(), start=1):
-        if not line.strip():
-            continue
+    if len(parts) == 2:
+        name = ""
+        x, y = parts
+    elif len(parts) == 3:
+        name, x, y = parts
+    else:
+        raise ValueError(
+            f"Line {ln}: Expected 2 or 3 values, got {len(parts)}"
+        )
 
-        # Allow ONLY comma or tab
-        if "," in line:
-            parts = [p.strip() for p in line.split(",")]
-        elif "\t" in line:
-            parts = [p.strip() for p in line.split("\t")]
-        else:
-            raise ValueError(
-                f"Line {ln}: Invalid separator. "
-                "Use comma (,) or tab only."
-            )
+    return [
+        name,
+        clean_angle(x),
+        clean_angle(y)
+    ]
 
-        if len(parts) == 2:
-            name = ""
-            x, y = parts
-        elif len(parts) == 3:
-            name, x, y = parts
-        else:
-            raise ValueError(
-                f"Line {ln}: Expected 2 or 3 values, got {len(parts)}"
-            )
 
-        rows.append([
-            name,
-            clean_angle(x),
-            clean_angle(y)
-        ])
+def parse_text(text: str, src_crs: str):
+    rows = [
+        parse_line(line, ln)
+        for ln, line in enumerate(text.splitlines(), start=1)
+        if line.strip()
+    ]
 
     if not rows:
         raise ValueError("No valid coordinate rows found.")
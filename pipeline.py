@@ -0,0 +1,160 @@
+import os
+import threading
+
+# transform (pyproj) and order_check (pandas) are imported on first use so
+# that importing this module stays cheap on the GUI start-up path.
+
+# ============================================================
+# Streaming conversion pipeline
+# ============================================================
+
+DEFAULT_CHUNK_SIZE = 50_000
+ALL_TARGETS = ("WGS84", "UTM", "MUTM")
+
+
+class ConversionCancelled(Exception):
+    """Raised between chunks when the caller's cancel flag is set."""
+
+
+def start_warm_up(src_crs_name, out_utm_zone, out_mutm_cm):
+    """
+    Warm up on a daemon thread: import the parser / pandas stack and
+    build the cached transformers for these settings (see
+    `transform.warm_up`). Failures are ignored; Run will report them.
+    """
+    def work():
+        try:
+            import parser  # noqa: F401  (pulls in pandas)
+            from transform import warm_up
+            warm_up(src_crs_name, int(out_utm_zone), int(out_mutm_cm))
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=work, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def normalize_order(df_in, src_crs_name):
+    """
+    Enforce one coordinate order and swap in place so that
+    X = Easting/Lon and Y = Northing/Lat. Returns the detected order.
+    """
+    from utils.order_check import check_consistent_order
+
+    order = check_consistent_order(
+        df_in["X"].astype(float),
+        df_in["Y"].astype(float),
+        src_crs_name
+    )
+
+    if order in ("NE", "LATLON"):
+        df_in[["X", "Y"]] = df_in[["Y", "X"]]
+
+    return order
+
+
+def result_columns(points, res, out_utm_zone, out_mutm_cm, targets=ALL_TARGETS):
+    """
+    Build the numeric output columns for one chunk.
+    Column names match the preview table (e.g. UTM45_E, MUTM84_N).
+    """
+    cols = {"Point": points}
+
+    if "WGS84" in targets:
+        cols["WGS84_Lat"] = res["lat"]
+        cols["WGS84_Lon"] = res["lon"]
+
+    if "UTM" in targets:
+        cols[f"UTM{out_utm_zone}_E"] = res["utm_e"]
+        cols[f"UTM{out_utm_zone}_N"] = res["utm_n"]
+
+    if "MUTM" in targets:
+        cols[f"MUTM{out_mutm_cm}_E"] = res["mutm_e"]
+        cols[f"MUTM{out_mutm_cm}_N"] = res["mutm_n"]
+
+    return cols
+
+
+def iter_chunks(total, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, cancel=None,
+                first=0):
+    """
+    Yield (start, stop) slices over `total` rows, from row `first`.
+    Raises ConversionCancelled before a slice if `cancel` is set and
+    calls `progress(stop, total)` after each one.
+    """
+    for start in range(first, total, chunk_size):
+        if cancel is not None and cancel.is_set():
+            raise ConversionCancelled()
+
+        stop = min(start + chunk_size, total)
+        yield start, stop
+
+        if progress:
+            progress(stop, total)
+
+
+def iter_transform(
+    df_in,
+    src_crs_name,
+    out_utm_zone,
+    out_mutm_cm,
+    targets=ALL_TARGETS,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    progress=None,
+    cancel=None,
+    first=0,
+    memo=None
+):
+    """
+    Transform an order-normalized input frame chunk by chunk, from row
+    `first` (to resume a checkpointed run). With a PointMemo
+    (controllers.point_memo), known points are taken from it.
+
+    Yields dicts of column name -> array (see `result_columns`).
+    `progress(done, total)` is called after every chunk; if `cancel`
+    (a threading.Event) is set, ConversionCancelled is raised before
+    the next chunk starts.
+    """
+    from transform import transform_arrays
+
+    if memo is not None:
+        transform_arrays = memo.transform_arrays
+
+    total = len(df_in)
+    points = df_in["Point"].to_numpy()
+    xs = df_in["X"].to_numpy(dtype=float)
+    ys = df_in["Y"].to_numpy(dtype=float)
+
+    for start, stop in iter_chunks(total, chunk_size, progress, cancel, first):
+        res = transform_arrays(
+            xs[start:stop], ys[start:stop],
+            src_crs_name, out_utm_zone, out_mutm_cm
+        )
+        yield result_columns(
+            points[start:stop], res, out_utm_zone, out_mutm_cm, targets
+        )
+
+
+def convert_to_sink(df_in, sink, src_crs_name, out_utm_zone, out_mutm_cm,
+                    targets=ALL_TARGETS, chunk_size=DEFAULT_CHUNK_SIZE,
+                    progress=None, cancel=None, memo=None):
+    """
+    Stream transformed chunks into an output sink and close it.
+    Returns the sink's stats (rows, bytes, seconds).
+
+    A cancelled conversion removes the partial output file.
+    """
+    try:
+        with sink:
+            for chunk in iter_transform(
+                df_in, src_crs_name, out_utm_zone, out_mutm_cm,
+                targets, chunk_size, progress, cancel, memo=memo
+            ):
+                sink.write(chunk)
+    except ConversionCancelled:
+        if os.path.exists(sink.path):
+            os.remove(sink.path)
+        raise
+
+    return sink.stats()
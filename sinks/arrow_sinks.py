@@ -0,0 +1,92 @@
+import pandas as pd
+
+from sinks.base import OutputSink
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = None
+
+
+def _require_pyarrow(fmt):
+    if pa is None:
+        raise ValueError(
+            f"{fmt} output requires pyarrow.\n"
+            "Install it with: pip install pyarrow"
+        )
+
+
+def _record_batch(data, columns, schema=None):
+    df = pd.DataFrame(data, columns=columns)
+    return pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False)
+
+
+# ============================================================
+# Parquet (one row group per chunk)
+# ============================================================
+
+class ParquetSink(OutputSink):
+    """
+    Streams rows into a Parquet file, writing one row group per chunk.
+
+    The schema is fixed by the first chunk; later chunks are cast to it.
+    """
+
+    def __init__(self, path: str, columns=None, compression: str = "snappy"):
+        _require_pyarrow("Parquet")
+        super().__init__(path, columns)
+        self.compression = compression
+        self._writer = None
+        self._schema = None
+
+    def _write(self, data, n):
+        batch = _record_batch(data, self.columns, self._schema)
+        if self._writer is None:
+            self._schema = batch.schema
+            self._writer = pq.ParquetWriter(
+                self.path, self._schema, compression=self.compression
+            )
+
+        self._writer.write_table(pa.Table.from_batches([batch]), row_group_size=n)
+
+    def _close(self):
+        if self._writer is None:
+            schema = pa.schema([(str(c), pa.string()) for c in self.columns])
+            self._writer = pq.ParquetWriter(self.path, schema)
+        self._writer.close()
+
+
+# ============================================================
+# Feather v2 (Arrow IPC file, one record batch per chunk)
+# ============================================================
+
+class FeatherSink(OutputSink):
+    """
+    Streams rows into a Feather (Arrow IPC) file, one record batch per chunk.
+    """
+
+    def __init__(self, path: str, columns=None, compression: str = "lz4"):
+        _require_pyarrow("Feather")
+        super().__init__(path, columns)
+        self.compression = compression
+        self._writer = None
+        self._schema = None
+
+    def _write(self, data, n):
+        batch = _record_batch(data, self.columns, self._schema)
+        if self._writer is None:
+            self._schema = batch.schema
+            self._writer = pa.ipc.new_file(
+                self.path, self._schema,
+                options=pa.ipc.IpcWriteOptions(compression=self.compression)
+            )
+
+        self._writer.write_batch(batch)
+
+    def _close(self):
+        if self._writer is None:
+            schema = pa.schema([(str(c), pa.string()) for c in self.columns])
+            self._writer = pa.ipc.new_file(self.path, schema)
+        self._writer.close()
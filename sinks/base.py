@@ -0,0 +1,109 @@
+import os
+import time
+
+import pandas as pd
+
+
+def chunk_to_dict(chunk):
+    """Normalize a DataFrame or mapping chunk to {column: array}."""
+    if isinstance(chunk, pd.DataFrame):
+        return {c: chunk[c].to_numpy() for c in chunk.columns}
+    return dict(chunk)
+
+
+class OutputSink:
+    """
+    Base class for streaming output sinks.
+
+    The transform pipeline calls `write(chunk)` once per chunk and
+    `close()` at the end. Subclasses implement `_open`, `_write` and
+    `_close`; this class keeps the column order fixed after the first
+    chunk and records rows, bytes and wall time spent inside the sink.
+
+    Usage
+    -----
+    with CsvSink(path) as sink:
+        for chunk in chunks:
+            sink.write(chunk)
+    print(sink.stats())
+    """
+
+    def __init__(self, path: str, columns=None):
+        self.path = path
+        self.columns = list(columns) if columns is not None else None
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+        self._opened = False
+        self._closed = False
+
+    # ---------------------------
+    # Subclass hooks
+    # ---------------------------
+    def _open(self):
+        pass
+
+    def _write(self, data, n):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def write(self, chunk):
+        """
+        Append one chunk of rows.
+
+        `chunk` is a DataFrame or a dict of column name -> array.
+        """
+        t0 = time.perf_counter()
+        data = chunk_to_dict(chunk)
+
+        if self.columns is None:
+            self.columns = list(data)
+
+        if not self._opened:
+            self._open()
+            self._opened = True
+
+        n = len(data[self.columns[0]]) if self.columns else 0
+        if n:
+            self._write({c: data[c] for c in self.columns}, n)
+            self.rows_written += n
+
+        self.seconds += time.perf_counter() - t0
+        return n
+
+    def close(self):
+        if self._closed:
+            return
+        t0 = time.perf_counter()
+
+        if not self._opened and self.columns is not None:
+            self._open()
+            self._opened = True
+        if self._opened:
+            self._close()
+
+        self._closed = True
+        self.seconds += time.perf_counter() - t0
+        if os.path.exists(self.path):
+            self.bytes_written = os.path.getsize(self.path)
+
+    def stats(self):
+        """Rows, bytes on disk and seconds spent writing."""
+        return {
+            "path": self.path,
+            "rows": self.rows_written,
+            "bytes": self.bytes_written,
+            "seconds": self.seconds,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
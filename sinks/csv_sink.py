@@ -0,0 +1,45 @@
+import gzip
+
+import pandas as pd
+
+from sinks.base import OutputSink
+
+
+class CsvSink(OutputSink):
+    """
+    Streams rows into a CSV file, optionally gzip-compressed.
+
+    Compression is enabled with `compress=True` or by a path ending in
+    ".gz". Each chunk is appended through pandas' C CSV writer; the
+    header is written with the first chunk only, and not at all with
+    `header=False` (continuation parts of a checkpointed run).
+    """
+
+    def __init__(self, path: str, columns=None, compress=None,
+                 sep: str = ",", compresslevel: int = 6, header: bool = True):
+        super().__init__(path, columns)
+        self.compress = path.lower().endswith(".gz") if compress is None else compress
+        self.sep = sep
+        self.compresslevel = compresslevel
+        self.header = header
+
+    def _open(self):
+        if self.compress:
+            self._fh = gzip.open(
+                self.path, "wt", encoding="utf-8", newline="",
+                compresslevel=self.compresslevel
+            )
+        else:
+            self._fh = open(self.path, "w", encoding="utf-8", newline="")
+
+        if self.header:
+            self._fh.write(self.sep.join(map(str, self.columns)) + "\n")
+
+    def _write(self, data, n):
+        pd.DataFrame(data, columns=self.columns).to_csv(
+            self._fh, sep=self.sep, header=False, index=False,
+            lineterminator="\n"
+        )
+
+    def _close(self):
+        self._fh.close()
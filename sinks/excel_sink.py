@@ -0,0 +1,247 @@
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import pandas as pd
+
+from pipeline import ConversionCancelled
+from sinks.base import OutputSink
+
+
+# ============================================================
+# Static workbook parts
+# ============================================================
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Cell styles: 0 = General, 1 = lat/lon (8 dp), 2 = easting/northing (4 dp)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="0.00000000"/>'
+    '<numFmt numFmtId="165" formatCode="0.0000"/>'
+    '</numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+# Characters that are not allowed in XML 1.0 text
+_ILLEGAL_XML = r"[\x00-\x08\x0b\x0c\x0e-\x1f]"
+
+
+def _workbook_xml(sheet_name):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name={quoteattr(sheet_name)} sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+# ============================================================
+# Column → cell XML (vectorized)
+# ============================================================
+
+def _clean_text(text):
+    """One string as escaped XML text (illegal characters dropped)."""
+    return escape(re.sub(_ILLEGAL_XML, "", str(text)))
+
+
+def _numeric_column(values):
+    """
+    Return the column as float64 if every filled value is numeric.
+
+    Coordinate columns holding formatted numbers (e.g. "3064905.4020")
+    are turned back into floats so Excel receives numeric cells; DMS
+    strings return None.
+    """
+    s = pd.Series(values)
+
+    if pd.api.types.is_bool_dtype(s):
+        return None
+    if pd.api.types.is_numeric_dtype(s):
+        return s.astype(float)
+
+    num = pd.to_numeric(s, errors="coerce")
+    filled = s.notna() & (s.astype(str).str.strip() != "")
+    if filled.any() and num[filled].notna().all():
+        return num.where(filled)
+
+    return None
+
+
+def _number_style(name):
+    """Display style of a coordinate result column; 0 for any other column."""
+    name = str(name).lower()
+    if name.endswith(("_lat", "_lon")):
+        return 1
+    if name.endswith(("_e", "_n")):
+        return 2
+    return 0
+
+
+def _text_cells(text):
+    return ('<c t="inlineStr"><is><t xml:space="preserve">' + text + "</t></is></c>").to_numpy(object)
+
+
+def _cells(name, values):
+    """
+    Build the <c> XML for one column chunk as an object array.
+
+    Only coordinate result columns become numeric cells; Point and any
+    other column stay text, so names like "0012" keep their zeros. NaN
+    is an empty cell and +-inf (no valid XML number) is text, as
+    DataFrame.to_excel writes it.
+    """
+    style = _number_style(name)
+    num = _numeric_column(values) if style else None
+
+    if num is not None:
+        cells = (f'<c s="{style}"><v>' + num.astype(str) + "</v></c>").to_numpy(object)
+        inf = np.isinf(num.to_numpy())
+        if inf.any():
+            cells[inf] = _text_cells(pd.Series(np.where(num[inf] > 0, "inf", "-inf")))
+        cells[num.isna().to_numpy()] = "<c/>"
+        return cells
+
+    s = pd.Series(values).astype(object)
+    empty = s.isna().to_numpy()
+    text = (
+        s.astype(str)
+         .str.replace(_ILLEGAL_XML, "", regex=True)
+         .str.replace("&", "&amp;", regex=False)
+         .str.replace("<", "&lt;", regex=False)
+         .str.replace(">", "&gt;", regex=False)
+    )
+    cells = _text_cells(text)
+    cells[empty] = "<c/>"
+    return cells
+
+
+# ============================================================
+# Constant-memory Excel sink
+# ============================================================
+
+class ExcelSink(OutputSink):
+    """
+    Streams rows into an .xlsx file with constant memory.
+
+    Equivalent to openpyxl's write-only mode, but each chunk's sheet XML
+    is built column-wise from the arrays instead of cell by cell, and
+    written straight into the compressed worksheet stream. Numbers are
+    stored as native numeric cells with a fixed-decimal display format.
+
+    Usage
+    -----
+    with ExcelSink(path) as sink:
+        for chunk in chunks:
+            sink.write(chunk)
+    """
+
+    def __init__(self, path: str, columns=None, sheet_name: str = "Sheet1"):
+        super().__init__(path, columns)
+        self.sheet_name = sheet_name
+        self._next_row = 1
+
+    def _open(self):
+        self._zip = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED, compresslevel=1)
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", _workbook_xml(self.sheet_name))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        self._zip.writestr("xl/styles.xml", _STYLES)
+
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._sheet.write(_SHEET_HEAD.encode("utf-8"))
+
+        cells = "".join(
+            f'<c t="inlineStr"><is><t xml:space="preserve">{_clean_text(c)}</t></is></c>'
+            for c in self.columns
+        )
+        self._sheet.write(f'<row r="1">{cells}</row>'.encode("utf-8"))
+        self._next_row = 2
+
+    def _write(self, data, n):
+        first = self._next_row
+        rows = pd.Series([f'<row r="{r}">' for r in range(first, first + n)], dtype=object)
+        for c in self.columns:
+            rows = rows + _cells(c, data[c])
+        rows = rows + "</row>"
+
+        self._sheet.write("".join(rows.tolist()).encode("utf-8"))
+        self._next_row += n
+
+    def _close(self):
+        self._sheet.write(_SHEET_TAIL.encode("utf-8"))
+        self._sheet.close()
+        self._zip.close()
+
+
+def write_excel(path: str, df, chunk_size: int = 50_000, progress=None, cancel=None):
+    """
+    Write a DataFrame to .xlsx through `ExcelSink`, chunk by chunk.
+
+    `progress(done, total)` is called after every chunk; setting `cancel`
+    (a threading.Event) stops between chunks, removes the partial file
+    and raises ConversionCancelled.
+    """
+    total = len(df)
+    try:
+        with ExcelSink(path, columns=df.columns) as sink:
+            for start in range(0, total, chunk_size):
+                if cancel is not None and cancel.is_set():
+                    raise ConversionCancelled()
+                sink.write(df.iloc[start:start + chunk_size])
+                if progress:
+                    progress(min(start + chunk_size, total), total)
+    except ConversionCancelled:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return sink.rows_written
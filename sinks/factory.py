@@ -0,0 +1,47 @@
+# ============================================================
+# Output format registry
+# ============================================================
+
+# format name -> (extensions, "module:Class", extra options)
+SINK_FORMATS = {
+    "xlsx": ((".xlsx",), "sinks.excel_sink:ExcelSink", {}),
+    "csv.gz": ((".csv.gz", ".gz"), "sinks.csv_sink:CsvSink", {"compress": True}),
+    "csv": ((".csv", ".txt"), "sinks.csv_sink:CsvSink", {}),
+    "parquet": ((".parquet", ".pq"), "sinks.arrow_sinks:ParquetSink", {}),
+    "feather": ((".feather", ".arrow"), "sinks.arrow_sinks:FeatherSink", {}),
+    "gpkg": ((".gpkg",), "sinks.gpkg_sink:GeoPackageSink", {}),
+    "fgb": ((".fgb",), "sinks.fgb_sink:FlatGeobufSink", {}),
+}
+
+
+def sink_format(path: str):
+    """Infer the output format name from a file path."""
+    lower = path.lower()
+    for fmt, (exts, _, _) in SINK_FORMATS.items():
+        if lower.endswith(exts):
+            return fmt
+    raise ValueError(
+        f"Unsupported output type: {path}\n"
+        f"Use one of: {', '.join(SINK_FORMATS)}"
+    )
+
+
+def open_sink(path: str, fmt: str = None, columns=None, **options):
+    """
+    Create the output sink for `path`.
+
+    The format is taken from `fmt` or inferred from the extension.
+    Sink modules are imported on demand so optional dependencies
+    (pyarrow) are only needed when their format is used.
+    """
+    from importlib import import_module
+
+    fmt = fmt or sink_format(path)
+    if fmt not in SINK_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+    _, target, defaults = SINK_FORMATS[fmt]
+    module_name, cls_name = target.split(":")
+    cls = getattr(import_module(module_name), cls_name)
+
+    return cls(path, columns=columns, **{**defaults, **options})
@@ -0,0 +1,621 @@
+import struct
+
+import numpy as np
+import pandas as pd
+
+from sinks.base import OutputSink
+from sinks.gpkg_sink import _layer_specs
+
+# ============================================================
+# FlatGeobuf constants (flatgeobuf.org, spec v3)
+# ============================================================
+
+MAGIC = b"fgb\x03fgb\x00"
+NODE_SIZE = 16
+
+GEOMETRY_POINT = 1
+COLUMN_DOUBLE = 10
+COLUMN_STRING = 11
+
+# Packed R-tree node: bbox + offset (byte offset for leaves,
+# node index of the first child for parents)
+NODE_ITEM = np.dtype([
+    ("min_x", "<f8"), ("min_y", "<f8"),
+    ("max_x", "<f8"), ("max_y", "<f8"),
+    ("offset", "<u8"),
+])
+
+HILBERT_MAX = (1 << 16) - 1
+
+
+# ============================================================
+# Minimal FlatBuffers encoder
+# ============================================================
+# Tables are written front to back: vtable, table, then children,
+# with forward uoffsets patched once each child's position is known.
+#
+# A table spec is a list indexed by field id; each entry is None or
+#   ("scalar", struct_fmt, value)
+#   ("string", str)
+#   ("vector", struct_fmt, values)   # vector of scalars
+#   ("bytes", bytes)                 # [ubyte]
+#   ("tables", [table_spec, ...])    # vector of tables
+#   ("table", table_spec)
+
+def _pad(buf, align):
+    buf.extend(b"\x00" * (-len(buf) % align))
+
+
+def _write_child(buf, child):
+    kind = child[0]
+
+    if kind == "string":
+        _pad(buf, 4)
+        pos = len(buf)
+        data = child[1].encode("utf-8")
+        buf.extend(struct.pack("<I", len(data)) + data + b"\x00")
+        return pos
+
+    if kind == "bytes":
+        _pad(buf, 4)
+        pos = len(buf)
+        buf.extend(struct.pack("<I", len(child[1])) + child[1])
+        return pos
+
+    if kind == "vector":
+        fmt, values = child[1], child[2]
+        size = struct.calcsize("<" + fmt)
+        # Elements must be aligned; the length prefix sits just before them
+        while (len(buf) + 4) % max(size, 4):
+            buf.append(0)
+        pos = len(buf)
+        buf.extend(struct.pack(f"<I{len(values)}{fmt}", len(values), *values))
+        return pos
+
+    if kind == "tables":
+        _pad(buf, 4)
+        pos = len(buf)
+        specs = child[1]
+        buf.extend(struct.pack("<I", len(specs)) + b"\x00" * 4 * len(specs))
+        for i, spec in enumerate(specs):
+            slot = pos + 4 + 4 * i
+            table_pos = _write_table(buf, spec)
+            struct.pack_into("<I", buf, slot, table_pos - slot)
+        return pos
+
+    if kind == "table":
+        return _write_table(buf, child[1])
+
+    raise ValueError(f"Unknown FlatBuffers child: {kind}")
+
+
+def _write_table(buf, spec):
+    # Inline layout: soffset, then fields largest first (keeps alignment)
+    inline = []
+    for field_id, field in enumerate(spec):
+        if field is None:
+            continue
+        size = struct.calcsize("<" + field[1]) if field[0] == "scalar" else 4
+        inline.append((size, field_id, field))
+    inline.sort(key=lambda f: -f[0])
+
+    offsets = {}
+    table_size = 4
+    for size, field_id, _ in inline:
+        table_size += -table_size % size
+        offsets[field_id] = table_size
+        table_size += size
+    align = max([4] + [size for size, _, _ in inline])
+    table_size += -table_size % 4
+
+    # vtable precedes the table; the table start must be aligned
+    vtable = [4 + 2 * len(spec), table_size]
+    vtable += [offsets.get(i, 0) for i in range(len(spec))]
+    vtable_bytes = struct.pack(f"<{len(vtable)}H", *vtable)
+
+    _pad(buf, 2)
+    while (len(buf) + len(vtable_bytes)) % align:
+        buf.extend(b"\x00\x00")
+    vtable_pos = len(buf)
+    buf.extend(vtable_bytes)
+
+    table_pos = len(buf)
+    buf.extend(b"\x00" * table_size)
+    struct.pack_into("<i", buf, table_pos, table_pos - vtable_pos)
+
+    children = []
+    for _, field_id, field in inline:
+        at = table_pos + offsets[field_id]
+        if field[0] == "scalar":
+            struct.pack_into("<" + field[1], buf, at, field[2])
+        else:
+            children.append((at, field))
+
+    for at, field in children:
+        child_pos = _write_child(buf, field)
+        struct.pack_into("<I", buf, at, child_pos - at)
+
+    return table_pos
+
+
+def _finish(spec):
+    buf = bytearray(4)
+    root = _write_table(buf, spec)
+    struct.pack_into("<I", buf, 0, root)
+    return bytes(buf)
+
+
+# ============================================================
+# Minimal FlatBuffers decoder (for reading files back)
+# ============================================================
+
+class _Table:
+    def __init__(self, buf, pos):
+        self.buf = buf
+        self.pos = pos
+        vt = pos - struct.unpack_from("<i", buf, pos)[0]
+        self._vt = vt
+        self._vt_size = struct.unpack_from("<H", buf, vt)[0]
+
+    @classmethod
+    def root(cls, buf):
+        return cls(buf, struct.unpack_from("<I", buf, 0)[0])
+
+    def _field(self, field_id):
+        entry = 4 + 2 * field_id
+        if entry >= self._vt_size:
+            return 0
+        off = struct.unpack_from("<H", self.buf, self._vt + entry)[0]
+        return self.pos + off if off else 0
+
+    def _deref(self, at):
+        return at + struct.unpack_from("<I", self.buf, at)[0]
+
+    def scalar(self, field_id, fmt, default=0):
+        at = self._field(field_id)
+        return struct.unpack_from("<" + fmt, self.buf, at)[0] if at else default
+
+    def string(self, field_id):
+        at = self._field(field_id)
+        if not at:
+            return None
+        pos = self._deref(at)
+        n = struct.unpack_from("<I", self.buf, pos)[0]
+        return bytes(self.buf[pos + 4:pos + 4 + n]).decode("utf-8")
+
+    def vector(self, field_id, fmt):
+        at = self._field(field_id)
+        if not at:
+            return []
+        pos = self._deref(at)
+        n = struct.unpack_from("<I", self.buf, pos)[0]
+        return list(struct.unpack_from(f"<{n}{fmt}", self.buf, pos + 4))
+
+    def raw_bytes(self, field_id):
+        at = self._field(field_id)
+        if not at:
+            return b""
+        pos = self._deref(at)
+        n = struct.unpack_from("<I", self.buf, pos)[0]
+        return bytes(self.buf[pos + 4:pos + 4 + n])
+
+    def table(self, field_id):
+        at = self._field(field_id)
+        return _Table(self.buf, self._deref(at)) if at else None
+
+    def tables(self, field_id):
+        at = self._field(field_id)
+        if not at:
+            return []
+        pos = self._deref(at)
+        n = struct.unpack_from("<I", self.buf, pos)[0]
+        return [
+            _Table(self.buf, self._deref(pos + 4 + 4 * i))
+            for i in range(n)
+        ]
+
+
+# ============================================================
+# Hilbert sort + packed R-tree
+# ============================================================
+
+def hilbert_index(x, y, extent):
+    """
+    Vectorized 16-bit Hilbert curve index of points within `extent`
+    (min_x, min_y, max_x, max_y); the same bit-twiddling curve used by
+    the FlatGeobuf reference writers.
+    """
+    min_x, min_y, max_x, max_y = extent
+    width = (max_x - min_x) or 1.0
+    height = (max_y - min_y) or 1.0
+
+    hx = np.floor(HILBERT_MAX * (np.asarray(x) - min_x) / width).astype(np.uint32)
+    hy = np.floor(HILBERT_MAX * (np.asarray(y) - min_y) / height).astype(np.uint32)
+    m = np.uint32(0xFFFF)
+
+    a = hx ^ hy
+    b = m ^ a
+    c = m ^ (hx | hy)
+    d = hx & (hy ^ m)
+
+    A = a | (b >> 1)
+    B = (a >> 1) ^ a
+    C = ((c >> 1) ^ (b & (d >> 1))) ^ c
+    D = ((a & (c >> 1)) ^ (d >> 1)) ^ d
+
+    a, b, c, d = A, B, C, D
+    A = (a & (a >> 2)) ^ (b & (b >> 2))
+    B = (a & (b >> 2)) ^ (b & ((a ^ b) >> 2))
+    C = C ^ ((a & (c >> 2)) ^ (b & (d >> 2)))
+    D = D ^ ((b & (c >> 2)) ^ ((a ^ b) & (d >> 2)))
+
+    a, b, c, d = A, B, C, D
+    A = (a & (a >> 4)) ^ (b & (b >> 4))
+    B = (a & (b >> 4)) ^ (b & ((a ^ b) >> 4))
+    C = C ^ ((a & (c >> 4)) ^ (b & (d >> 4)))
+    D = D ^ ((b & (c >> 4)) ^ ((a ^ b) & (d >> 4)))
+
+    a, b, c, d = A, B, C, D
+    C = C ^ ((a & (c >> 8)) ^ (b & (d >> 8)))
+    D = D ^ ((b & (c >> 8)) ^ ((a ^ b) & (d >> 8)))
+
+    a = C ^ (C >> 1)
+    b = D ^ (D >> 1)
+
+    i0 = hx ^ hy
+    i1 = b | (m ^ (i0 | a))
+
+    def spread(v):
+        v = (v | (v << 8)) & np.uint32(0x00FF00FF)
+        v = (v | (v << 4)) & np.uint32(0x0F0F0F0F)
+        v = (v | (v << 2)) & np.uint32(0x33333333)
+        v = (v | (v << 1)) & np.uint32(0x55555555)
+        return v
+
+    return (spread(i1) << 1) | spread(i0)
+
+
+def level_bounds(num_items, node_size=NODE_SIZE):
+    """
+    [(start, end)] node ranges per level, leaves first. Root is node 0,
+    leaves are stored last, as in the FlatGeobuf packed R-tree.
+    """
+    n = num_items
+    level_sizes = [n]
+    num_nodes = n
+    while True:
+        n = -(-n // node_size)
+        num_nodes += n
+        level_sizes.append(n)
+        if n == 1:
+            break
+
+    bounds = []
+    end = num_nodes
+    for size in level_sizes:
+        bounds.append((end - size, end))
+        end -= size
+    return bounds
+
+
+def build_packed_rtree(x, y, feature_offsets, node_size=NODE_SIZE):
+    """Build the node array for point leaves already in Hilbert order."""
+    bounds = level_bounds(len(x), node_size)
+    nodes = np.zeros(bounds[0][1], dtype=NODE_ITEM)
+
+    leaf_start, leaf_end = bounds[0]
+    leaves = nodes[leaf_start:leaf_end]
+    leaves["min_x"] = leaves["max_x"] = x
+    leaves["min_y"] = leaves["max_y"] = y
+    leaves["offset"] = feature_offsets
+
+    for (c_start, c_end), (p_start, p_end) in zip(bounds, bounds[1:]):
+        children = nodes[c_start:c_end]
+        groups = np.arange(0, c_end - c_start, node_size)
+        parents = nodes[p_start:p_end]
+        parents["min_x"] = np.minimum.reduceat(children["min_x"], groups)
+        parents["min_y"] = np.minimum.reduceat(children["min_y"], groups)
+        parents["max_x"] = np.maximum.reduceat(children["max_x"], groups)
+        parents["max_y"] = np.maximum.reduceat(children["max_y"], groups)
+        parents["offset"] = c_start + groups
+
+    return nodes
+
+
+# ============================================================
+# Writer
+# ============================================================
+
+def _header(name, extent, columns, count, crs):
+    code, wkt, crs_name = crs
+    crs_spec = [
+        ("string", "EPSG") if code else None,
+        ("scalar", "i", code) if code else None,
+        ("string", crs_name),
+        None,
+        ("string", wkt),
+    ]
+    column_specs = [
+        [("string", col), ("scalar", "B", col_type)]
+        for col, col_type in columns
+    ]
+    return _finish([
+        ("string", name),
+        ("vector", "d", list(extent)),
+        ("scalar", "B", GEOMETRY_POINT),
+        None, None, None, None,
+        ("tables", column_specs),
+        ("scalar", "Q", count),
+        ("scalar", "H", NODE_SIZE),
+        ("table", crs_spec),
+    ])
+
+
+def _feature_template():
+    """
+    Encode one point feature with sentinel coordinates and an empty
+    properties vector. Every point feature shares this layout, so real
+    features are produced by patching x/y and appending the properties.
+    """
+    sx, sy = 1.2345678901234567e300, -9.876543210987654e299
+    buf = _finish([
+        ("table", [None, ("vector", "d", [sx, sy]), None, None, None, None,
+                   ("scalar", "B", GEOMETRY_POINT)]),
+        ("bytes", b""),
+    ])
+    x_at = buf.index(struct.pack("<d", sx))
+    assert buf.endswith(b"\x00" * 4)
+    return buf[:x_at], buf[x_at + 16:-4]
+
+
+def write_flatgeobuf(path, x, y, properties, crs, name="points"):
+    """
+    Write points to a FlatGeobuf file with a packed Hilbert R-tree.
+
+    Parameters
+    ----------
+    path : str
+        Output .fgb path
+    x, y : array-like
+        Point coordinates in the layer CRS
+    properties : dict
+        Column name -> array; numeric columns become Double, others String
+    crs : tuple
+        (epsg_code or 0, wkt, name)
+    name : str
+        Layer name stored in the header
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    if not len(x):
+        raise ValueError("No points to export.")
+
+    # ---------------------------
+    # Property columns
+    # ---------------------------
+    columns, encoders = [], []
+    for i, (col, values) in enumerate(properties.items()):
+        s = pd.Series(values)[keep].reset_index(drop=True)
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            columns.append((str(col), COLUMN_DOUBLE))
+            encoders.append((i, "d", s.astype(float).tolist()))
+        else:
+            columns.append((str(col), COLUMN_STRING))
+            s = s.astype(object)
+            encoders.append((i, "s", s.where(s.notna(), None).tolist()))
+
+    # ---------------------------
+    # Hilbert order
+    # ---------------------------
+    extent = (x.min(), y.min(), x.max(), y.max())
+    order = np.argsort(hilbert_index(x, y, extent), kind="stable")
+    x, y = x[order], y[order]
+
+    # ---------------------------
+    # Features (size-prefixed FlatBuffers)
+    # ---------------------------
+    head, tail = _feature_template()
+    pack_xy = struct.Struct("<dd").pack
+    pack_double = struct.Struct("<Hd").pack
+    pack_str = struct.Struct("<HI").pack
+
+    features = []
+    offsets = np.zeros(len(x), dtype=np.uint64)
+    pos = 0
+    for k, (row, px, py) in enumerate(zip(order.tolist(), x.tolist(), y.tolist())):
+        props = []
+        for i, kind, values in encoders:
+            v = values[row]
+            if v is None or (kind == "d" and v != v):
+                continue
+            if kind == "d":
+                props.append(pack_double(i, v))
+            else:
+                data = str(v).encode("utf-8")
+                props.append(pack_str(i, len(data)) + data)
+        props = b"".join(props)
+
+        fb = head + pack_xy(px, py) + tail + struct.pack("<I", len(props)) + props
+        features.append(struct.pack("<I", len(fb)) + fb)
+        offsets[k] = pos
+        pos += 4 + len(fb)
+
+    nodes = build_packed_rtree(x, y, offsets)
+    header = _header(name, extent, columns, len(x), crs)
+
+    with open(path, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<I", len(header)))
+        fh.write(header)
+        fh.write(nodes.tobytes())
+        fh.writelines(features)
+
+    return len(x)
+
+
+# ============================================================
+# Reader (bbox query through the index)
+# ============================================================
+
+def _read_header(fh):
+    if fh.read(8)[:3] != b"fgb":
+        raise ValueError("Not a FlatGeobuf file.")
+    size = struct.unpack("<I", fh.read(4))[0]
+    hdr = _Table.root(fh.read(size))
+
+    columns = [
+        (c.string(0), c.scalar(1, "B")) for c in hdr.tables(7)
+    ]
+    crs = hdr.table(10)
+    return {
+        "name": hdr.string(0),
+        "envelope": hdr.vector(1, "d"),
+        "geometry_type": hdr.scalar(2, "B"),
+        "columns": columns,
+        "features_count": hdr.scalar(8, "Q"),
+        "index_node_size": hdr.scalar(9, "H", NODE_SIZE),
+        "crs_code": crs.scalar(1, "i") if crs else 0,
+        "header_end": 12 + size,
+    }
+
+
+def _decode_feature(buf, columns):
+    feature = _Table.root(buf)
+    geom = feature.table(0)
+    x, y = geom.vector(1, "d")[:2]
+
+    props = {}
+    raw = feature.raw_bytes(1)
+    pos = 0
+    while pos < len(raw):
+        i = struct.unpack_from("<H", raw, pos)[0]
+        pos += 2
+        name, col_type = columns[i]
+        if col_type == COLUMN_DOUBLE:
+            props[name] = struct.unpack_from("<d", raw, pos)[0]
+            pos += 8
+        elif col_type == COLUMN_STRING:
+            n = struct.unpack_from("<I", raw, pos)[0]
+            props[name] = raw[pos + 4:pos + 4 + n].decode("utf-8")
+            pos += 4 + n
+        else:
+            raise ValueError(f"Unsupported column type: {col_type}")
+
+    return x, y, props
+
+
+def read_flatgeobuf(path, bbox=None):
+    """
+    Read point features, optionally only those inside `bbox`
+    (min_x, min_y, max_x, max_y).
+
+    With a bbox, the packed R-tree is searched and only the matching
+    features are read, which is the same access pattern an HTTP client
+    uses with range requests. Returns (header, DataFrame with x, y and
+    the property columns).
+    """
+    with open(path, "rb") as fh:
+        header = _read_header(fh)
+        count = header["features_count"]
+        node_size = header["index_node_size"]
+
+        bounds = level_bounds(count, node_size) if count and node_size else []
+        num_nodes = bounds[0][1] if bounds else 0
+        data_start = header["header_end"] + num_nodes * NODE_ITEM.itemsize
+
+        if bbox is None or not bounds:
+            offsets = None
+        else:
+            min_x, min_y, max_x, max_y = bbox
+            leaf_start = bounds[0][0]
+            offsets = []
+            queue = [(0, len(bounds) - 1)]
+
+            while queue:
+                node_index, level = queue.pop()
+                level_end = bounds[level][1]
+                end = min(node_index + node_size, level_end)
+
+                fh.seek(header["header_end"] + node_index * NODE_ITEM.itemsize)
+                block = np.frombuffer(
+                    fh.read((end - node_index) * NODE_ITEM.itemsize), dtype=NODE_ITEM
+                )
+                hit = (
+                    (block["max_x"] >= min_x) & (block["min_x"] <= max_x) &
+                    (block["max_y"] >= min_y) & (block["min_y"] <= max_y)
+                )
+                if node_index >= leaf_start:
+                    offsets.extend(block["offset"][hit].tolist())
+                else:
+                    queue.extend((int(o), level - 1) for o in block["offset"][hit])
+
+            offsets.sort()
+
+        rows = []
+        if offsets is None:
+            fh.seek(data_start)
+            for _ in range(count):
+                size = struct.unpack("<I", fh.read(4))[0]
+                rows.append(_decode_feature(fh.read(size), header["columns"]))
+        else:
+            for off in offsets:
+                fh.seek(data_start + off)
+                size = struct.unpack("<I", fh.read(4))[0]
+                rows.append(_decode_feature(fh.read(size), header["columns"]))
+
+    df = pd.DataFrame(
+        [{"x": x, "y": y, **props} for x, y, props in rows],
+        columns=["x", "y"] + [c for c, _ in header["columns"]]
+    )
+    return header, df
+
+
+# ============================================================
+# FlatGeobuf sink
+# ============================================================
+
+class FlatGeobufSink(OutputSink):
+    """
+    Collects chunks and writes one FlatGeobuf file at close.
+
+    FlatGeobuf stores the spatial index before the features, so the
+    points are buffered as arrays until the end. Geometry comes from
+    `layer` ("WGS84", "UTM45", "MUTM84", ... default: the first output
+    CRS present); every column is also written as a property.
+    """
+
+    def __init__(self, path: str, columns=None, layer: str = None):
+        super().__init__(path, columns)
+        self.layer = layer
+        self._chunks = []
+
+    def _write(self, data, n):
+        self._chunks.append(data)
+
+    def _close(self):
+        specs = _layer_specs(self.columns)
+        if self.layer:
+            specs = [s for s in specs if s[0] == self.layer.lower()]
+        if not specs:
+            raise ValueError(
+                "FlatGeobuf output needs a WGS84, UTM or MUTM coordinate pair."
+            )
+
+        table, x_col, y_col, srs_id, org, _, srs_name, crs = specs[0]
+        data = {
+            c: np.concatenate([np.asarray(ch[c]) for ch in self._chunks])
+            if self._chunks else np.array([])
+            for c in self.columns
+        }
+        self._chunks = []
+
+        write_flatgeobuf(
+            self.path,
+            data[x_col],
+            data[y_col],
+            data,
+            (srs_id if org == "EPSG" else 0, crs.to_wkt(), srs_name),
+            name=table
+        )
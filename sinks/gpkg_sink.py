@@ -0,0 +1,296 @@
+import os
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from crs_utils import make_wgs84, make_utm, make_mutm_with_towgs
+from sinks.base import OutputSink
+
+# ============================================================
+# GeoPackage core tables (OGC 12-128r18, GeoPackage 1.3)
+# ============================================================
+
+_GPKG_APPLICATION_ID = 0x47504B47  # "GPKG"
+_GPKG_USER_VERSION = 10300
+
+_CORE_SCHEMA = """
+CREATE TABLE gpkg_spatial_ref_sys (
+    srs_name TEXT NOT NULL,
+    srs_id INTEGER PRIMARY KEY,
+    organization TEXT NOT NULL,
+    organization_coordsys_id INTEGER NOT NULL,
+    definition TEXT NOT NULL,
+    description TEXT
+);
+CREATE TABLE gpkg_contents (
+    table_name TEXT NOT NULL PRIMARY KEY,
+    data_type TEXT NOT NULL,
+    identifier TEXT UNIQUE,
+    description TEXT DEFAULT '',
+    last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+    min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+    srs_id INTEGER,
+    CONSTRAINT fk_gc_r_srs_id FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id)
+);
+CREATE TABLE gpkg_geometry_columns (
+    table_name TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    geometry_type_name TEXT NOT NULL,
+    srs_id INTEGER NOT NULL,
+    z TINYINT NOT NULL,
+    m TINYINT NOT NULL,
+    CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name),
+    CONSTRAINT uk_gc_table_name UNIQUE (table_name),
+    CONSTRAINT fk_gc_tn FOREIGN KEY (table_name) REFERENCES gpkg_contents(table_name),
+    CONSTRAINT fk_gc_srs FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys (srs_id)
+);
+CREATE TABLE gpkg_extensions (
+    table_name TEXT,
+    column_name TEXT,
+    extension_name TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    CONSTRAINT ge_tce UNIQUE (table_name, column_name, extension_name)
+);
+INSERT INTO gpkg_spatial_ref_sys VALUES
+    ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', 'undefined cartesian coordinate reference system'),
+    ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', 'undefined geographic coordinate reference system');
+"""
+
+# Standard R-tree maintenance triggers, so later edits in QGIS keep the
+# index in sync. ST_* functions are provided by the reading application.
+_RTREE_TRIGGERS = """
+CREATE TRIGGER "rtree_{t}_geom_insert" AFTER INSERT ON "{t}"
+WHEN (new.geom NOT NULL AND NOT ST_IsEmpty(NEW.geom))
+BEGIN
+  INSERT OR REPLACE INTO "rtree_{t}_geom" VALUES (
+    NEW.fid, ST_MinX(NEW.geom), ST_MaxX(NEW.geom), ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+END;
+CREATE TRIGGER "rtree_{t}_geom_update1" AFTER UPDATE OF geom ON "{t}"
+WHEN OLD.fid = NEW.fid AND (NEW.geom NOTNULL AND NOT ST_IsEmpty(NEW.geom))
+BEGIN
+  INSERT OR REPLACE INTO "rtree_{t}_geom" VALUES (
+    NEW.fid, ST_MinX(NEW.geom), ST_MaxX(NEW.geom), ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+END;
+CREATE TRIGGER "rtree_{t}_geom_update2" AFTER UPDATE OF geom ON "{t}"
+WHEN OLD.fid = NEW.fid AND (NEW.geom ISNULL OR ST_IsEmpty(NEW.geom))
+BEGIN
+  DELETE FROM "rtree_{t}_geom" WHERE id = OLD.fid;
+END;
+CREATE TRIGGER "rtree_{t}_geom_update3" AFTER UPDATE ON "{t}"
+WHEN OLD.fid != NEW.fid AND (NEW.geom NOTNULL AND NOT ST_IsEmpty(NEW.geom))
+BEGIN
+  DELETE FROM "rtree_{t}_geom" WHERE id = OLD.fid;
+  INSERT OR REPLACE INTO "rtree_{t}_geom" VALUES (
+    NEW.fid, ST_MinX(NEW.geom), ST_MaxX(NEW.geom), ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+END;
+CREATE TRIGGER "rtree_{t}_geom_update4" AFTER UPDATE ON "{t}"
+WHEN OLD.fid != NEW.fid AND (NEW.geom ISNULL OR ST_IsEmpty(NEW.geom))
+BEGIN
+  DELETE FROM "rtree_{t}_geom" WHERE id IN (OLD.fid, NEW.fid);
+END;
+CREATE TRIGGER "rtree_{t}_geom_delete" AFTER DELETE ON "{t}"
+WHEN old.geom NOT NULL
+BEGIN
+  DELETE FROM "rtree_{t}_geom" WHERE id = OLD.fid;
+END;
+"""
+
+# GeoPackageBinary header (little endian, no envelope) + WKB Point
+_POINT_BLOB = np.dtype([
+    ("magic", "S2"), ("version", "u1"), ("flags", "u1"), ("srs_id", "<i4"),
+    ("byte_order", "u1"), ("wkb_type", "<u4"), ("x", "<f8"), ("y", "<f8"),
+])
+
+
+# ============================================================
+# Layers: one per output CRS found in the chunk columns
+# ============================================================
+
+def _layer_specs(columns):
+    """
+    Returns [(table, x_col, y_col, srs_id, org, org_id, srs_name, crs)]
+    for every coordinate pair in `columns`.
+    """
+    specs = []
+
+    if "WGS84_Lon" in columns and "WGS84_Lat" in columns:
+        specs.append((
+            "wgs84", "WGS84_Lon", "WGS84_Lat",
+            4326, "EPSG", 4326, "WGS 84", make_wgs84()
+        ))
+
+    for c in columns:
+        m = re.fullmatch(r"(M?UTM)(\d+)_E", str(c))
+        if not m or f"{m.group(1)}{m.group(2)}_N" not in columns:
+            continue
+
+        kind, zone = m.group(1), int(m.group(2))
+        if kind == "UTM":
+            specs.append((
+                f"utm{zone}", c, f"UTM{zone}_N",
+                32600 + zone, "EPSG", 32600 + zone,
+                f"WGS 84 / UTM zone {zone}N", make_utm(zone)
+            ))
+        else:
+            # Custom SRS ids for MUTM (GDAL convention: >= 100000)
+            specs.append((
+                f"mutm{zone}", c, f"MUTM{zone}_N",
+                100000 + zone, "NONE", 100000 + zone,
+                f"MUTM CM {zone} (Everest 1830)", make_mutm_with_towgs(zone)
+            ))
+
+    return specs
+
+
+def _point_blobs(x, y, srs_id):
+    blob = np.zeros(len(x), dtype=_POINT_BLOB)
+    blob["magic"] = b"GP"
+    blob["flags"] = 0b00000001  # little endian, no envelope
+    blob["srs_id"] = srs_id
+    blob["byte_order"] = 1
+    blob["wkb_type"] = 1  # wkbPoint
+    blob["x"] = x
+    blob["y"] = y
+    return blob.view(f"V{_POINT_BLOB.itemsize}").tolist()
+
+
+# ============================================================
+# GeoPackage sink
+# ============================================================
+
+class GeoPackageSink(OutputSink):
+    """
+    Streams points into a GeoPackage, one layer per output CRS.
+
+    Each chunk is bulk-inserted with `executemany` inside a single
+    transaction. The GeoPackage R-tree spatial index is built once at
+    close from the collected coordinates, so QGIS can run fast spatial
+    queries as soon as the file is opened.
+    """
+
+    def __init__(self, path: str, columns=None, name_column: str = "Point"):
+        super().__init__(path, columns)
+        self.name_column = name_column
+
+    def _open(self):
+        self._layers = _layer_specs(self.columns)
+        if not self._layers:
+            raise ValueError(
+                "GeoPackage output needs at least one WGS84, UTM or MUTM "
+                "coordinate pair."
+            )
+
+        # Overwrite like the other sinks, never append to an old file
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        # isolation_level=None: transactions are managed explicitly
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        db = self._db
+        db.execute("PRAGMA journal_mode = MEMORY")
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute(f"PRAGMA application_id = {_GPKG_APPLICATION_ID}")
+        db.execute(f"PRAGMA user_version = {_GPKG_USER_VERSION}")
+
+        db.execute("BEGIN")
+        for stmt in _CORE_SCHEMA.split(";"):
+            if stmt.strip():
+                db.execute(stmt)
+
+        for table, _, _, srs_id, org, org_id, srs_name, crs in self._layers:
+            db.execute(
+                "INSERT OR IGNORE INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)",
+                (srs_name, srs_id, org, org_id, crs.to_wkt("WKT1_GDAL"), srs_name)
+            )
+            db.execute(
+                f'CREATE TABLE "{table}" ('
+                "fid INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, "
+                f'geom POINT, "{self.name_column}" TEXT)'
+            )
+            db.execute(
+                f'CREATE TEMP TABLE "_xy_{table}" (id INTEGER PRIMARY KEY, x REAL, y REAL)'
+            )
+            db.execute(
+                "INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) "
+                "VALUES (?, 'features', ?, ?)",
+                (table, table, srs_id)
+            )
+            db.execute(
+                "INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', 'POINT', ?, 0, 0)",
+                (table, srs_id)
+            )
+
+        self._next_fid = 1
+
+    def _write(self, data, n):
+        db = self._db
+        fids = range(self._next_fid, self._next_fid + n)
+
+        if self.name_column in data:
+            names = pd.Series(data[self.name_column]).astype(object)
+            names = names.where(names.notna(), None).map(
+                lambda v: v if v is None else str(v)
+            ).tolist()
+        else:
+            names = [None] * n
+
+        for table, x_col, y_col, srs_id, *_ in self._layers:
+            x = np.asarray(data[x_col], dtype=float)
+            y = np.asarray(data[y_col], dtype=float)
+            valid = ~(np.isnan(x) | np.isnan(y))
+
+            blobs = _point_blobs(x, y, srs_id)
+            geoms = [b if ok else None for b, ok in zip(blobs, valid.tolist())]
+
+            db.executemany(
+                f'INSERT INTO "{table}" (fid, geom, "{self.name_column}") VALUES (?, ?, ?)',
+                zip(fids, geoms, names)
+            )
+            db.executemany(
+                f'INSERT INTO "_xy_{table}" VALUES (?, ?, ?)',
+                zip(np.asarray(fids)[valid].tolist(), x[valid].tolist(), y[valid].tolist())
+            )
+
+        self._next_fid += n
+
+    def _close(self):
+        db = self._db
+
+        for table, *_ in self._layers:
+            # ---------------------------
+            # Extent + R-tree index (built once, after the bulk load)
+            # ---------------------------
+            db.execute(
+                f"""
+                UPDATE gpkg_contents SET
+                    min_x = (SELECT MIN(x) FROM "_xy_{table}"),
+                    min_y = (SELECT MIN(y) FROM "_xy_{table}"),
+                    max_x = (SELECT MAX(x) FROM "_xy_{table}"),
+                    max_y = (SELECT MAX(y) FROM "_xy_{table}")
+                WHERE table_name = ?
+                """,
+                (table,)
+            )
+            db.execute(
+                f'CREATE VIRTUAL TABLE "rtree_{table}_geom" '
+                "USING rtree(id, minx, maxx, miny, maxy)"
+            )
+            db.execute(
+                f'INSERT INTO "rtree_{table}_geom" '
+                f'SELECT id, x, x, y, y FROM "_xy_{table}"'
+            )
+            db.execute(f'DROP TABLE "_xy_{table}"')
+            db.execute(
+                "INSERT INTO gpkg_extensions VALUES (?, 'geom', 'gpkg_rtree_index', "
+                "'http://www.geopackage.org/spec120/#extension_rtree', 'write-only')",
+                (table,)
+            )
+            for stmt in _RTREE_TRIGGERS.format(t=table).split("END;"):
+                if stmt.strip():
+                    db.execute(stmt + "END;")
+
+        db.execute("COMMIT")
+        db.close()
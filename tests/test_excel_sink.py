@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sinks.excel_sink import ExcelSink, write_excel
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def _read_back(path):
+    ws = openpyxl.load_workbook(path).active
+    return [[c.value for c in row] for row in ws.iter_rows()]
+
+
+def test_names_stay_text_and_inf_loads(tmp_path):
+    path = tmp_path / "out.xlsx"
+    with ExcelSink(str(path)) as sink:
+        sink.write({
+            "Point": np.array(["0012", "0013", "7"], dtype=object),
+            "WGS84_Lat": np.array([27.5, np.nan, 28.25]),
+            "UTM45_E": np.array([500000.125, np.inf, -np.inf]),
+        })
+
+    rows = _read_back(path)
+    assert rows[0] == ["Point", "WGS84_Lat", "UTM45_E"]
+    assert rows[1] == ["0012", 27.5, 500000.125]
+    assert rows[2] == ["0013", None, "inf"]
+    assert rows[3] == ["7", 28.25, "-inf"]
+
+
+def test_preview_strings_round_trip(tmp_path):
+    # The preview table holds formatted strings; DMS stays text
+    df = pd.DataFrame({
+        "Point": ["001", "A&B"],
+        "WGS84_Lat": ["27°30'0.00\"N", "28°15'0.00\"N"],
+        "MUTM84_N": ["3064905.4020", "inf"],
+    })
+    path = tmp_path / "preview.xlsx"
+    assert write_excel(str(path), df, chunk_size=1) == 2
+
+    rows = _read_back(path)
+    assert rows[1] == ["001", "27°30'0.00\"N", 3064905.402]
+    assert rows[2] == ["A&B", "28°15'0.00\"N", "inf"]
+
+
+def test_header_illegal_characters_are_dropped(tmp_path):
+    path = tmp_path / "header.xlsx"
+    with ExcelSink(str(path), columns=["Point\x01", "Note <x>"]) as sink:
+        sink.write({"Point\x01": ["a\x0b"], "Note <x>": ["1"]})
+
+    assert _read_back(path) == [["Point", "Note <x>"], ["a", "1"]]
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from sinks.fgb_sink import (
+    NODE_ITEM, FlatGeobufSink, _read_header, level_bounds, read_flatgeobuf,
+)
+
+N = 5000
+CHUNK = 1200
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(30)
+    lon = np.round(rng.uniform(80.0, 88.2, N), 8)
+    lat = np.round(rng.uniform(26.3, 30.5, N), 8)
+    lon[:50] = 85.0    # stacked duplicates on one meridian
+    lat[:50] = np.round(np.linspace(27.0, 28.0, 50), 8)
+    names = np.array([f"P{i:05d}" for i in range(N)], dtype=object)
+    return names, lon, lat
+
+
+@pytest.fixture(scope="module")
+def fgb_path(points, tmp_path_factory):
+    names, lon, lat = points
+    path = str(tmp_path_factory.mktemp("fgb") / "points.fgb")
+    with FlatGeobufSink(path) as sink:
+        for start in range(0, N, CHUNK):
+            s = slice(start, start + CHUNK)
+            sink.write({
+                "Point": names[s],
+                "WGS84_Lat": lat[s],
+                "WGS84_Lon": lon[s],
+                "UTM45_E": lon[s] * 1000,
+                "UTM45_N": lat[s] * 1000,
+            })
+    return path
+
+
+def _brute(points, bbox):
+    names, lon, lat = points
+    min_x, min_y, max_x, max_y = bbox
+    inside = (lon >= min_x) & (lon <= max_x) & (lat >= min_y) & (lat <= max_y)
+    return sorted(names[inside])
+
+
+def _nodes(path):
+    with open(path, "rb") as fh:
+        header = _read_header(fh)
+        count = header["features_count"]
+        bounds = level_bounds(count, header["index_node_size"])
+        fh.seek(header["header_end"])
+        return np.frombuffer(fh.read(bounds[0][1] * NODE_ITEM.itemsize), dtype=NODE_ITEM)
+
+
+def test_read_back_all(points, fgb_path):
+    names, lon, lat = points
+    header, df = read_flatgeobuf(fgb_path)
+
+    assert header["features_count"] == N
+    assert header["crs_code"] == 4326
+    assert [c for c, _ in header["columns"]] == [
+        "Point", "WGS84_Lat", "WGS84_Lon", "UTM45_E", "UTM45_N"
+    ]
+
+    df = df.sort_values("Point").reset_index(drop=True)
+    assert df["Point"].tolist() == names.tolist()
+    np.testing.assert_array_equal(df["x"], lon)
+    np.testing.assert_array_equal(df["y"], lat)
+    np.testing.assert_array_equal(df["WGS84_Lat"], lat)
+    np.testing.assert_array_equal(df["UTM45_E"], lon * 1000)
+
+
+def test_index_covers_its_children(fgb_path):
+    nodes = _nodes(fgb_path)
+    root = nodes[0]
+    header, df = read_flatgeobuf(fgb_path)
+    assert (root["min_x"], root["max_x"]) == (df["x"].min(), df["x"].max())
+    assert (root["min_y"], root["max_y"]) == (df["y"].min(), df["y"].max())
+
+
+def test_bbox_queries_match_brute_force(points, fgb_path):
+    names, lon, lat = points
+    nodes = _nodes(fgb_path)
+    node = nodes[3]    # an internal node: its box is exactly a boundary
+    boundary = (node["min_x"], node["min_y"], node["max_x"], node["max_y"])
+
+    bboxes = [
+        (0.0, 0.0, 1.0, 1.0),                          # empty
+        (-180.0, -90.0, 180.0, 90.0),                  # everything
+        (lon.min(), lat.min(), lon.max(), lat.max()),  # exact extent
+        boundary,
+        (85.0, 27.0, 85.0, 28.0),                      # zero-width, on the duplicates
+        (lon[100], lat[100], lon[100], lat[100]),      # a single point
+        (82.0, 27.0, 84.5, 29.0),
+    ]
+    for bbox in bboxes:
+        _, df = read_flatgeobuf(fgb_path, bbox=bbox)
+        assert sorted(df["Point"]) == _brute(points, bbox), bbox
+
+
+def test_nan_points_are_dropped(tmp_path):
+    path = str(tmp_path / "nan.fgb")
+    with FlatGeobufSink(path) as sink:
+        sink.write({
+            "Point": np.array(["a", "b", "c"], dtype=object),
+            "WGS84_Lat": np.array([27.0, np.nan, 28.0]),
+            "WGS84_Lon": np.array([85.0, 86.0, 87.0]),
+        })
+    header, df = read_flatgeobuf(path, bbox=(80.0, 20.0, 90.0, 30.0))
+    assert header["features_count"] == 2
+    assert sorted(df["Point"]) == ["a", "c"]
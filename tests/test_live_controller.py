@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from controllers.job import JobSpec, run_job
+from controllers.live_controller import LiveSession
+
+
+@pytest.mark.parametrize("src, text", [
+    ("MUTM81", "A,500000,3100000\nB,NaN,3100001\n"),
+    ("MUTM81", "A,3100000,500000\nB,NaN,3100001\nC,3100002,500001\n"),
+    ("WGS84", "A,28.1,85.2\nB,inf,84\n"),
+])
+def test_non_finite_lines_match_full_run(src, text):
+    df_in, order, cols = LiveSession().update(text, src, 45, 84)
+    full = run_job(JobSpec(src_crs=src, text=text, has_header=False))
+
+    assert order == full.order
+    for name in set(cols) & set(full.columns):
+        np.testing.assert_array_equal(
+            np.asarray(cols[name]).astype(str), np.asarray(full.columns[name]).astype(str)
+        )
+
+
+def test_only_non_finite_lines():
+    with pytest.raises(ValueError, match="No valid coordinate rows"):
+        LiveSession().update("B,NaN,1\n", "MUTM81", 45, 84)
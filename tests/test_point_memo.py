@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from controllers.point_memo import RESULT_KEYS, PointMemo
+from transform import transform_arrays
+
+SRC = "MUTM81"
+
+
+def _control_points(n, seed):
+    rng = np.random.default_rng(seed)
+    e = np.round(rng.uniform(450_000, 550_000, n), 3)
+    n_ = np.round(rng.uniform(3_050_000, 3_250_000, n), 3)
+    return e, n_
+
+
+def _assert_same(got, x, y):
+    want = transform_arrays(x, y, SRC, 45, 84)
+    for k in RESULT_KEYS:
+        np.testing.assert_array_equal(got[k], want[k], err_msg=k)
+
+
+@pytest.mark.parametrize("max_bytes", [64 * 1024, 4 * 1024 * 1024])
+def test_repeated_points(tmp_path, max_bytes):
+    # A few control points, each repeated many times within every chunk
+    e, n = _control_points(40, 50)
+    rng = np.random.default_rng(0)
+    pick = rng.integers(0, len(e), 5000)
+    x, y = e[pick], n[pick]
+    x[::97] = np.nan    # never memoized
+
+    with PointMemo(str(tmp_path / "memo.bin"), max_bytes=max_bytes) as memo:
+        for _ in range(4):
+            _assert_same(memo.transform_arrays(x, y, SRC, 45, 84), x, y)
+            s = memo.stats()
+            assert s["hits"] <= s["points"]
+            assert 0.0 <= s["hit_rate"] <= 1.0
+
+        # Each point is stored once, however often a chunk repeats it
+        assert s["records"] == len(e)
+        assert s["hits"] > 0
+
+
+def test_reopen_and_evict(tmp_path):
+    path = str(tmp_path / "memo.bin")
+    x, y = _control_points(3000, 51)
+
+    # More points than slots: later sightings evict earlier points
+    with PointMemo(path, max_bytes=256 * 1024) as memo:
+        for _ in range(3):
+            _assert_same(memo.transform_arrays(x, y, SRC, 45, 84), x, y)
+        s = memo.stats()
+        assert s["records"] <= s["capacity"] < len(x)
+        assert s["evicted"] > 0
+
+    with PointMemo(path) as memo:
+        _assert_same(memo.transform_arrays(x, y, SRC, 45, 84), x, y)
+        s = memo.stats()
+        assert 0 < s["hits"] <= s["points"]
@@ -0,0 +1,21 @@
+import io
+
+import pytest
+
+from controllers.stream_filter import filter_stream
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 100])
+def test_bad_lines_become_star_rows(block_size):
+    text = "A,500000,3100000\nX,ABC,1\nfoo\nB,500002,3100002\n"
+    out, bad = io.StringIO(), []
+    stats = filter_stream(
+        io.StringIO(text), out, "MUTM81", block_size=block_size, on_bad_line=bad.append
+    )
+
+    rows = [line.split(",") for line in out.getvalue().splitlines()]
+    assert [r[0] for r in rows] == ["A", "X", "", "B"]
+    assert set(rows[1][1:]) == set(rows[2][1:]) == {"*"}
+    assert "*" not in rows[0] + rows[3]
+    assert [m.split(":")[0] for m in bad] == ["Line 2", "Line 3"]
+    assert stats["bad_lines"] == 2 and stats["points"] == 4
@@ -1,3 +1,6 @@
+from functools import lru_cache
+
+import numpy as np
 from pyproj import Transformer
 
 from crs_utils import (
@@ -8,126 +11,170 @@ from crs_utils import (
 )
 
 # ============================================================
-# Main transformation engine
+# Cached transformers (built once per CRS pair)
 # ============================================================
 
-def transform_all(df, src_crs_name, out_utm_zone, out_mutm_cm):
+def decode_src(src_crs_name):
     """
-    Returns list of rows:
-    [Point, WGS84_lat, WGS84_lon, UTM_E, UTM_N, UTM_zone, MUTM_E, MUTM_N, MUTM_CM]
+    Returns (kind, zone) for a source CRS name:
+    "WGS84" -> ("WGS84", None), "UTM45" -> ("UTM", 45), "MUTM84" -> ("MUTM", 84)
     """
+    if src_crs_name == "WGS84":
+        return "WGS84", None
+    if src_crs_name.startswith("MUTM"):
+        return "MUTM", int(src_crs_name.replace("MUTM", ""))
+    if src_crs_name.startswith("UTM"):
+        return "UTM", int(src_crs_name.replace("UTM", ""))
+    raise ValueError(f"Unsupported source CRS: {src_crs_name}")
 
-    rows = []
 
-    # ---------------------------
-    # Decode source CRS
-    # ---------------------------
-    if src_crs_name.startswith("MUTM"):
-        src_cm = int(src_crs_name.replace("MUTM", ""))
-        src_is_mutm = True
-    else:
-        src_cm = None
-        src_is_mutm = False
-
-    src_is_wgs = src_crs_name == "WGS84"
-    src_is_utm = src_crs_name.startswith("UTM")
-
-    # ---------------------------
-    # STEP 1: Source → WGS84
-    # ---------------------------
-    if src_is_wgs:
-        to_wgs = None
-
-    elif src_is_utm:
-        zone = int(src_crs_name.replace("UTM", ""))
-        to_wgs = Transformer.from_crs(
+@lru_cache(maxsize=None)
+def source_to_wgs(src_crs_name):
+    kind, zone = decode_src(src_crs_name)
+
+    if kind == "WGS84":
+        return None
+
+    if kind == "UTM":
+        return Transformer.from_crs(
             make_utm(zone),
             make_wgs84(),
             always_xy=True
         )
 
-    elif src_is_mutm:
-        # MUTM → WGS84 MUST use datum shift
-        to_wgs = Transformer.from_crs(
-            make_mutm_with_towgs(src_cm),
-            make_wgs84(),
-            always_xy=True
-        )
+    # MUTM → WGS84 MUST use datum shift
+    return Transformer.from_crs(
+        make_mutm_with_towgs(zone),
+        make_wgs84(),
+        always_xy=True
+    )
 
-    else:
-        raise ValueError(f"Unsupported source CRS: {src_crs_name}")
 
-    # ---------------------------
-    # STEP 2: WGS84 → UTM
-    # ---------------------------
-    wgs_to_utm = Transformer.from_crs(
+@lru_cache(maxsize=None)
+def wgs_to_utm(zone):
+    return Transformer.from_crs(
         make_wgs84(),
-        make_utm(out_utm_zone),
+        make_utm(zone),
         always_xy=True
     )
 
-    # ---------------------------
-    # STEP 3: WGS84 → MUTM
-    # ---------------------------
-    wgs_to_mutm = Transformer.from_crs(
+
+@lru_cache(maxsize=None)
+def wgs_to_mutm(cm):
+    return Transformer.from_crs(
         make_wgs84(),
-        make_mutm_with_towgs(out_mutm_cm),
+        make_mutm_with_towgs(cm),
         always_xy=True
     )
 
-    # ---------------------------
-    # STEP 4: MUTM → MUTM (projection-only)
-    # ---------------------------
-    if src_is_mutm and src_cm != out_mutm_cm:
-        mutm_to_mutm = Transformer.from_crs(
-            make_mutm_local(src_cm),
-            make_mutm_local(out_mutm_cm),
-            always_xy=True
+
+@lru_cache(maxsize=None)
+def mutm_to_mutm(src_cm, dst_cm):
+    # Projection-only: both sides share the same datum
+    return Transformer.from_crs(
+        make_mutm_local(src_cm),
+        make_mutm_local(dst_cm),
+        always_xy=True
+    )
+
+
+def warm_up(src_crs_name, out_utm_zone, out_mutm_cm):
+    """
+    Build and cache every transformer a conversion with these settings
+    needs, and push one point through each so PROJ opens its database
+    and initializes the pipelines now rather than on the first Run.
+    """
+    kind, _ = decode_src(src_crs_name)
+    probe = {"WGS84": (85.0, 28.0), "UTM": (500000.0, 3100000.0),
+             "MUTM": (500000.0, 3100000.0)}[kind]
+    transform_arrays([probe[0]], [probe[1]], src_crs_name, out_utm_zone, out_mutm_cm)
+
+
+# ============================================================
+# Vectorized engine
+# ============================================================
+
+# The three legs are separate so callers can keep the (unrounded) WGS84
+# intermediate and compute only the output legs that changed.
+
+def to_wgs(x, y, src_crs_name):
+    """STEP 1: Source → WGS84. Returns (lon, lat), unrounded."""
+    if decode_src(src_crs_name)[0] == "WGS84":
+        return x, y
+    return source_to_wgs(src_crs_name).transform(x, y)
+
+
+def to_utm(lon, lat, out_utm_zone):
+    """STEP 2: WGS84 → UTM. Returns (easting, northing), unrounded."""
+    return wgs_to_utm(out_utm_zone).transform(lon, lat)
+
+
+def to_mutm(x, y, lon, lat, src_crs_name, out_mutm_cm):
+    """
+    STEP 3: WGS84 → MUTM, or MUTM → MUTM (projection-only).
+    Needs both the source coordinates and the WGS84 intermediate.
+    """
+    kind, src_zone = decode_src(src_crs_name)
+
+    if kind == "MUTM" and src_zone == out_mutm_cm:
+        return x, y
+    if kind == "MUTM":
+        return mutm_to_mutm(src_zone, out_mutm_cm).transform(x, y)
+    return wgs_to_mutm(out_mutm_cm).transform(lon, lat)
+
+
+def transform_arrays(x, y, src_crs_name, out_utm_zone, out_mutm_cm):
+    """
+    Transforms coordinate arrays in one call per leg.
+
+    x, y are Easting/Northing (or Lon/Lat for WGS84) in the source CRS.
+    Returns dict of float arrays:
+    lat, lon, utm_e, utm_n, mutm_e, mutm_n
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    lon, lat = to_wgs(x, y, src_crs_name)
+    utm_e, utm_n = to_utm(lon, lat, out_utm_zone)
+    mutm_e, mutm_n = to_mutm(x, y, lon, lat, src_crs_name, out_mutm_cm)
+
+    return {
+        "lat": np.round(lat, 8),
+        "lon": np.round(lon, 8),
+        "utm_e": np.round(utm_e, 4),
+        "utm_n": np.round(utm_n, 4),
+        "mutm_e": np.round(mutm_e, 4),
+        "mutm_n": np.round(mutm_n, 4),
+    }
+
+
+# ============================================================
+# Main transformation engine
+# ============================================================
+
+def transform_all(df, src_crs_name, out_utm_zone, out_mutm_cm):
+    """
+    Returns list of rows:
+    [Point, WGS84_lat, WGS84_lon, UTM_E, UTM_N, UTM_zone, MUTM_E, MUTM_N, MUTM_CM]
+    """
+
+    res = transform_arrays(
+        df["X"].to_numpy(dtype=float),
+        df["Y"].to_numpy(dtype=float),
+        src_crs_name,
+        out_utm_zone,
+        out_mutm_cm
+    )
+
+    return [
+        [name, lat, lon, utm_e, utm_n, out_utm_zone, mutm_e, mutm_n, out_mutm_cm]
+        for name, lat, lon, utm_e, utm_n, mutm_e, mutm_n in zip(
+            df["Point"].tolist(),
+            res["lat"].tolist(),
+            res["lon"].tolist(),
+            res["utm_e"].tolist(),
+            res["utm_n"].tolist(),
+            res["mutm_e"].tolist(),
+            res["mutm_n"].tolist()
         )
-    else:
-        mutm_to_mutm = None
-
-    # ========================================================
-    # PROCESS EACH POINT
-    # ========================================================
-    for _, r in df.iterrows():
-        name = r["Point"]
-        x = r["X"]
-        y = r["Y"]
-
-        # ---------------------------
-        # WGS84
-        # ---------------------------
-        if src_is_wgs:
-            lon, lat = x, y
-        else:
-            lon, lat = to_wgs.transform(x, y)
-
-        # ---------------------------
-        # UTM
-        # ---------------------------
-        utm_e, utm_n = wgs_to_utm.transform(lon, lat)
-
-        # ---------------------------
-        # MUTM
-        # ---------------------------
-        if src_is_mutm and src_cm == out_mutm_cm:
-            mutm_e, mutm_n = x, y
-        elif src_is_mutm and mutm_to_mutm:
-            mutm_e, mutm_n = mutm_to_mutm.transform(x, y)
-        else:
-            mutm_e, mutm_n = wgs_to_mutm.transform(lon, lat)
-
-        rows.append([
-            name,
-            round(lat, 8),
-            round(lon, 8),
-            round(utm_e, 4),
-            round(utm_n, 4),
-            out_utm_zone,
-            round(mutm_e, 4),
-            round(mutm_n, 4),
-            out_mutm_cm
-        ])
-
-    return rows
+    ]
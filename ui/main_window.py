@@ -3,13 +3,19 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
 
-from controllers.run_controller import run_transform
-from ui.preview_window import show_preview
+from controllers.live_controller import LiveSession
+from controllers.run_cache import RunCache
+from controllers.job import run_job_to_file
+from controllers.run_controller import read_spec, transform_spec, transform_live
+from ui.worker import BackgroundJob, ProgressPanel
 from utils.formatters import fmt_latlon, fmt_xy
+from utils.run_timing import RunTimings
 
 APP_TITLE = "Coordinate Transformer --- MUTM | UTM | WGS84 "
 FOOTER = "Prepared by: Bikalp Ghimire | Civil Engineer | Pumori Engineering Services (P) Ltd."
 
+LIVE_DEBOUNCE_MS = 300
+
 MANUAL_PLACEHOLDER = (
     "Example:\n"
     "P1, 634413.7394, 3064905.402\n"
@@ -23,6 +29,20 @@ class App(ttk.Window):
         self.title(APP_TITLE)
         self.geometry("800x500")
         self.minsize(600, 500)
+
+        # Live manual mode state
+        self._live = LiveSession()
+        self._live_after = None
+        self._live_job = None
+        self._live_pending = False
+        self._live_preview = None
+
+        # Parsed input + WGS84 intermediate of the last Run
+        self._run_cache = RunCache()
+
+        # Phase timings of the last completed Run (see utils.run_timing)
+        self.last_timings = None
+
         self._build_ui()
 
     def _build_ui(self):
@@ -102,6 +122,24 @@ class App(ttk.Window):
         self.manual_text.bind("<FocusIn>", _clear_placeholder)
         self.manual_text.bind("<FocusOut>", _restore_placeholder)
 
+        # ---- Live mode: re-transform changed lines while typing ----
+        live_row = ttk.Frame(self.manual_frame)
+        live_row.pack(fill=X, padx=padx, pady=(0, pady))
+
+        self.live = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            live_row,
+            text="Live preview",
+            variable=self.live,
+            command=self._schedule_live
+        ).pack(side=LEFT)
+
+        self.live_status = ttk.Label(live_row, text="", foreground="gray")
+        self.live_status.pack(side=LEFT, padx=(10, 0))
+
+        self.manual_text.bind("<<Modified>>", self._on_text_modified)
+        self.manual_text.edit_modified(False)  # placeholder insert set the flag
+
 
 
         # File input
@@ -248,15 +286,37 @@ class App(ttk.Window):
         # --------------------------------------------------
         # Transform button
         # --------------------------------------------------
-        ttk.Button(
-            self,
+        actions = ttk.Frame(self)
+        actions.grid(row=4, column=0, pady=10)
+
+        self.run_btn = ttk.Button(
+            actions,
             text="Transform Coordinates",
             bootstyle=SUCCESS,
             width=28,
             command=self.run
-        ).grid(row=4, column=0, pady=10)
+        )
+        self.run_btn.pack(side=LEFT, padx=6)
+
+        self.file_btn = ttk.Button(
+            actions,
+            text="Convert to File…",
+            bootstyle=(SUCCESS, OUTLINE),
+            width=18,
+            command=self.run_to_file
+        )
+        self.file_btn.pack(side=LEFT, padx=6)
+
+        # Progress + Cancel for the background job (hidden while idle)
+        self.progress = ProgressPanel(self)
+        self.progress.grid(row=5, column=0, sticky="ew", padx=padx, pady=(0, 4))
+        self.progress.grid_remove()
 
-        ttk.Label(self, text=FOOTER, foreground="gray").grid(row=5, column=0, pady=(0, 6))
+        # Per-phase timings of the last Run
+        self.status = ttk.Label(self, text="", foreground="gray", anchor="w")
+        self.status.grid(row=6, column=0, sticky="ew", padx=padx)
+
+        ttk.Label(self, text=FOOTER, foreground="gray").grid(row=7, column=0, pady=(0, 6))
 
         self._sync_output_checkboxes()
         # ==================================================
@@ -286,52 +346,157 @@ class App(ttk.Window):
             self.file_entry.insert(0, f)
 
 
+    def _start_job(self, fn, text, on_done):
+        """Run `fn(progress, cancel)` in the background with the progress panel"""
+        def finish():
+            self.progress.finish()
+            self.run_btn.configure(state=NORMAL)
+            self.file_btn.configure(state=NORMAL)
+
+        def done(result):
+            finish()
+            on_done(result)
+
+        def failed(e):
+            finish()
+            messagebox.showerror("Error", str(e))
+
+        job = BackgroundJob(
+            self, fn,
+            on_done=done,
+            on_error=failed,
+            on_progress=self.progress.update_progress,
+            on_cancel=finish
+        )
+        self.run_btn.configure(state=DISABLED)
+        self.file_btn.configure(state=DISABLED)
+        self.progress.track(job, text)
+        job.start()
+
+    # --------------------------------------------------
+    # Live manual mode
+    # --------------------------------------------------
+    def _on_text_modified(self, event=None):
+        self.manual_text.edit_modified(False)
+        self._schedule_live()
+
+    def _live_on(self):
+        return self.live.get() and self.mode.get() == "manual"
+
+    def _schedule_live(self):
+        """Debounce: (re)start the timer on every keystroke."""
+        if self._live_after:
+            self.after_cancel(self._live_after)
+            self._live_after = None
+        if self._live_on():
+            self._live_after = self.after(LIVE_DEBOUNCE_MS, self._run_live)
+        else:
+            self._live_pending = False    # no re-run once the current job ends
+
+    def _run_live(self):
+        self._live_after = None
+        if self._live_job:
+            # One live job at a time; run again once it finishes
+            self._live_pending = True
+            return
+
+        text = self.manual_text.get("1.0", "end-1c")
+        if text == MANUAL_PLACEHOLDER or not text.strip():
+            return
+        spec = read_spec(self)
+
+        def done(result):
+            df_out, outputs = result
+            self.df_out = df_out
+            self.live_status.configure(
+                text=f"{len(df_out):,} points ({self._live.misses:,} recomputed)"
+            )
+            if self._live_preview and self._live_preview.winfo_exists():
+                self._live_preview.set_data(df_out, outputs)
+            elif self._live_on():
+                from ui.preview_window import show_preview
+                self._live_preview = show_preview(self, df_out, outputs)
+            finish()
+
+        def failed(e):
+            self.live_status.configure(text=str(e).splitlines()[0])
+            finish()
+
+        def finish():
+            self._live_job = None
+            if self._live_pending:
+                self._live_pending = False
+                if self._live_on():
+                    self._run_live()
+
+        self._live_job = BackgroundJob(
+            self,
+            lambda progress, cancel: transform_live(self._live, spec),
+            on_done=done,
+            on_error=failed
+        ).start()
+
     def run(self):
         """UI callback only"""
         try:
-            df_out, outputs = run_transform(self)
-            self.df_out = df_out
-            show_preview(self, df_out, outputs)
+            spec = read_spec(self)
         except Exception as e:
             messagebox.showerror("Error", str(e))
-    
-    def export_kml(self):
-        if not hasattr(self, "df_out"):
-            messagebox.showwarning(
-                "No Data",
-                "Please run the conversion before exporting KML."
-            )
             return
 
-        if "WGS84_Lat" not in self.df_out or "WGS84_Lon" not in self.df_out:
-            messagebox.showerror(
-                "Missing Data",
-                "WGS84 coordinates are required for KML export."
-            )
-            return
-        
-        from tkinter import filedialog
-        from kml_export import export_to_kml
+        timings = RunTimings()
 
-        path = filedialog.asksaveasfilename(
-            defaultextension=".kml",
-            filetypes=[("KML files", "*.kml")]
+        def show(result):
+            from ui.preview_window import show_preview
+
+            df_out, outputs = result
+            self.df_out = df_out
+            with timings.phase("preview"):
+                show_preview(self, df_out, outputs).update_idletasks()
+
+            self.last_timings = timings
+            self.status.configure(text=timings.summary())
+
+        self._start_job(
+            lambda progress, cancel: transform_spec(
+                spec, progress, cancel, self._run_cache, timings
+            ),
+            "Transforming…",
+            show
         )
 
+    def run_to_file(self):
+        """Large conversions: stream straight to a file, no preview table"""
+        path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV", "*.csv"),
+                ("Gzip CSV", "*.csv.gz"),
+                ("Excel", "*.xlsx"),
+                ("Parquet", "*.parquet"),
+                ("Feather", "*.feather"),
+                ("GeoPackage", "*.gpkg"),
+                ("FlatGeobuf", "*.fgb"),
+            ]
+        )
         if not path:
             return
 
-        export_to_kml(
-            filepath=path,
-            names=self.df_out["Point"],
-            lats=self.df_out["WGS84_Lat"].astype(float),
-            lons=self.df_out["WGS84_Lon"].astype(float),
-            crs_name=self.src_crs.get()
-        )
+        try:
+            spec = read_spec(self)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
 
+        def report(stats):
+            messagebox.showinfo(
+                "Export Complete",
+                f"{stats['rows']:,} points written to:\n{path}\n\n"
+                f"{stats['bytes'] / 1e6:.1f} MB in {stats['seconds']:.2f} s"
+            )
 
-        messagebox.showinfo(
-            "Export Complete",
-            f"KML file successfully saved:\n{path}"
+        self._start_job(
+            lambda progress, cancel: run_job_to_file(spec, path, progress, cancel),
+            "Converting…",
+            report
         )
-
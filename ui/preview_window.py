@@ -1,52 +1,204 @@
+import itertools
+
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
 
+from kml_export import export_to_kml, export_to_kmz_tiled
+from sinks.excel_sink import write_excel
+from ui.virtual_table import VirtualTable
+from ui.worker import BackgroundJob, ProgressPanel
+
+FILTER_DEBOUNCE_MS = 150
+
 
 def show_preview(parent, df, outputs):
+    """
+    Open the results window. The returned Toplevel has a
+    `set_data(df, outputs)` method that refreshes it in place.
+    """
     win = ttk.Toplevel(parent)
     win.title("Transformation Results Preview")
     win.geometry("1200x500")
-    win.grab_set()
 
-    ttk.Label(
-        win,
-        text=f"Input CRS: {parent.src_crs.get()} | Output CRS: {', '.join(outputs)}",
-        font=("TkDefaultFont", 10, "bold")
-    ).pack(anchor="w", padx=10, pady=(10, 5))
+    state = {"src_crs": parent.src_crs.get()}
+
+    header = ttk.Label(win, font=("TkDefaultFont", 10, "bold"))
+    header.pack(anchor="w", padx=10, pady=(10, 5))
+
+    # ---- Find / filter by point name (click a heading to sort) ----
+    search = ttk.Frame(win)
+    search.pack(fill=X, padx=10)
+
+    ttk.Label(search, text="Point:").pack(side=LEFT)
+    query = ttk.Entry(search, width=24)
+    query.pack(side=LEFT, padx=6)
+
+    filter_on = ttk.BooleanVar(value=False)
+    ttk.Checkbutton(
+        search, text="Filter",
+        variable=filter_on,
+        command=lambda: apply_filter()
+    ).pack(side=LEFT)
+
+    found = ttk.Label(search, text="Enter: find exact name", foreground="gray")
+    found.pack(side=LEFT, padx=10)
+
+    hits = {"key": None, "rows": (), "next": 0}
+
+    def apply_filter():
+        table.set_filter(query.get() if filter_on.get() else "")
+        found.configure(text=f"{len(table):,} of {len(table.df):,} rows")
 
-    frame = ttk.Frame(win)
-    frame.pack(fill=BOTH, expand=True, padx=10, pady=5)
+    def find_point(event=None):
+        name = query.get().strip()
+        key = (name, id(table.df))
+        if hits["key"] != key:
+            hits.update(key=key, rows=table.find(name), next=0)
 
-    tree = ttk.Treeview(frame, columns=list(df.columns), show="headings")
-    tree.pack(fill=BOTH, expand=True)
+        rows = hits["rows"]
+        if not len(rows):
+            found.configure(text=f"No point named '{name}'")
+            return
 
-    for col in df.columns:
-        tree.heading(col, text=col)
-        tree.column(col, anchor="center", width=140)
+        # Repeated Enter cycles through duplicates
+        i = hits["next"] % len(rows)
+        hits["next"] += 1
+        row = rows[i]
 
-    for _, r in df.iterrows():
-        tree.insert("", END, values=list(r))
+        if table.position_of(row) is None:
+            filter_on.set(False)
+            apply_filter()
+        table.select([row])
+        table.see(table.position_of(row))
+        found.configure(text=f"Match {i + 1} of {len(rows)}")
+
+    query.bind("<Return>", find_point)
+    pending = {"after": None}
+
+    def filter_later(event):
+        # Debounced: one filter pass once typing pauses
+        if not filter_on.get() or event.keysym == "Return":
+            return
+        if pending["after"]:
+            win.after_cancel(pending["after"])
+        pending["after"] = win.after(FILTER_DEBOUNCE_MS, run_filter)
+
+    def run_filter():
+        pending["after"] = None
+        apply_filter()
+
+    query.bind("<KeyRelease>", filter_later)
+
+    # Only the visible rows are materialized in Tk
+    table = VirtualTable(win, df)
+    table.pack(fill=BOTH, expand=True, padx=10, pady=5)
+
+    def set_data(df, outputs, keep_position=True):
+        state["src_crs"] = parent.src_crs.get()
+        header.configure(
+            text=f"Input CRS: {state['src_crs']} | Output CRS: {', '.join(outputs)}"
+        )
+        if df is not table.df:
+            table.set_data(df, keep_position=keep_position)
+
+    set_data(df, outputs)
+    win.set_data = set_data
 
     # ---- Copy including headers ----
-    def copy_selected(event=None):
-        rows = ["\t".join(df.columns)]
-        for i in tree.selection():
-            rows.append("\t".join(map(str, tree.item(i)["values"])))
+    def copy_rows(rows=None):
         win.clipboard_clear()
-        win.clipboard_append("\n".join(rows))
+        win.clipboard_append(table.to_tsv(rows))
 
-    tree.bind("<Control-c>", copy_selected)
+    def copy_selected(event=None):
+        copy_rows(table.selected_rows())
+        return "break"
+
+    table.tree.bind("<Control-c>", copy_selected)
+
+    # ---- Background exports (one progress row each, can overlap) ----
+    jobs_frame = ttk.Frame(win)
+    jobs_frame.pack(fill=X, padx=10)
+    jobs_frame.grid_columnconfigure(0, weight=1)
+    job_rows = itertools.count()
+
+    def start_export(fn, text, path):
+        panel = ProgressPanel(jobs_frame)
+        panel.grid(row=next(job_rows), column=0, sticky="ew", pady=2)
+
+        def finish():
+            panel.finish()
+            panel.destroy()
+
+        def done(_):
+            finish()
+            messagebox.showinfo("Exported", f"Saved to:\n{path}", parent=win)
+
+        def failed(e):
+            finish()
+            messagebox.showerror("Export failed", str(e), parent=win)
+
+        job = BackgroundJob(
+            win, fn,
+            on_done=done,
+            on_error=failed,
+            on_progress=panel.update_progress,
+            on_cancel=finish
+        )
+        panel.track(job, text)
+        job.start()
 
     # ---- Export to Excel ----
     def export_excel():
         path = filedialog.asksaveasfilename(
+            parent=win,
             defaultextension=".xlsx",
             filetypes=[("Excel file", "*.xlsx")]
         )
         if path:
-            df.to_excel(path, index=False)
-            messagebox.showinfo("Exported", f"Saved to:\n{path}")
+            data = table.df
+            start_export(
+                lambda progress, cancel: write_excel(path, data, progress=progress, cancel=cancel),
+                "Excel…", path
+            )
+
+    # ---- Export to KML / tiled KMZ ----
+    def export_kml():
+        df = table.df
+        crs_name = state["src_crs"]
+        if "WGS84_Lat" not in df or "WGS84_Lon" not in df:
+            messagebox.showerror(
+                "Missing Data",
+                "WGS84 coordinates are required for KML export.",
+                parent=win
+            )
+            return
+
+        path = filedialog.asksaveasfilename(
+            parent=win,
+            defaultextension=".kml",
+            filetypes=[
+                ("KML files", "*.kml"),
+                ("Tiled KMZ (large point sets)", "*.kmz")
+            ]
+        )
+        if not path:
+            return
+
+        export = export_to_kmz_tiled if path.lower().endswith(".kmz") else export_to_kml
+
+        def run(progress, cancel):
+            return export(
+                filepath=path,
+                names=df["Point"].tolist(),
+                lats=df["WGS84_Lat"].astype(float).to_numpy(),
+                lons=df["WGS84_Lon"].astype(float).to_numpy(),
+                crs_name=crs_name,
+                progress=progress,
+                cancel=cancel
+            )
+
+        start_export(run, "KML…", path)
 
     btns = ttk.Frame(win)
     btns.pack(pady=6)
@@ -57,14 +209,22 @@ def show_preview(parent, df, outputs):
         command=export_excel
     ).pack(side=LEFT, padx=10)
 
+    ttk.Button(
+        btns, text="Copy all",
+        bootstyle=SECONDARY,
+        command=copy_rows
+    ).pack(side=LEFT, padx=10)
+
     ttk.Button(
         btns,
         text="Export KML",
         bootstyle=INFO,
-        command=parent.export_kml
+        command=export_kml
     ).pack(side=LEFT, padx=10)
 
     ttk.Button(
         btns, text="Close",
         command=win.destroy
     ).pack(side=LEFT, padx=10)
+
+    return win
@@ -0,0 +1,355 @@
+# ui/virtual_table.py
+import itertools
+
+import numpy as np
+import pandas as pd
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+
+class VirtualTable(ttk.Frame):
+    """
+    Read-only table over a DataFrame that never inserts the whole
+    dataset into Tk.
+
+    The Treeview only holds one item per *visible* row. Scrolling
+    rewrites those items' values from the underlying column arrays, so
+    opening time and Tk memory do not depend on the number of rows.
+    Selection is kept as a boolean mask over data rows (items are
+    recycled and cannot carry it).
+
+    Sorting and filtering do not touch Tk either: the view is an index
+    array of data rows (the `argsort` of the sort key, restricted to the
+    rows matching the filter) and scrolling walks that array.
+    """
+
+    WHEEL_ROWS = 3
+
+    def __init__(self, master, df, col_width=140, **kw):
+        super().__init__(master, **kw)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self, show="headings", selectmode="none")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+
+        self.vsb = ttk.Scrollbar(self, orient=VERTICAL, command=self.yview)
+        self.vsb.grid(row=0, column=1, sticky="ns")
+
+        self._col_width = col_width
+        self._first = 0        # view position shown in the top slot
+        self._visible = 1      # number of slots that fit in the widget
+        self._items = []       # recycled Treeview item ids
+        self._anchor = None    # fixed end of a Shift range (view position)
+        self._cursor = None    # moving end (last clicked / keyboard row)
+
+        self._sort = None      # (column, descending) or None
+        self._filter = ""      # Point substring filter
+
+        self.set_data(df)
+
+        tree = self.tree
+        tree.bind("<Configure>", lambda e: self._resize())
+        tree.bind("<Button-1>", self._on_click)
+        tree.bind("<Shift-Button-1>", lambda e: self._on_click(e, extend=True))
+        tree.bind("<Control-Button-1>", lambda e: self._on_click(e, toggle=True))
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda e: self._scroll_to(self._first - self.WHEEL_ROWS))
+        tree.bind("<Button-5>", lambda e: self._scroll_to(self._first + self.WHEEL_ROWS))
+        tree.bind("<Up>", lambda e: self._move_cursor(-1, e))
+        tree.bind("<Down>", lambda e: self._move_cursor(1, e))
+        tree.bind("<Prior>", lambda e: self._move_cursor(-self._visible, e))
+        tree.bind("<Next>", lambda e: self._move_cursor(self._visible, e))
+        tree.bind("<Home>", lambda e: self._move_cursor(-len(self), e))
+        tree.bind("<End>", lambda e: self._move_cursor(len(self), e))
+        tree.bind("<Control-a>", lambda e: self.select_all())
+
+    # ---------------------------
+    # Data
+    # ---------------------------
+    def set_data(self, df, keep_position=False):
+        """
+        Replace the rows (and the columns, if they differ).
+        `keep_position` keeps the scroll offset, e.g. for live updates.
+        The current sort and filter are applied to the new rows.
+        """
+        columns = [str(c) for c in df.columns]
+        if columns != list(self.tree["columns"]):
+            self.tree.configure(columns=columns)
+            for col in columns:
+                self.tree.heading(col, command=lambda c=col: self.toggle_sort(c))
+                self.tree.column(col, anchor="center", width=self._col_width)
+            if self._sort and self._sort[0] not in columns:
+                self._sort = None
+
+        self.df = df
+        self._columns = columns
+        self._cols = [df[c].astype(str).to_numpy(dtype=object) for c in df.columns]
+        self._selected = np.zeros(len(df), dtype=bool)
+
+        # Built on first use, per data set
+        self._sort_keys = {}
+        self._point_index = None
+        self._points_lower = None
+        self._matches = ("", None)    # last filter text and its rows
+
+        self._update_view(keep_position)
+
+    def __len__(self):
+        """Rows in the current view (after filtering)."""
+        return len(self._rows)
+
+    def row_values(self, row):
+        return [col[row] for col in self._cols]
+
+    def to_tsv(self, rows=None, header=True):
+        """
+        Tab-separated text for `rows` (data indices; the whole current
+        view, in view order, if None).
+
+        Built straight from the column arrays in one pass: one fancy-index
+        per column, then a single zip/join. 1M rows take well under a
+        second.
+        """
+        if rows is None:
+            rows = self._rows
+        cols = [col[rows] for col in self._cols]
+        lines = map("\t".join, zip(*cols))
+        if header:
+            lines = itertools.chain(["\t".join(map(str, self.df.columns))], lines)
+        return "\n".join(lines)
+
+    # ---------------------------
+    # Sort / filter / find
+    # ---------------------------
+    def toggle_sort(self, col):
+        """Heading click: ascending, then descending, then data order."""
+        if not self._sort or self._sort[0] != col:
+            self._sort = (col, False)
+        elif not self._sort[1]:
+            self._sort = (col, True)
+        else:
+            self._sort = None
+        self._update_view()
+
+    def set_filter(self, text):
+        """Show only rows whose Point contains `text` (case-insensitive)."""
+        self._filter = text.strip()
+        self._update_view()
+
+    def find(self, name):
+        """
+        Data rows whose Point is exactly `name`, through a hash index
+        (pandas Index) built on first use. Empty if there is none.
+        """
+        if self._point_index is None:
+            self._point_index = pd.Index(self._cols[0])
+        try:
+            loc = self._point_index.get_loc(name)
+        except KeyError:
+            return np.empty(0, dtype=np.intp)
+        return np.arange(len(self._point_index))[loc].reshape(-1)
+
+    def position_of(self, row):
+        """View position of data row `row`, or None if filtered out."""
+        pos = self._positions[row]
+        return None if pos < 0 else int(pos)
+
+    def _sort_key(self, col):
+        """Float array when the whole column parses as numbers, else text."""
+        if col not in self._sort_keys:
+            values = self._cols[self._columns.index(col)]
+            try:
+                key = values.astype(float)
+            except ValueError:
+                key = values.astype(str)
+            self._sort_keys[col] = key
+        return self._sort_keys[col]
+
+    def _filter_rows(self, text):
+        """
+        Data rows whose lowercased Point contains `text`, matched in C
+        over a fixed-width string array. Typing on (the text extends the
+        last one) only searches the rows that matched before.
+        """
+        if self._points_lower is None:
+            self._points_lower = (
+                pd.Series(self._cols[0]).str.lower().to_numpy(dtype=str)
+            )
+        last, last_rows = self._matches
+        if last_rows is not None and last in text:
+            rows = last_rows[np.char.find(self._points_lower[last_rows], text) >= 0]
+        else:
+            rows = np.flatnonzero(np.char.find(self._points_lower, text) >= 0)
+        self._matches = (text, rows)
+        return rows
+
+    def _update_view(self, keep_position=False):
+        n = len(self.df)
+        rows = np.arange(n)
+
+        if self._filter and n:
+            rows = self._filter_rows(self._filter.lower())
+
+        if self._sort:
+            col, descending = self._sort
+            order = np.argsort(self._sort_key(col)[rows], kind="stable")
+            rows = rows[order[::-1] if descending else order]
+
+        self._rows = rows
+        self._positions = np.full(n, -1, dtype=np.intp)
+        self._positions[rows] = np.arange(len(rows))
+        self._anchor = self._cursor = None
+
+        for col in self._columns:
+            mark = ""
+            if self._sort and self._sort[0] == col:
+                mark = " ▼" if self._sort[1] else " ▲"
+            self.tree.heading(col, text=col + mark)
+
+        if not keep_position:
+            self._first = 0
+        self._first = max(0, min(self._first, len(rows) - self._visible))
+        self._render()
+
+    # ---------------------------
+    # Selection
+    # ---------------------------
+    def selected_rows(self):
+        """Selected data row indices within the view, in view order."""
+        return self._rows[self._selected[self._rows]]
+
+    def select(self, rows, add=False):
+        if not add:
+            self._selected[:] = False
+        self._selected[rows] = True
+        self._render()
+
+    def select_all(self):
+        self._selected[self._rows] = True
+        self._render()
+        return "break"
+
+    # ---------------------------
+    # Scrolling
+    # ---------------------------
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', f) or ('scroll', n, 'units'|'pages')."""
+        if args[0] == "moveto":
+            self._scroll_to(round(float(args[1]) * len(self)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._visible
+            self._scroll_to(self._first + step)
+
+    def see(self, pos):
+        """Scroll so that view position `pos` is visible."""
+        if pos < self._first:
+            self._scroll_to(pos)
+        elif pos >= self._first + self._visible:
+            self._scroll_to(pos - self._visible + 1)
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, len(self) - self._visible))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        if abs(event.delta) >= 120:
+            notches = event.delta // 120
+        else:
+            notches = (event.delta > 0) - (event.delta < 0)
+        self._scroll_to(self._first - self.WHEEL_ROWS * notches)
+
+    # ---------------------------
+    # Rendering
+    # ---------------------------
+    def _resize(self):
+        """Recompute how many rows fit, from the height of a rendered row."""
+        if not self._items:
+            return
+        bbox = self.tree.bbox(self._items[0])
+        if not bbox:
+            return
+        _, y, _, h = bbox
+        visible = max(1, (self.tree.winfo_height() - y) // h)
+        if visible != self._visible:
+            self._visible = visible
+            self._first = max(0, min(self._first, len(self) - visible))
+            self._render()
+
+    def _render(self):
+        tree = self.tree
+        n = min(self._visible + 1, len(self) - self._first)
+
+        # Grow / shrink the item pool to the number of rows on screen
+        while len(self._items) < n:
+            self._items.append(tree.insert("", END))
+        while len(self._items) > max(n, 0):
+            tree.delete(self._items.pop())
+
+        selected = []
+        for i, item in enumerate(self._items):
+            row = self._rows[self._first + i]
+            tree.item(item, values=self.row_values(row))
+            if self._selected[row]:
+                selected.append(item)
+        tree.selection_set(selected)
+
+        total = len(self)
+        if total:
+            self.vsb.set(self._first / total,
+                         min(1.0, (self._first + self._visible) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    # ---------------------------
+    # Mouse / keyboard
+    # ---------------------------
+    def _pos_at(self, y):
+        item = self.tree.identify_row(y)
+        if not item:
+            return None
+        return self._first + self._items.index(item)
+
+    def _on_click(self, event, extend=False, toggle=False):
+        self.tree.focus_set()
+        if self.tree.identify_region(event.x, event.y) != "cell":
+            return
+        pos = self._pos_at(event.y)
+        if pos is None:
+            return "break"
+
+        if toggle:
+            row = self._rows[pos]
+            self._selected[row] = not self._selected[row]
+            self._anchor = self._cursor = pos
+            self._render()
+        else:
+            self._select_to(pos, extend)
+        return "break"
+
+    def _move_cursor(self, step, event):
+        if not len(self):
+            return "break"
+        current = self._cursor if self._cursor is not None else self._first
+        pos = max(0, min(current + step, len(self) - 1))
+
+        self._select_to(pos, extend=bool(event.state & 0x0001))   # Shift
+        self.see(pos)
+        return "break"
+
+    def _select_to(self, pos, extend):
+        """Select view position `pos`, or the range from the anchor to it."""
+        self._selected[:] = False
+        if extend and self._anchor is not None:
+            lo, hi = sorted((self._anchor, pos))
+            self._selected[self._rows[lo:hi + 1]] = True
+        else:
+            self._selected[self._rows[pos]] = True
+            self._anchor = pos
+        self._cursor = pos
+        self._render()
@@ -0,0 +1,146 @@
+import queue
+import threading
+
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+from pipeline import ConversionCancelled
+
+
+class BackgroundJob:
+    """
+    Runs `fn(progress, cancel)` on a worker thread.
+
+    `progress(done, total)` may be called from the worker at any rate;
+    progress, the result and errors are queued and delivered to the
+    callbacks on the Tk thread by polling with `after()`, so the UI
+    stays responsive and no Tk call is made off the main thread.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, widget, fn, on_done=None, on_error=None,
+                 on_progress=None, on_cancel=None):
+        self.widget = widget
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+
+        self.cancel_event = threading.Event()
+        self.finished = False
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.widget.after(self.POLL_MS, self._poll)
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    # ---------------------------
+    # Worker thread
+    # ---------------------------
+    def _progress(self, done, total):
+        self._queue.put(("progress", (done, total)))
+
+    def _run(self):
+        try:
+            result = self.fn(self._progress, self.cancel_event)
+        except ConversionCancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+        else:
+            self._queue.put(("done", result))
+
+    # ---------------------------
+    # Tk thread
+    # ---------------------------
+    def _poll(self):
+        last_progress = None
+        outcome = None
+
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                last_progress = payload
+            else:
+                outcome = (kind, payload)
+
+        if last_progress and self.on_progress:
+            self.on_progress(*last_progress)
+
+        if outcome is None:
+            if self.widget.winfo_exists():
+                self.widget.after(self.POLL_MS, self._poll)
+            return
+
+        self.finished = True
+        kind, payload = outcome
+        callback = {
+            "done": self.on_done,
+            "error": self.on_error,
+            "cancelled": self.on_cancel,
+        }[kind]
+        if callback:
+            callback(*(() if kind == "cancelled" else (payload,)))
+
+
+class ProgressPanel(ttk.Frame):
+    """
+    Label + progress bar + Cancel button bound to one BackgroundJob.
+    Hidden (grid_remove) while idle.
+    """
+
+    def __init__(self, master, **kw):
+        super().__init__(master, **kw)
+        self.grid_columnconfigure(1, weight=1)
+
+        self.label = ttk.Label(self, text="", width=28)
+        self.label.grid(row=0, column=0, sticky="w")
+
+        self.bar = ttk.Progressbar(self, mode="determinate", maximum=100)
+        self.bar.grid(row=0, column=1, sticky="ew", padx=8)
+
+        self.cancel_btn = ttk.Button(
+            self, text="Cancel", bootstyle=(DANGER, OUTLINE), width=8
+        )
+        self.cancel_btn.grid(row=0, column=2)
+
+        self._job = None
+        self._text = ""
+
+    def track(self, job, text):
+        """Show the panel for `job` and wire its Cancel button."""
+        self._job = job
+        self._text = text
+        self.label.configure(text=text)
+        self.bar.configure(value=0, mode="indeterminate")
+        self.bar.start(15)
+        self.cancel_btn.configure(state=NORMAL, command=self._cancel)
+        self.grid()
+
+    def update_progress(self, done, total):
+        if self.bar.cget("mode") == "indeterminate":
+            self.bar.stop()
+            self.bar.configure(mode="determinate")
+        self.bar.configure(value=100 * done / total if total else 100)
+        self.label.configure(text=f"{self._text} {done:,} / {total:,}")
+
+    def finish(self):
+        self.bar.stop()
+        self._job = None
+        self.grid_remove()
+
+    def _cancel(self):
+        if self._job:
+            self._job.cancel()
+            self.cancel_btn.configure(state=DISABLED)
+            self.label.configure(text="Cancelling…")
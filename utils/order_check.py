@@ -1,11 +1,13 @@
+import math
+
 import pandas as pd
 
 def check_consistent_order(xs, ys, src_crs):
     detected = []
 
     for x, y in zip(xs, ys):
-        if pd.isna(x) or pd.isna(y):
-            continue
+        if pd.isna(x) or pd.isna(y) or not (math.isfinite(x) and math.isfinite(y)):
+            continue    # no order to read from NaN / inf
 
         ax, ay = abs(x), abs(y)
 
@@ -26,3 +28,27 @@ def check_consistent_order(xs, ys, src_crs):
             )
 
     return first
+
+
+def check_order_arrays(xs, ys, src_crs):
+    """
+    check_consistent_order for float arrays, vectorized (same rules and
+    errors); used on the streaming paths where a Python loop per point
+    would cost as much as the transform.
+    """
+    import numpy as np
+
+    valid = np.isfinite(xs) & np.isfinite(ys)
+    if not valid.any():
+        raise ValueError("No valid coordinate rows found.")
+
+    x_larger = np.abs(xs[valid]) >= np.abs(ys[valid])
+    if x_larger.any() and not x_larger.all():
+        raise ValueError(
+            "Inconsistent coordinate order detected.\n\n"
+            "Some rows appear as X,Y while others appear as Y,X."
+        )
+
+    if src_crs == "WGS84":
+        return "LONLAT" if x_larger[0] else "LATLON"
+    return "NE" if x_larger[0] else "EN"
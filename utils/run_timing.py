@@ -0,0 +1,72 @@
+import time
+from contextlib import contextmanager
+
+# ============================================================
+# Per-phase run timings
+# ============================================================
+
+# Display order; phases that did not run (e.g. parse on a cached run)
+# are left out
+PHASES = ("parse", "order check", "transform", "format", "preview")
+
+
+class RunTimings:
+    """
+    Wall-clock seconds per phase of one Run, plus the point count.
+
+    Phases may nest: time spent in an inner phase is not counted in the
+    outer one (parsing runs inside the transform's cache lookup).
+    Phases run one after another, never concurrently, so one instance
+    can be filled on the worker thread and finished on the Tk thread.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.points = 0
+        self.cached = False    # parse + source leg reused from the last Run
+        self._stack = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            inner = self._stack.pop()
+            elapsed = time.perf_counter() - start
+            self.seconds[name] = self.seconds.get(name, 0.0) + elapsed - inner
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    @property
+    def total(self):
+        return sum(self.seconds.values())
+
+    @property
+    def points_per_second(self):
+        return self.points / self.total if self.total else 0.0
+
+    def as_dict(self):
+        return {
+            "points": self.points,
+            "cached": self.cached,
+            "seconds": dict(self.seconds),
+            "total": self.total,
+            "points_per_second": self.points_per_second,
+        }
+
+    def summary(self):
+        """One status-bar line, e.g. 'parse 0.41 s · … | 200,000 points in 1.9 s (…)'."""
+        names = [p for p in PHASES if p in self.seconds]
+        names += [p for p in self.seconds if p not in PHASES]
+        parts = [f"{p} {self.seconds[p]:.2f} s" for p in names]
+
+        text = " · ".join(parts)
+        text += (
+            f"  |  {self.points:,} points in {self.total:.2f} s"
+            f" ({self.points_per_second:,.0f} pts/s)"
+        )
+        if self.cached:
+            text += "  [cached input]"
+        return text
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+# ============================================================
+# GUI startup budget
+# ============================================================
+#
+# The entry points import this module first and call `mark()` at each
+# checkpoint. Set MUTM_STARTUP_REPORT=1 to print a report to stderr once
+# the first window is up, or MUTM_STARTUP_REPORT=<file> to append it to
+# a file (the windowed PyInstaller build has no stderr).
+#
+# For a per-module breakdown run:  python -X importtime app.py
+
+T0 = time.perf_counter()
+
+BUDGET_S = 0.8
+
+# Must not be imported before the first window appears
+HEAVY_MODULES = ("numpy", "pandas", "pyproj", "openpyxl", "pyarrow")
+
+ENV_VAR = "MUTM_STARTUP_REPORT"
+
+_marks = []
+
+
+def mark(label):
+    """Record seconds since this module was imported."""
+    _marks.append((label, time.perf_counter() - T0))
+
+
+def eager_imports():
+    """Heavy modules that are already loaded."""
+    return [m for m in HEAVY_MODULES if m in sys.modules]
+
+
+def report():
+    """Checkpoint times, budget verdict and eagerly imported heavy modules."""
+    total = _marks[-1][1] if _marks else 0.0
+    eager = eager_imports()
+
+    lines = ["Startup timing:"]
+    prev = 0.0
+    for label, t in _marks:
+        lines.append(f"  {t * 1000:8.1f} ms  (+{(t - prev) * 1000:6.1f})  {label}")
+        prev = t
+
+    verdict = "OK" if total <= BUDGET_S else "OVER BUDGET"
+    lines.append(f"  total {total * 1000:.0f} ms / budget {BUDGET_S * 1000:.0f} ms: {verdict}")
+    if eager:
+        lines.append(f"  heavy modules imported before first window: {', '.join(eager)}")
+
+    return "\n".join(lines)
+
+
+def maybe_report():
+    """Emit `report()` if the environment asks for it."""
+    target = os.environ.get(ENV_VAR)
+    if not target:
+        return
+
+    text = report()
+    if target == "1":
+        if sys.stderr:
+            print(text, file=sys.stderr)
+    else:
+        with open(target, "a", encoding="utf-8") as f:
+            f.write(text + "\n")